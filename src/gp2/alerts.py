@@ -0,0 +1,138 @@
+"""Alert episodes with enter/exit hysteresis, per-type cooldowns and periodic updates."""
+
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+PHASE_START = "start"
+PHASE_UPDATE = "update"
+PHASE_END = "end"
+
+
+@dataclass(frozen=True)
+class AlertPolicy:
+    """Hysteresis and pacing for one alert type.
+
+    An episode starts after `enter_cycles` consecutive active cycles and ends
+    after `exit_cycles` consecutive inactive ones. No new episode starts within
+    `cooldown_s` of the previous end. While an episode lasts, an update is
+    emitted every `update_interval_s` (None disables updates).
+    """
+
+    enter_cycles: int = 1
+    exit_cycles: int = 20
+    cooldown_s: float = 10.0
+    update_interval_s: float | None = 10.0
+
+
+def default_alert_policies() -> dict[str, AlertPolicy]:
+    """Return the runtime's FATIGUE and CRASH alert policies."""
+    return {
+        # `is_drowsy` is already PERCLOS-smoothed, so one cycle enters; ~1 s at 20 Hz exits.
+        "FATIGUE": AlertPolicy(enter_cycles=1, exit_cycles=20, cooldown_s=10.0),
+        # A sustained high-g reading is one impact; the cooldown matches the fast-path refractory.
+        "CRASH": AlertPolicy(enter_cycles=1, exit_cycles=5, cooldown_s=2.0, update_interval_s=None),
+    }
+
+
+class _AlertState:
+    def __init__(self):
+        self.active_streak = 0
+        self.inactive_streak = 0
+        self.episode_id = None
+        self.started_at = 0.0
+        self.last_emit_at = 0.0
+        self.ended_at = None
+        self.cycles = 0
+        self.last_payload: dict[str, Any] = {}
+
+
+class AlertStateMachine:
+    """Turns per-cycle alert conditions into episode start/update/end events.
+
+    `observe(alert_type, active, payload)` is called once per cycle per type and
+    returns the payload to publish, extended with `episode_id`, `phase`,
+    `duration_s` and `cycles`, or None when nothing should be published. Alert
+    types without a policy pass through on every active cycle. Each type is
+    only touched by the stage that raises it, so no locking is needed.
+    """
+
+    def __init__(self, policies: dict[str, AlertPolicy] | None = None, clock=time.monotonic):
+        self.policies = dict(default_alert_policies() if policies is None else policies)
+        self.clock = clock
+        self.stats = {"episodes": 0, "updates": 0, "suppressed": 0}
+        self._states = {alert_type: _AlertState() for alert_type in self.policies}
+
+    def active_episode(self, alert_type: str) -> str | None:
+        state = self._states.get(alert_type)
+        return state.episode_id if state is not None else None
+
+    def observe(self, alert_type: str, active: bool, payload: dict[str, Any]) -> dict | None:
+        """Advance `alert_type` by one cycle; return the event payload to publish, if any."""
+        policy = self.policies.get(alert_type)
+        if policy is None:
+            return dict(payload) if active else None
+        state = self._states[alert_type]
+        now = self.clock()
+        if active:
+            state.active_streak += 1
+            state.inactive_streak = 0
+        else:
+            state.inactive_streak += 1
+            state.active_streak = 0
+
+        if state.episode_id is None:
+            if state.active_streak < policy.enter_cycles:
+                return None
+            if state.ended_at is not None and now - state.ended_at < policy.cooldown_s:
+                self.stats["suppressed"] += 1
+                return None
+            state.episode_id = (
+                f"{alert_type.lower()}-{int(time.time() * 1000)}-{uuid.uuid4().hex[:6]}"
+            )
+            state.started_at = state.last_emit_at = now
+            state.cycles = 1
+            state.last_payload = dict(payload)
+            self.stats["episodes"] += 1
+            return self._event(state, PHASE_START, now)
+
+        if active:
+            state.cycles += 1
+            state.last_payload = dict(payload)
+            if (
+                policy.update_interval_s is not None
+                and now - state.last_emit_at >= policy.update_interval_s
+            ):
+                state.last_emit_at = now
+                self.stats["updates"] += 1
+                return self._event(state, PHASE_UPDATE, now)
+            return None
+
+        if state.inactive_streak < policy.exit_cycles:
+            return None
+        event = self._event(state, PHASE_END, now)
+        state.episode_id = None
+        state.ended_at = now
+        return event
+
+    @staticmethod
+    def _event(state, phase, now):
+        return {
+            **state.last_payload,
+            "episode_id": state.episode_id,
+            "phase": phase,
+            "duration_s": round(now - state.started_at, 3),
+            "cycles": state.cycles,
+        }
+
+    def snapshot(self):
+        """Return episode counters and open episode IDs for runtime health."""
+        return {
+            **self.stats,
+            "open": {
+                alert_type: state.episode_id
+                for alert_type, state in self._states.items()
+                if state.episode_id is not None
+            },
+        }
@@ -0,0 +1,251 @@
+"""asyncio runtime orchestrator with executor-offloaded stages and per-stage timeouts."""
+
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+
+from .planning.software_architecture import (
+    RuntimeOrchestratorContract,
+    build_status_payload,
+    fatigue_alert_payload,
+    gate_alert,
+)
+from .scheduler import FixedRateScheduler
+
+STAGE_READ = "read"
+STAGE_DETECT = "detect"
+STAGE_PUBLISH = "publish"
+RUNTIME_STAGES = (STAGE_READ, STAGE_DETECT, STAGE_PUBLISH)
+DETECTION_SKIPPED_MODE = "detection-skipped"
+
+
+@dataclass(frozen=True)
+class StageTimeouts:
+    """Per-stage deadlines in seconds for one asyncio runtime cycle.
+
+    Defaults follow `AIPlan.max_latency_ms` for detection and
+    `ConnectivityConfig.max_alert_latency_s` for publishing.
+    """
+
+    read_s: float = 0.05
+    detect_s: float = 0.08
+    publish_s: float = 2.0
+
+    def for_stage(self, stage: str) -> float:
+        return float(getattr(self, f"{stage}_s"))
+
+
+class AsyncRuntimeOrchestrator:
+    """Runs `RuntimeOrchestratorContract` cycles on an asyncio event loop.
+
+    Callbacks may be coroutine functions or plain functions. Plain callbacks
+    run on one single-thread executor per stage, so a blocking frame read or
+    FaceMesh call never blocks the loop and a stage never runs concurrently
+    with itself. Every stage is awaited under its `StageTimeouts` deadline: a
+    timed-out read skips the cycle, and a timed-out detection publishes STATUS
+    with `ai_metrics.mode == "detection-skipped"`. Until a timed-out executor
+    call returns, later cycles skip that stage instead of queueing behind it.
+
+    Events are published in order by one publisher task, so CRASH is sent while
+    detection is still running, and STATUS overlaps the next cycle's capture.
+    A publish callback error is re-raised from `run()` or `close()`. An
+    optional `alerts` state machine turns per-cycle alert conditions into
+    episode events.
+    """
+
+    def __init__(
+        self,
+        contract: RuntimeOrchestratorContract,
+        timeouts: StageTimeouts | None = None,
+        crash_threshold_g: float = 2.5,
+        scheduler: FixedRateScheduler | None = None,
+        alerts=None,
+    ):
+        self.contract = contract
+        self.alerts = alerts
+        self.timeouts = timeouts or StageTimeouts()
+        self.crash_threshold_g = crash_threshold_g
+        self.scheduler = scheduler or FixedRateScheduler()
+        self.stats = {
+            "cycles": 0,
+            "published": 0,
+            "timeouts": dict.fromkeys(RUNTIME_STAGES, 0),
+            "busy_skips": dict.fromkeys(RUNTIME_STAGES, 0),
+        }
+        self._executors = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._publish_queue: asyncio.Queue | None = None
+        self._publisher: asyncio.Task | None = None
+        self._error: Exception | None = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_exc):
+        await self.close()
+
+    async def start(self):
+        """Create stage executors and the publisher task on the running loop."""
+        self._executors = {
+            stage: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"runtime-{stage}")
+            for stage in RUNTIME_STAGES
+        }
+        self._publish_queue = asyncio.Queue()
+        self._publisher = asyncio.create_task(self._publisher_task(), name="runtime-publisher")
+
+    async def close(self):
+        """Flush queued events, stop the publisher and release executor threads.
+
+        The publish executor is joined so the contract's storage is idle once
+        this returns; read and detection threads stuck past their timeout are
+        abandoned.
+        """
+        if self._publisher is None:
+            return
+        await self._publish_queue.join()
+        self._publisher.cancel()
+        await asyncio.gather(self._publisher, return_exceptions=True)
+        self._publisher = None
+        for stage, executor in self._executors.items():
+            executor.shutdown(wait=stage == STAGE_PUBLISH, cancel_futures=True)
+        self._raise_publish_error()
+
+    def _raise_publish_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    async def _call(self, stage, callback, *args, skip_if_busy=True):
+        """Await one stage callback under its timeout; returns `(completed, result)`."""
+        pending = self._inflight.get(stage)
+        if skip_if_busy and pending is not None and not pending.done():
+            self.stats["busy_skips"][stage] += 1
+            return False, None
+        is_coroutine = inspect.iscoroutinefunction(callback)
+        if is_coroutine:
+            future = asyncio.ensure_future(callback(*args))
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executors[stage], partial(callback, *args))
+        self._inflight[stage] = future
+        try:
+            # Shield so an executor call that outlives its deadline stays tracked as busy.
+            return True, await asyncio.wait_for(
+                asyncio.shield(future), self.timeouts.for_stage(stage)
+            )
+        except TimeoutError:
+            self.stats["timeouts"][stage] += 1
+            if is_coroutine:
+                future.cancel()  # executor threads cannot be interrupted; they stay busy
+            future.add_done_callback(_discard_late_result)
+            return False, None
+
+    def _publish(self, event_type, payload):
+        self._publish_queue.put_nowait((event_type, payload))
+
+    async def _publisher_task(self):
+        while True:
+            event_type, payload = await self._publish_queue.get()
+            try:
+                completed, _ = await self._call(
+                    STAGE_PUBLISH,
+                    self.contract.publish_runtime_event,
+                    event_type,
+                    payload,
+                    skip_if_busy=False,
+                )
+                self.stats["published"] += int(completed)
+            except Exception as exc:  # re-raised from run()/close(), like the inline loop
+                self._error = self._error or exc
+            finally:
+                self._publish_queue.task_done()
+
+    async def execute_cycle(self) -> dict[str, Any]:
+        """Run one capture/detect cycle; events are queued for the publisher task."""
+        self.stats["cycles"] += 1
+        completed, snapshot = await self._call(STAGE_READ, self.contract.read_sensor_snapshot)
+        if not completed:
+            return {
+                "crash_detected": False,
+                "fatigue_detected": False,
+                "status_payload": None,
+                "skipped_stages": [STAGE_READ],
+            }
+        snapshot = dict(snapshot)
+        g_force = float(snapshot.get("g_force", 0.0))
+        crash_detected = g_force > self.crash_threshold_g
+        crash_payload = gate_alert(self.alerts, "CRASH", crash_detected, {"g_force": g_force})
+        if crash_payload is not None:
+            self._publish("CRASH", crash_payload)
+
+        completed, fatigue_result = await self._call(
+            STAGE_DETECT, self.contract.detect_fatigue, snapshot
+        )
+        skipped_stages = []
+        if completed:
+            fatigue_result = dict(fatigue_result)
+        else:
+            fatigue_result = {"mode": DETECTION_SKIPPED_MODE}
+            skipped_stages.append(STAGE_DETECT)
+        fatigue_detected = bool(fatigue_result.get("is_drowsy", False))
+        fatigue_payload = gate_alert(
+            self.alerts, "FATIGUE", fatigue_detected, fatigue_alert_payload(fatigue_result)
+        )
+        if fatigue_payload is not None:
+            self._publish("FATIGUE", fatigue_payload)
+
+        status_payload = build_status_payload(g_force, fatigue_result)
+        self._publish("STATUS", status_payload)
+        return {
+            "crash_detected": crash_detected,
+            "fatigue_detected": fatigue_detected,
+            "status_payload": status_payload,
+            "skipped_stages": skipped_stages,
+        }
+
+    async def run(self, max_cycles=None):
+        """Run fixed-rate cycles until cancelled or `max_cycles` is reached."""
+        cycles = 0
+        while True:
+            self._raise_publish_error()
+            self.scheduler.start_cycle()
+            await self.execute_cycle()
+            cycles += 1
+            if max_cycles is not None and cycles >= max_cycles:
+                return
+            await self.scheduler.wait_next_async()
+
+
+def _discard_late_result(future):
+    if not future.cancelled():
+        future.exception()  # already counted as a timeout; retrieve to silence the warning
+
+
+async def execute_runtime_cycle_async(
+    contract: RuntimeOrchestratorContract,
+    crash_threshold_g: float = 2.5,
+    timeouts: StageTimeouts | None = None,
+) -> dict[str, Any]:
+    """Execute one cycle with async/offloaded callbacks and wait for its events to publish."""
+    async with AsyncRuntimeOrchestrator(contract, timeouts, crash_threshold_g) as orchestrator:
+        return await orchestrator.execute_cycle()
+
+
+async def run_monitoring_loop_async(
+    contract: RuntimeOrchestratorContract,
+    loop_delay_s: float = 0.05,
+    max_cycles: int | None = None,
+    timeouts: StageTimeouts | None = None,
+    alerts=None,
+) -> AsyncRuntimeOrchestrator:
+    """Async counterpart of `run_monitoring_loop`; returns the orchestrator for its stats."""
+    orchestrator = AsyncRuntimeOrchestrator(
+        contract, timeouts, scheduler=FixedRateScheduler(period_s=loop_delay_s), alerts=alerts
+    )
+    async with orchestrator:
+        await orchestrator.run(max_cycles=max_cycles)
+    return orchestrator
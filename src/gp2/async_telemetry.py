@@ -0,0 +1,248 @@
+"""asyncio-native MQTT telemetry transport with cooperative publish/replay tasks."""
+
+import asyncio
+import time
+from collections import deque
+
+from .telemetry import TOPIC_ALERTS, TelemetryClient
+
+
+class AsyncTelemetryClient(TelemetryClient):
+    """`TelemetryClient` variant whose network I/O runs as tasks on an asyncio loop.
+
+    `send_alert`, `send_telemetry`, `send_health` and `health_snapshot` keep the
+    synchronous signatures of the base class but never block: messages are
+    appended to an in-memory outbox and drained by a publisher task. Paho's
+    socket is driven from the event loop (`add_reader`/`add_writer`) instead of
+    its background thread, and reconnect backoff uses `asyncio.sleep`.
+    """
+
+    def __init__(self, device_id="helmet_01", config=None, batch_size=16):
+        self.batch_size = max(1, batch_size)
+        self.connected = False
+        self.alert_outbox = deque()
+        self.status_outbox = deque()
+        self._loop = None
+        self._tasks = []
+        self._outbox_ready = asyncio.Event()
+        self._outbox_drained = asyncio.Event()
+        self._reconnect_needed = asyncio.Event()
+        self._replay_needed = asyncio.Event()
+        self._connect_settled = asyncio.Event()
+        self._has_connected = False
+        super().__init__(device_id=device_id, config=config)
+        self.alert_outbox = deque(maxlen=self.config.offline_queue_max_items)
+        self.status_outbox = deque(maxlen=self.config.offline_queue_max_items)
+        self._outbox_drained.set()
+
+    def _connect_and_start_loop(self):
+        """Defer connecting to `start()`; no paho network thread is started."""
+        return False
+
+    async def start(self):
+        """Attach the client socket to the running loop and spawn transport tasks."""
+        self._loop = asyncio.get_running_loop()
+        if self.client is not None and hasattr(self.client, "on_socket_open"):
+            self.client.on_socket_open = self._on_socket_open
+            self.client.on_socket_close = self._on_socket_close
+            self.client.on_socket_register_write = self._on_socket_register_write
+            self.client.on_socket_unregister_write = self._on_socket_unregister_write
+            self.client.on_connect = self._on_connect
+            self.client.on_disconnect = self._on_disconnect
+        self._tasks = [
+            asyncio.create_task(self._publisher_task(), name="telemetry-publisher"),
+            asyncio.create_task(self._reconnect_task(), name="telemetry-reconnect"),
+            asyncio.create_task(self._replay_task(), name="telemetry-replay"),
+            asyncio.create_task(self._housekeeping_task(), name="telemetry-housekeeping"),
+        ]
+        self._reconnect_needed.set()
+
+    async def stop(self):
+        """Cancel transport tasks and disconnect the client."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.client is not None and self.connected:
+            self.client.disconnect()
+        self.connected = False
+
+    async def drain(self, timeout_s=None):
+        """Wait until both outboxes have been handed to the (connected) transport."""
+        await asyncio.wait_for(self._outbox_drained.wait(), timeout_s)
+
+    # --- paho socket integration (callbacks may fire on an executor thread) ---
+
+    def _call_in_loop(self, func, *args):
+        """Run `func` inline on the loop thread, where paho closes the socket right after."""
+        if self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            func(*args)
+        else:
+            self._loop.call_soon_threadsafe(func, *args)
+
+    def _on_socket_open(self, client, _userdata, sock):
+        self._call_in_loop(self._loop.add_reader, sock, client.loop_read)
+
+    def _on_socket_close(self, _client, _userdata, sock):
+        self._call_in_loop(self._loop.remove_reader, sock)
+
+    def _on_socket_register_write(self, client, _userdata, sock):
+        self._call_in_loop(self._loop.add_writer, sock, client.loop_write)
+
+    def _on_socket_unregister_write(self, _client, _userdata, sock):
+        self._call_in_loop(self._loop.remove_writer, sock)
+
+    def _on_connect(self, client, userdata, flags, rc, *args):
+        """Paho callback: the link is up only once the broker accepts the CONNACK."""
+        super()._on_connect(client, userdata, flags, rc, *args)
+        if client is self.client:
+            self._call_in_loop(self._mark_connected if rc == 0 else self._mark_disconnected)
+
+    def _on_disconnect(self, client, userdata, rc, *args):
+        """Paho callback: keep the base failure bookkeeping, then schedule a reconnect."""
+        super()._on_disconnect(client, userdata, rc, *args)
+        if client is self.client:
+            self._call_in_loop(self._mark_disconnected)
+
+    def _mark_connected(self):
+        self.connected = True
+        self._connect_settled.set()
+        self._replay_needed.set()
+        self._outbox_ready.set()
+
+    def _mark_disconnected(self):
+        self.connected = False
+        self._connect_settled.set()
+        self._reconnect_needed.set()
+
+    # --- non-blocking overrides of the synchronous transport policy ---
+
+    def _publish(self, topic, payload, qos):
+        """Queue a message for the publisher task; alerts bypass status backlog."""
+        if topic == TOPIC_ALERTS:
+            self.alert_outbox.append((topic, payload, qos))
+        else:
+            self.status_outbox.append((topic, payload, qos))
+        self._outbox_drained.clear()
+        self._outbox_ready.set()
+        return True
+
+    def _attempt_reconnect(self):
+        """Signal the reconnect task instead of sleeping in the caller."""
+        self.connected = False
+        self._reconnect_needed.set()
+        return False
+
+    def _flush_offline_queue(self):
+        """Signal the replay task; replay progresses in cooperative batches."""
+        if self.offline_queue:
+            self._replay_needed.set()
+        return {"replayed": 0, "remaining": len(self.offline_queue)}
+
+    def health_snapshot(self):
+        """Return base transport health plus outbox depth and connection state."""
+        snapshot = super().health_snapshot()
+        snapshot["connected"] = self.connected
+        snapshot["outbox_depth"] = len(self.alert_outbox) + len(self.status_outbox)
+        return snapshot
+
+    # --- cooperative tasks ---
+
+    def _next_batch(self):
+        batch = []
+        while self.alert_outbox and len(batch) < self.batch_size:
+            batch.append(self.alert_outbox.popleft())
+        while self.status_outbox and len(batch) < self.batch_size:
+            batch.append(self.status_outbox.popleft())
+        return batch
+
+    async def _publisher_task(self):
+        while True:
+            await self._outbox_ready.wait()
+            self._outbox_ready.clear()
+            while self.connected or self.client is None:
+                batch = self._next_batch()
+                if not batch:
+                    self._outbox_drained.set()
+                    break
+                for topic, payload, qos in batch:
+                    TelemetryClient._publish(self, topic, payload, qos)
+                await asyncio.sleep(0)
+            else:
+                # Outboxes keep buffering (bounded) until the reconnect task succeeds.
+                self._reconnect_needed.set()
+
+    async def _reconnect_task(self):
+        while True:
+            await self._reconnect_needed.wait()
+            self._reconnect_needed.clear()
+            if self.client is None or self.connected:
+                continue
+            self._connect_settled.clear()
+            if not await self._reconnect_with_backoff():
+                continue
+            # `connected` is set by the CONNACK callback, not by the socket connect returning.
+            # asyncio.timeout, unlike wait_for on 3.11, never swallows a cancel from stop().
+            try:
+                async with asyncio.timeout(self.config.publish_ack_timeout_s):
+                    await self._connect_settled.wait()
+            except TimeoutError:
+                self.fault_counters["reconnect_failures"] += 1
+            if not self.connected:
+                await asyncio.sleep(self.config.reconnect_initial_delay_s)
+                self._reconnect_needed.set()
+
+    async def _reconnect_with_backoff(self):
+        loop = asyncio.get_running_loop()
+        delay = self.config.reconnect_initial_delay_s
+        attempts = 0
+        while (
+            delay <= self.config.reconnect_max_delay_s
+            and attempts < self.config.max_reconnect_attempts
+        ):
+            attempts += 1
+            self.fault_counters["reconnect_attempts"] += 1
+            try:
+                if self._has_connected:
+                    await loop.run_in_executor(None, self.client.reconnect)
+                else:
+                    await loop.run_in_executor(
+                        None, self.client.connect, self.config.broker, self.config.port, 60
+                    )
+                    self._has_connected = True
+                return True
+            except (OSError, ConnectionError, ValueError):
+                self.fault_counters["reconnect_failures"] += 1
+                await asyncio.sleep(delay)
+                delay *= 2
+        return False
+
+    async def _replay_task(self):
+        while True:
+            await self._replay_needed.wait()
+            self._replay_needed.clear()
+            while self.offline_queue and self.connected and not self._inflight_full():
+                batch = self.offline_queue[: self.batch_size]
+                self.offline_queue = self.offline_queue[self.batch_size :]
+                for item in batch:
+                    self.fault_counters["replay_attempts"] += 1
+                    if not TelemetryClient._publish(
+                        self, item["topic"], item["payload"], item["qos"]
+                    ):
+                        self.fault_counters["replay_failures"] += 1
+                await asyncio.sleep(0)
+
+    async def _housekeeping_task(self, interval_s=1.0):
+        while True:
+            await asyncio.sleep(interval_s)
+            if self.client is not None and self.connected and hasattr(self.client, "loop_misc"):
+                self.client.loop_misc()
+            self._expire_inflight(now=time.monotonic())
+            if self.offline_queue and self.connected:
+                self._replay_needed.set()
@@ -0,0 +1,52 @@
+"""Micro-benchmarks for runtime hot paths (run with `python -m gp2.benchmarks`)."""
+
+import json
+
+from ..loadtest import run_load_test
+from .runtime import (
+    benchmark_crash_path,
+    benchmark_cycle_profiler,
+    benchmark_face_redaction,
+    benchmark_runtime_topology,
+    benchmark_warm_restart,
+)
+from .storage import (
+    benchmark_storage_insert_scaling,
+    benchmark_storage_partition_retention,
+    benchmark_storage_replay,
+    benchmark_storage_section_dedupe,
+    benchmark_storage_write_behind,
+    benchmark_trend_queries,
+    benchmark_trip_history,
+)
+from .telemetry import benchmark_payload_codecs
+
+BENCHMARKS = {
+    "codec": benchmark_payload_codecs,
+    "load": run_load_test,
+    "storage": benchmark_storage_write_behind,
+    "storage-scaling": benchmark_storage_insert_scaling,
+    "storage-partitions": benchmark_storage_partition_retention,
+    "storage-replay": benchmark_storage_replay,
+    "storage-dedupe": benchmark_storage_section_dedupe,
+    "trends": benchmark_trend_queries,
+    "redaction": benchmark_face_redaction,
+    "trips": benchmark_trip_history,
+    "topology": benchmark_runtime_topology,
+    "crash-path": benchmark_crash_path,
+    "profiler": benchmark_cycle_profiler,
+    "warm-restart": benchmark_warm_restart,
+}
+
+
+def main(argv: list[str]) -> int:
+    """Run the named benchmarks (default: all) and print JSON results."""
+    names = argv[1:] or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}. Choose from: {', '.join(BENCHMARKS)}")
+        return 2
+
+    for name in names:
+        print(json.dumps({name: BENCHMARKS[name]()}, indent=2))
+    return 0
@@ -0,0 +1,7 @@
+"""Entry point for `python -m gp2.benchmarks [name ...]`."""
+
+import sys
+
+from . import main
+
+raise SystemExit(main(sys.argv))
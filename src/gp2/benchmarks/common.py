@@ -0,0 +1,47 @@
+"""Shared benchmark fixtures and timing helpers."""
+
+import time
+
+
+def sample_status_payload() -> dict:
+    """Return a representative STATUS payload as published by the runtime loop."""
+    interface = {"available": True, "mode": "hardware"}
+    return {
+        "device_id": "helmet_01",
+        "type": "STATUS",
+        "perclos": 0.0625,
+        "g_force": 1.0234,
+        "sensor_health": {
+            "imu": {**interface, "bus": "I2C", "direction": "bidirectional"},
+            "camera": {**interface, "bus": "CSI/USB", "direction": "camera->board"},
+            "ir": {**interface, "bus": "GPIO/PWM", "direction": "board->ir"},
+        },
+        "power_profile": {
+            "average_ma": 948.0,
+            "peak_ma": 1812.0,
+            "standby_ma": 269.0,
+            "bounds_valid": True,
+        },
+        "ai_metrics": {
+            "mode": "heuristic-ear-perclos",
+            "latency_ms": 12.731,
+            "false_alert": False,
+        },
+        "runtime_health": {
+            "telemetry": {
+                "connected": True,
+                "offline_queue_depth": 0,
+                "offline_queue_max_items": 200,
+                "degraded_mode": False,
+            },
+            "fault_counters": {"sensor_read_failures": 0, "detect_failures": 0},
+        },
+    }
+
+
+def time_per_call_us(func, iterations: int) -> float:
+    """Return the mean wall time of `func()` in microseconds over `iterations` calls."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1e6 / max(1, iterations)
@@ -0,0 +1,207 @@
+"""Runtime benchmarks: topology, crash path, profiler, redaction and warm restart."""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from ..crash_path import CrashFastPath
+from ..detection import FatigueDetector
+from ..pipeline import PipelinedRuntime
+from ..planning.carry_forward import EmergencyRoutingPolicy
+from ..planning.software_architecture import (
+    RuntimeOrchestratorContract,
+    RuntimeTopology,
+    execute_runtime_cycle,
+    pipelined_topology,
+)
+from ..profiling import CycleProfiler
+from ..redaction import FaceRedactor
+from ..warm_restart import WarmRestartStore
+from .common import time_per_call_us
+
+
+def benchmark_face_redaction(frames: int = 200, height: int = 240, width: int = 320) -> dict:
+    """Measure redaction fps with reused landmark boxes vs the detection fallback."""
+    rng = np.random.default_rng(0)
+    sample = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    face_box = (0.35, 0.2, 0.65, 0.7)
+    results = {}
+    for name, box in (("landmarks", face_box), ("fallback", None)):
+        redactor = FaceRedactor()
+        for _ in range(frames):
+            _redacted, source = redactor.redact(sample, box)
+        results[name] = {"fps": redactor.fps(), "source": source}
+    results["speedup"] = (
+        results["landmarks"]["fps"] / results["fallback"]["fps"]
+        if results["fallback"]["fps"]
+        else None
+    )
+    return results
+
+
+def benchmark_runtime_topology(
+    cycles: int = 100,
+    period_s: float = 0.02,
+    read_ms: float = 5.0,
+    detect_ms: float = 15.0,
+    publish_ms: float = 5.0,
+) -> dict:
+    """Compare STATUS throughput and capture-to-publish latency, inline vs pipelined.
+
+    Stages sleep for their cost, modelling blocking I/O and native code that
+    releases the GIL (camera read, FaceMesh, MQTT publish).
+    """
+
+    def read_sensor_snapshot():
+        time.sleep(read_ms / 1000.0)
+        return {"g_force": 1.0}
+
+    def detect_fatigue(_snapshot):
+        time.sleep(detect_ms / 1000.0)
+        return {"is_drowsy": False, "perclos": 0.1}
+
+    def publish_runtime_event(_event_type, _payload):
+        time.sleep(publish_ms / 1000.0)
+
+    contract = RuntimeOrchestratorContract(
+        read_sensor_snapshot=read_sensor_snapshot,
+        detect_fatigue=detect_fatigue,
+        publish_runtime_event=publish_runtime_event,
+    )
+    results = {"target_hz": 1.0 / period_s}
+    for name, topology in (("inline", RuntimeTopology()), ("pipelined", pipelined_topology())):
+        runtime = PipelinedRuntime(contract, topology, period_s=period_s)
+        began = time.perf_counter()
+        runtime.run(max_cycles=cycles)
+        elapsed = time.perf_counter() - began
+        snapshot = runtime.snapshot()
+        results[name] = {
+            "status_hz": snapshot["published"] / elapsed,
+            "end_to_end_p50_ms": snapshot["end_to_end_p50_ms"],
+            "end_to_end_p95_ms": snapshot["end_to_end_p95_ms"],
+            "dropped": snapshot["dropped"],
+            "overruns": runtime.scheduler.overruns,
+        }
+    return results
+
+
+def benchmark_crash_path(
+    impacts: int = 10, impulse_ms: float = 30.0, frame_ms: float = 30.0, detect_ms: float = 40.0
+) -> dict:
+    """Compare impact-to-CRASH-publish latency via the camera cycle and the IMU fast path.
+
+    Each impact holds 3 g for `impulse_ms`; the 20 Hz cycle spends `frame_ms` on
+    capture and `detect_ms` on detection, so it may sample after the impulse ends.
+    """
+    budget_ms = EmergencyRoutingPolicy().max_route_latency_ms
+    rng = np.random.default_rng(0)
+    results = {"impacts": impacts, "budget_ms": budget_ms}
+    for mode in ("cycle", "fast_path"):
+        impact = {"active": False, "started": None, "routed": True}
+        latencies = []
+
+        def read_accel(impact=impact):
+            return (3.0, 0.0, 0.0) if impact["active"] else (0.0, 0.0, 1.0)
+
+        def route(_g_force, impact=impact, latencies=latencies):
+            if not impact["routed"]:
+                impact["routed"] = True
+                latencies.append((time.perf_counter() - impact["started"]) * 1000.0)
+
+        fast_path = CrashFastPath(read_accel, route, refractory_s=impulse_ms / 1000.0)
+
+        def read_sensor_snapshot(read_accel=read_accel, fast_path=fast_path, mode=mode):
+            time.sleep(frame_ms / 1000.0)
+            if mode == "fast_path":
+                return {"g_force": fast_path.latest_g_force}
+            return {"g_force": float(np.linalg.norm(read_accel()))}
+
+        def detect_fatigue(_snapshot):
+            time.sleep(detect_ms / 1000.0)
+            return {"is_drowsy": False}
+
+        def publish_runtime_event(event_type, payload, route=route, mode=mode):
+            if event_type == "CRASH" and mode == "cycle":
+                route(payload["g_force"])
+
+        runtime = PipelinedRuntime(
+            RuntimeOrchestratorContract(
+                read_sensor_snapshot, detect_fatigue, publish_runtime_event
+            ),
+            RuntimeTopology(),
+            period_s=0.05,
+        )
+        loop = threading.Thread(target=runtime.run, name="benchmark-cycle")
+        if mode == "fast_path":
+            fast_path.start()
+        loop.start()
+        for _ in range(impacts):
+            time.sleep(float(rng.uniform(0.15, 0.25)))
+            impact.update(active=True, started=time.perf_counter(), routed=False)
+            time.sleep(impulse_ms / 1000.0)
+            impact["active"] = False
+        time.sleep(0.2)
+        runtime.stop()
+        loop.join()
+        fast_path.stop()
+        results[mode] = {
+            "detected": len(latencies),
+            "p50_ms": float(np.percentile(latencies, 50)) if latencies else None,
+            "max_ms": max(latencies, default=None),
+            "within_budget": sum(latency <= budget_ms for latency in latencies),
+        }
+    return results
+
+
+def benchmark_cycle_profiler(cycles: int = 20000, period_ms: float = 50.0) -> dict:
+    """Measure the per-cycle cost of `CycleProfiler` instrumentation with no-op callbacks."""
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    contract = RuntimeOrchestratorContract(
+        read_sensor_snapshot=lambda: {"frame": frame, "g_force": 1.0},
+        detect_fatigue=lambda _snapshot: {"is_drowsy": False, "perclos": 0.1},
+        publish_runtime_event=lambda _event_type, _payload: None,
+    )
+    profiler = CycleProfiler()
+    plain_us = time_per_call_us(lambda: execute_runtime_cycle(contract), cycles)
+    instrumented = profiler.instrument(contract)
+    profiled_us = time_per_call_us(lambda: execute_runtime_cycle(instrumented), cycles)
+    overhead_us = max(0.0, profiled_us - plain_us)
+    return {
+        "cycles": cycles,
+        "plain_cycle_us": round(plain_us, 2),
+        "profiled_cycle_us": round(profiled_us, 2),
+        "overhead_us": round(overhead_us, 2),
+        "overhead_pct_of_period": round(overhead_us / (period_ms * 1000.0) * 100.0, 4),
+        "recorded_cycles": profiler.cycle_ms.count,
+    }
+
+
+def benchmark_warm_restart(iterations: int = 2000) -> dict:
+    """Time warm-restart snapshot save/load with a full PERCLOS window."""
+    detector = FatigueDetector()
+    detector.perclos_buffer.extend(int(bit) for bit in np.random.default_rng(0).random(1000) < 0.1)
+    state = {
+        "runtime_state": {"sensor_read_failures": 3, "detect_failures": 1},
+        "quality_tier_index": 0,
+        "detector": detector.export_state(),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        store = WarmRestartStore(os.path.join(tmp, "warm.bin"))
+        save_us = time_per_call_us(
+            lambda: store.save({**state, "detector": detector.export_state()}), iterations
+        )
+        restored = FatigueDetector()
+        load_us = time_per_call_us(
+            lambda: restored.restore_state(store.load()["detector"]), iterations
+        )
+        store.close()
+    return {
+        "payload_bytes": len(json.dumps(state, separators=(",", ":"))),
+        "save_us": round(save_us, 1),
+        "load_and_restore_us": round(load_us, 1),
+        "perclos_matches": restored._current_perclos() == detector._current_perclos(),
+    }
@@ -0,0 +1,341 @@
+"""Storage, trend and trip-history benchmarks."""
+
+import json
+import os
+import tempfile
+import time
+
+from ..planning.storage_strategy import LocalStorageBuffer, StorageEvent, StoragePolicy
+from ..timeseries import TimeSeriesStore
+from .common import sample_status_payload
+
+
+def _process_bytes_written() -> int | None:
+    """Return bytes passed to write(2) by this process (Linux `/proc/self/io` wchar)."""
+    try:
+        with open("/proc/self/io", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _storage_run(policy: StoragePolicy, events: list[StorageEvent]) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "events.db")
+        buffer = LocalStorageBuffer(policy=policy, db_path=db_path)
+        logical_bytes = sum(len(json.dumps(event.payload)) for event in events)
+        written_before = _process_bytes_written()
+        start = time.perf_counter()
+        for event in events:
+            buffer.add_event(event)
+        buffer.flush()
+        elapsed_s = time.perf_counter() - start
+        written_after = _process_bytes_written()
+        stats = dict(buffer.stats)
+        buffer.close()
+
+    bytes_written = (
+        written_after - written_before
+        if written_before is not None and written_after is not None
+        else None
+    )
+    return {
+        "events_per_s": len(events) / max(elapsed_s, 1e-9),
+        "commits": stats["commits"],
+        "flushes": stats["flushes"],
+        "logical_bytes": logical_bytes,
+        "bytes_written": bytes_written,
+        "write_amplification": (
+            bytes_written / logical_bytes if bytes_written is not None and logical_bytes else None
+        ),
+    }
+
+
+def benchmark_storage_write_behind(events: int = 2000, alert_every: int = 100) -> dict:
+    """Compare per-event commits with write-behind group commits on a file database."""
+    now = time.time()
+    sample = [
+        StorageEvent(
+            event_type="alert_fatigue" if index % alert_every == alert_every - 1 else "status",
+            payload={"perclos": 0.05, "g_force": 1.0, "ai_metrics": {"latency_ms": 12.5}},
+            timestamp=now + index * 0.05,
+        )
+        for index in range(events)
+    ]
+    base = {"on_device_queue_max_items": events * 2}
+    return {
+        "immediate": _storage_run(
+            StoragePolicy(**base, sqlite_journal_mode="DELETE", sqlite_synchronous="FULL"),
+            sample,
+        ),
+        "write_behind": _storage_run(
+            StoragePolicy(**base, write_behind_enabled=True, write_behind_flush_interval_s=60.0),
+            sample,
+        ),
+    }
+
+
+def benchmark_storage_insert_scaling(
+    table_sizes: tuple[int, ...] = (1000, 10000, 50000), probe_events: int = 500
+) -> dict:
+    """Measure per-insert cost once the table is full at several capacity limits."""
+    results = {}
+    now = time.time()
+    payload = {"perclos": 0.05, "g_force": 1.0}
+    for size in table_sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            buffer = LocalStorageBuffer(
+                policy=StoragePolicy(on_device_queue_max_items=size),
+                db_path=os.path.join(tmp_dir, "events.db"),
+            )
+            buffer.add_events(
+                [
+                    StorageEvent("status", payload, timestamp=now - size + index)
+                    for index in range(size)
+                ]
+            )
+            start = time.perf_counter()
+            for index in range(probe_events):
+                buffer.add_event(StorageEvent("status", payload, timestamp=now + index))
+            elapsed_s = time.perf_counter() - start
+            results[str(size)] = {
+                "insert_us": elapsed_s * 1e6 / probe_events,
+                "row_count": buffer.row_count,
+                "prunes": buffer.stats["prunes"],
+            }
+            buffer.close()
+    return results
+
+
+def benchmark_storage_partition_retention(
+    hours: int = 72, events_per_hour: int = 720, retention_hours: int = 24
+) -> dict:
+    """Simulate a multi-day ride with hourly retention and track prune cost and file size."""
+    policy = StoragePolicy(
+        on_device_retention_hours=retention_hours,
+        on_device_queue_max_items=events_per_hour * (retention_hours + 2),
+    )
+    payload = {"perclos": 0.05, "g_force": 1.0, "ai_metrics": {"latency_ms": 12.5}}
+    start = time.time()
+    prune_ms = []
+    file_bytes = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        buffer = LocalStorageBuffer(policy=policy, db_path=os.path.join(tmp_dir, "events.db"))
+        for hour in range(hours):
+            hour_start = start + hour * 3600
+            buffer.add_events(
+                [
+                    StorageEvent(
+                        "status", payload, timestamp=hour_start + index * 3600 / events_per_hour
+                    )
+                    for index in range(events_per_hour)
+                ]
+            )
+            began = time.perf_counter()
+            buffer.prune_retention(now=hour_start + 3600)
+            prune_ms.append((time.perf_counter() - began) * 1000.0)
+            file_bytes.append(buffer.database_bytes)
+        stats = dict(buffer.stats)
+        row_count = buffer.row_count
+        partitions = len(buffer.partitions)
+        buffer.close()
+
+    steady = file_bytes[retention_hours:] or file_bytes
+    return {
+        "hours": hours,
+        "row_count": row_count,
+        "partitions": partitions,
+        "partitions_dropped": stats["partitions_dropped"],
+        "prune_ms_mean": sum(prune_ms) / len(prune_ms),
+        "prune_ms_max": max(prune_ms),
+        "file_bytes_steady_min": min(steady),
+        "file_bytes_steady_max": max(steady),
+        "file_bytes_final": file_bytes[-1],
+    }
+
+
+def benchmark_storage_replay(events: int = 20000, page_size: int = 256) -> dict:
+    """Replay a long outage backlog page by page and acknowledge each page by cursor."""
+    now = time.time()
+    payload = {"perclos": 0.05, "g_force": 1.0}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        buffer = LocalStorageBuffer(
+            policy=StoragePolicy(on_device_queue_max_items=events * 2),
+            db_path=os.path.join(tmp_dir, "events.db"),
+        )
+        buffer.add_events(
+            [
+                StorageEvent("status", payload, timestamp=now - events + index)
+                for index in range(events)
+            ]
+        )
+        start = time.perf_counter()
+        cursor = 0
+        pages = 0
+        replayed = 0
+        while True:
+            page = buffer.pending_replay_events(cursor=cursor, limit=page_size)
+            if not page:
+                break
+            cursor = int(page[-1].event_id or cursor)
+            buffer.mark_synced_through(cursor)
+            pages += 1
+            replayed += len(page)
+        elapsed_s = time.perf_counter() - start
+        buffer.close()
+    return {
+        "events": events,
+        "replayed": replayed,
+        "pages": pages,
+        "events_per_s": replayed / max(elapsed_s, 1e-9),
+        "page_ms": elapsed_s * 1000.0 / max(1, pages),
+    }
+
+
+def benchmark_storage_section_dedupe(hours: float = 24.0, status_hz: float = 0.25) -> dict:
+    """Compare database size and bytes written with and without payload section dedupe."""
+    events = int(hours * 3600 * status_hz)
+    start = time.time() - hours * 3600
+    samples = []
+    for index in range(events):
+        payload = sample_status_payload()
+        payload["perclos"] = (index % 97) / 1000.0
+        payload["g_force"] = 1.0 + (index % 13) / 100.0
+        payload["ai_metrics"]["latency_ms"] = 10.0 + (index % 31) / 10.0
+        payload["runtime_health"]["fault_counters"]["sensor_read_failures"] = index // 600
+        samples.append(StorageEvent("status", payload, timestamp=start + index / status_hz))
+
+    results = {}
+    for name, sections in (("full", ()), ("deduped", StoragePolicy().payload_dedupe_sections)):
+        policy = StoragePolicy(
+            on_device_queue_max_items=events * 2,
+            write_behind_enabled=True,
+            write_behind_max_batch=64,
+            write_behind_flush_interval_s=3600.0,
+            payload_dedupe_sections=sections,
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            buffer = LocalStorageBuffer(policy=policy, db_path=os.path.join(tmp_dir, "events.db"))
+            written_before = _process_bytes_written()
+            for event in samples:
+                buffer.add_event(event)
+            buffer.flush()
+            buffer.checkpoint()
+            written_after = _process_bytes_written()
+            results[name] = {
+                "events": events,
+                "database_bytes": buffer.database_bytes,
+                "bytes_written": (
+                    written_after - written_before
+                    if written_before is not None and written_after is not None
+                    else None
+                ),
+            }
+            buffer.close()
+
+    for key in ("database_bytes", "bytes_written"):
+        full, deduped = results["full"][key], results["deduped"][key]
+        results[f"{key}_ratio"] = full / deduped if full and deduped else None
+    return results
+
+
+def benchmark_trend_queries(hours: float = 2.0, sample_hz: float = 5.0) -> dict:
+    """Compare per-minute PERCLOS trends from JSON event rows and the columnar store."""
+    samples = int(hours * 3600 * sample_hz)
+    start = 3600.0 * int((time.time() - hours * 3600) // 3600)
+    timestamps = [start + index / sample_hz for index in range(samples)]
+    perclos = [(index % 600) / 1000.0 for index in range(samples)]
+
+    store = TimeSeriesStore(raw_retention_s=hours * 3600 + 60)
+    began = time.perf_counter()
+    for timestamp, value in zip(timestamps, perclos, strict=True):
+        store.append(timestamp, perclos=value, g_force=1.0)
+    columnar_append_us = (time.perf_counter() - began) * 1e6 / max(1, samples)
+    began = time.perf_counter()
+    columnar_trend = store.trend("perclos", start, start + hours * 3600)
+    columnar_query_ms = (time.perf_counter() - began) * 1000.0
+    series = store.series["perclos"]
+    columnar_bytes = sum(chunk.offsets.nbytes + chunk.values.nbytes for chunk in series.chunks)
+
+    buffer = LocalStorageBuffer(policy=StoragePolicy(on_device_queue_max_items=samples * 2))
+    buffer.add_events(
+        [
+            StorageEvent("status", {"perclos": value, "g_force": 1.0}, timestamp=timestamp)
+            for timestamp, value in zip(timestamps, perclos, strict=True)
+        ]
+    )
+    began = time.perf_counter()
+    minutes: dict[int, list[float]] = {}
+    for record in buffer.iter_events(event_type="status", start_ts=start):
+        minutes.setdefault(int(record.timestamp // 60), []).append(record.payload["perclos"])
+    row_trend = [sum(values) / len(values) for _, values in sorted(minutes.items())]
+    row_query_ms = (time.perf_counter() - began) * 1000.0
+    row_bytes = buffer.database_bytes
+    buffer.close()
+
+    return {
+        "samples": samples,
+        "trend_points": len(columnar_trend),
+        "columnar": {
+            "append_us": columnar_append_us,
+            "trend_query_ms": columnar_query_ms,
+            "raw_bytes": columnar_bytes,
+        },
+        "json_rows": {"trend_query_ms": row_query_ms, "database_bytes": row_bytes},
+        "max_mean_abs_diff": max(
+            (
+                abs(point["mean"] - mean)
+                for point, mean in zip(columnar_trend, row_trend, strict=False)
+            ),
+            default=0.0,
+        ),
+    }
+
+
+def benchmark_trip_history(trips: int = 20, events_per_trip: int = 2000) -> dict:
+    """Compare reading precomputed trip summaries with rescanning every event."""
+    policy = StoragePolicy(
+        write_behind_enabled=True,
+        write_behind_max_batch=256,
+        on_device_queue_max_items=trips * events_per_trip * 2,
+        trip_idle_gap_s=60.0,
+    )
+    buffer = LocalStorageBuffer(policy=policy)
+    start = time.time() - trips * (events_per_trip + 600)
+    began = time.perf_counter()
+    for trip in range(trips):
+        trip_start = start + trip * (events_per_trip + 600)
+        for second in range(events_per_trip):
+            g_force = 1.2 if second % 10 else 1.0
+            buffer.add_event(
+                StorageEvent("status", {"g_force": g_force}, timestamp=trip_start + second)
+            )
+    buffer.flush()
+    ingest_us = (time.perf_counter() - began) * 1e6 / (trips * events_per_trip)
+
+    began = time.perf_counter()
+    summaries = buffer.trip_history()
+    summary_query_ms = (time.perf_counter() - began) * 1000.0
+
+    began = time.perf_counter()
+    rescanned = {}
+    last_ts = None
+    for record in buffer.iter_events(event_type="status"):
+        if last_ts is None or record.timestamp - last_ts > policy.trip_idle_gap_s:
+            rescanned[record.timestamp] = 0
+            trip_key = record.timestamp
+        rescanned[trip_key] += 1
+        last_ts = record.timestamp
+    rescan_query_ms = (time.perf_counter() - began) * 1000.0
+    buffer.close()
+    return {
+        "events": trips * events_per_trip,
+        "trips": len(summaries),
+        "rescanned_trips": len(rescanned),
+        "ingest_us_per_event": ingest_us,
+        "summary_query_ms": summary_query_ms,
+        "rescan_query_ms": rescan_query_ms,
+    }
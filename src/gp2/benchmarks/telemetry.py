@@ -0,0 +1,25 @@
+"""Telemetry payload benchmarks."""
+
+from ..codec import resolve_payload_codec
+from ..planning.connectivity import PAYLOAD_SCHEMA_VERSIONS
+from .common import sample_status_payload, time_per_call_us
+
+
+def benchmark_payload_codecs(iterations: int = 2000, payload: dict | None = None) -> dict:
+    """Compare encode/decode time and wire size of each payload codec against JSON."""
+    sample = payload if payload is not None else sample_status_payload()
+    results = {}
+    for name in PAYLOAD_SCHEMA_VERSIONS:
+        codec = resolve_payload_codec(name)
+        encoded = codec.encode(sample)
+        wire = encoded.encode("utf-8") if isinstance(encoded, str) else encoded
+        results[name] = {
+            "size_bytes": len(wire),
+            "encode_us": time_per_call_us(lambda c=codec: c.encode(sample), iterations),
+            "decode_us": time_per_call_us(lambda c=codec, w=wire: c.decode(w), iterations),
+        }
+
+    baseline = results["json"]["size_bytes"]
+    for stats in results.values():
+        stats["size_ratio_vs_json"] = stats["size_bytes"] / baseline
+    return results
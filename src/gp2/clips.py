@@ -0,0 +1,296 @@
+"""Pre/post-event camera clip buffering per `ClipBufferContract`."""
+
+import json
+import logging
+import math
+import os
+import queue
+import threading
+import time
+import uuid
+import zipfile
+import zlib
+from collections import deque
+from dataclasses import asdict, dataclass, field, replace
+
+import numpy as np
+
+from .planning.carry_forward import ClipBufferContract
+from .planning.storage_strategy import EventClipMetadata, storage_data_dir
+from .redaction import FaceRedactor, face_box_from_landmarks
+
+try:
+    import cv2  # type: ignore
+except ImportError:  # pragma: no cover
+    cv2 = None
+
+logger = logging.getLogger(__name__)
+
+CLIP_DIRNAME = "clips"
+
+
+def clip_output_dir(db_path=":memory:"):
+    """Return the clip directory under the storage data directory (see `storage_data_dir`)."""
+    return os.path.join(storage_data_dir(db_path), CLIP_DIRNAME)
+
+
+@dataclass(frozen=True)
+class CompressedFrame:
+    """One downscaled frame held in the ring buffer."""
+
+    timestamp: float
+    data: bytes
+    shape: tuple[int, ...]
+    dtype: str
+    codec: str
+    face_box: tuple[float, float, float, float] | None = None
+
+
+def compress_frame(frame, timestamp, scale=0.5, jpeg_quality=70, face_box=None):
+    """Downscale and compress a frame (JPEG with OpenCV, zlib-packed raw otherwise)."""
+    scale = min(1.0, max(0.05, float(scale)))
+    if cv2 is not None:
+        if scale < 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)])
+        if ok:
+            return CompressedFrame(
+                timestamp, encoded.tobytes(), frame.shape, str(frame.dtype), "jpeg", face_box
+            )
+    step = max(1, round(1.0 / scale))
+    reduced = np.ascontiguousarray(frame[::step, ::step])
+    return CompressedFrame(
+        timestamp,
+        zlib.compress(reduced.tobytes(), 1),
+        reduced.shape,
+        str(reduced.dtype),
+        "zlib",
+        face_box,
+    )
+
+
+def decompress_frame(data, codec, shape, dtype):
+    """Decode one stored frame back into a numpy array."""
+    if codec == "jpeg":
+        if cv2 is None:
+            raise RuntimeError("OpenCV is required to decode JPEG clip frames.")
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    return np.frombuffer(zlib.decompress(data), dtype=dtype).reshape(shape)
+
+
+@dataclass
+class _ActiveCapture:
+    metadata: EventClipMetadata
+    event_type: str
+    frames: list[CompressedFrame] = field(default_factory=list)
+
+
+class ClipRecorder:
+    """Memory-bounded frame ring buffer that turns alert triggers into event clips.
+
+    `push` keeps the last `pre_event_s` seconds of frames at `fps`, downscaled and
+    compressed. `trigger` snapshots that pre-roll and keeps collecting frames for
+    `post_event_s`; the finished clip is written by a background thread so the
+    monitoring loop never blocks. Completed `EventClipMetadata` (with
+    `storage_uri`) are collected with `drain_completed()`.
+
+    When the contract requires redaction, faces are pixelated on the encoder
+    thread using the face box captured from the detector's landmarks at `push`
+    time; `FaceRedactor` only runs detection for frames that had none.
+
+    `push` and `trigger` may run on different threads (detection and telemetry
+    under the pipelined topology); active captures are guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        contract: ClipBufferContract | None = None,
+        output_dir: str | None = None,
+        fps: float = 10.0,
+        scale: float = 0.5,
+        jpeg_quality: int = 70,
+        max_pending_clips: int = 4,
+        redactor: FaceRedactor | None = None,
+    ):
+        self.contract = contract or ClipBufferContract()
+        self.output_dir = output_dir or clip_output_dir()
+        self.fps = max(0.1, float(fps))
+        self.scale = scale
+        self.jpeg_quality = jpeg_quality
+        self.redactor = redactor
+        if self.redactor is None and self.contract.redact_faces_by_default:
+            self.redactor = FaceRedactor()
+        self.ring = deque(maxlen=max(1, math.ceil(self.contract.pre_event_s * self.fps)))
+        self.active: dict[str, _ActiveCapture] = {}
+        self._active_lock = threading.Lock()
+        self.stats = {
+            "frames_buffered": 0,
+            "frames_skipped": 0,
+            "clips_triggered": 0,
+            "clips_written": 0,
+            "clips_dropped": 0,
+            "encode_ms_last": 0.0,
+        }
+        self._last_frame_ts = None
+        self._encode_queue = queue.Queue(maxsize=max(1, max_pending_clips))
+        self._completed = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._encode_worker, name="clip-encoder", daemon=True
+        )
+        self._worker.start()
+
+    def push(self, frame, now=None, face_landmarks=None):
+        """Offer a camera frame (or None) each cycle; frames faster than `fps` are skipped.
+
+        `face_landmarks` are the detector's landmarks for this frame, kept as a
+        normalized face box for redaction.
+        """
+        now = time.time() if now is None else now
+        if frame is None:
+            self._complete_due(now)
+            return False
+        frame_period_s = 1.0 / self.fps - 1e-6  # tolerate float jitter on exact periods
+        if self._last_frame_ts is not None and (now - self._last_frame_ts) < frame_period_s:
+            self.stats["frames_skipped"] += 1
+            return False
+        self._last_frame_ts = now
+        compressed = compress_frame(
+            frame, now, self.scale, self.jpeg_quality, face_box_from_landmarks(face_landmarks)
+        )
+        with self._active_lock:
+            self.ring.append(compressed)
+            for capture in self.active.values():
+                capture.frames.append(compressed)
+        self.stats["frames_buffered"] += 1
+        self._complete_due(now)
+        return True
+
+    def _complete_due(self, now):
+        with self._active_lock:
+            due = [
+                self.active.pop(event_type)
+                for event_type, capture in list(self.active.items())
+                if now >= capture.metadata.trigger_ts + capture.metadata.post_event_s
+            ]
+        for capture in due:
+            self._submit(capture)
+
+    def trigger(self, event_type, now=None):
+        """Start a clip around `now`; repeated triggers during a capture reuse it."""
+        now = time.time() if now is None else now
+        with self._active_lock:
+            existing = self.active.get(event_type)
+            if existing is not None:
+                return existing.metadata
+            metadata = EventClipMetadata(
+                event_id=f"{event_type.lower()}-{int(now * 1000)}-{uuid.uuid4().hex[:6]}",
+                trigger_ts=now,
+                pre_event_s=self.contract.pre_event_s,
+                post_event_s=self.contract.post_event_s,
+            )
+            pre_roll_start = now - metadata.pre_event_s
+            self.active[event_type] = _ActiveCapture(
+                metadata=metadata,
+                event_type=event_type,
+                frames=[frame for frame in self.ring if frame.timestamp >= pre_roll_start],
+            )
+        self.stats["clips_triggered"] += 1
+        return metadata
+
+    def drain_completed(self):
+        """Return clip metadata finished since the last call."""
+        completed = []
+        while True:
+            try:
+                completed.append(self._completed.get_nowait())
+            except queue.Empty:
+                return completed
+
+    def close(self, timeout_s=5.0):
+        """Finish in-progress captures with the frames so far and stop the encoder."""
+        with self._active_lock:
+            captures, self.active = list(self.active.values()), {}
+        for capture in captures:
+            self._submit(capture)
+        self._encode_queue.put(None)
+        self._worker.join(timeout=timeout_s)
+
+    def _submit(self, capture):
+        try:
+            self._encode_queue.put_nowait(capture)
+        except queue.Full:
+            self.stats["clips_dropped"] += 1
+
+    def _encode_worker(self):
+        while True:
+            capture = self._encode_queue.get()
+            if capture is None:
+                return
+            started = time.perf_counter()
+            try:
+                path = self._write_clip(capture)
+            except Exception:  # one bad clip must not stop the only encoder thread
+                self.stats["clips_dropped"] += 1
+                logger.exception("Failed to write clip %s", capture.metadata.event_id)
+                continue
+            self.stats["encode_ms_last"] = (time.perf_counter() - started) * 1000.0
+            self.stats["clips_written"] += 1
+            self._completed.put(
+                replace(
+                    capture.metadata,
+                    storage_uri=f"file://{path}",
+                    redacted=self.redactor is not None,
+                )
+            )
+
+    def _write_clip(self, capture):
+        """Write frames plus a JSON manifest into one uncompressed zip archive."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{capture.metadata.event_id}.clip.zip")
+        manifest = {
+            "event_type": capture.event_type,
+            "metadata": asdict(capture.metadata),
+            "frames": [],
+        }
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+            for index, frame in enumerate(capture.frames):
+                if self.redactor is not None:
+                    frame = self._redact_frame(frame)
+                name = f"frame_{index:05d}.{'jpg' if frame.codec == 'jpeg' else 'zraw'}"
+                archive.writestr(name, frame.data)
+                manifest["frames"].append(
+                    {
+                        "name": name,
+                        "timestamp": frame.timestamp,
+                        "shape": list(frame.shape),
+                        "dtype": frame.dtype,
+                        "codec": frame.codec,
+                    }
+                )
+            archive.writestr("manifest.json", json.dumps(manifest))
+        return path
+
+    def _redact_frame(self, frame):
+        pixels = decompress_frame(frame.data, frame.codec, frame.shape, frame.dtype)
+        redacted, _source = self.redactor.redact(pixels, frame.face_box)
+        return compress_frame(redacted, frame.timestamp, 1.0, self.jpeg_quality, frame.face_box)
+
+    def redaction_stats(self):
+        """Return redaction source counts and CPU throughput in frames per second."""
+        if self.redactor is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.redactor.stats, "fps": self.redactor.fps()}
+
+
+def load_clip_frames(path):
+    """Decode a clip archive written by `ClipRecorder` into `(timestamps, frames)`."""
+    timestamps, frames = [], []
+    with zipfile.ZipFile(path) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        for entry in manifest["frames"]:
+            frame = decompress_frame(
+                archive.read(entry["name"]), entry["codec"], entry["shape"], entry["dtype"]
+            )
+            timestamps.append(entry["timestamp"])
+            frames.append(frame)
+    return timestamps, frames
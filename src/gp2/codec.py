@@ -0,0 +1,294 @@
+"""Payload codecs for telemetry publishing and ingest-side decoding."""
+
+import json
+import struct
+from typing import Any
+
+from .planning.connectivity import (
+    PAYLOAD_CODEC_JSON,
+    PAYLOAD_CODEC_MSGPACK,
+    codec_schema_version,
+)
+
+try:
+    import msgpack  # type: ignore
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+class PayloadCodecError(ValueError):
+    """Raised when a payload cannot be encoded or decoded by a codec."""
+
+
+class JsonPayloadCodec:
+    """Compact JSON codec (schema v1 baseline)."""
+
+    name = PAYLOAD_CODEC_JSON
+    content_type = "application/json"
+
+    def encode(self, payload: Any) -> str:
+        """Serialize payload into a JSON document."""
+        return json.dumps(payload)
+
+    def decode(self, data: bytes | bytearray | str) -> Any:
+        """Parse a JSON document produced by `encode`."""
+        if isinstance(data, bytes | bytearray):
+            data = bytes(data).decode("utf-8")
+        try:
+            return json.loads(data)
+        except json.JSONDecodeError as e:
+            raise PayloadCodecError(f"Invalid JSON payload: {e}") from e
+
+
+class MessagePackCodec:
+    """Dependency-free MessagePack subset codec built on `struct`.
+
+    Supports None, bool, int, float, str, bytes, list/tuple and str-keyed dicts,
+    which covers every STATUS/ALERT/HEALTH payload produced by the runtime.
+    Floats are packed as float32 only when that round-trips exactly. When the
+    optional `msgpack` extension is installed it is used for the same wire format.
+    """
+
+    name = PAYLOAD_CODEC_MSGPACK
+    content_type = "application/msgpack"
+
+    def encode(self, payload: Any) -> bytes:
+        """Serialize payload into MessagePack bytes."""
+        if msgpack is not None:
+            try:
+                return msgpack.packb(payload, use_bin_type=True)
+            except (TypeError, ValueError, OverflowError) as e:
+                raise PayloadCodecError(f"Unsupported payload: {e}") from e
+        out = bytearray()
+        self._pack(payload, out)
+        return bytes(out)
+
+    def decode(self, data: bytes | bytearray | str) -> Any:
+        """Parse MessagePack bytes produced by `encode`."""
+        if isinstance(data, str):
+            raise PayloadCodecError("MessagePack payloads must be bytes.")
+        if msgpack is not None:
+            try:
+                return msgpack.unpackb(data, raw=False, strict_map_key=True)
+            except (ValueError, msgpack.UnpackException) as e:
+                raise PayloadCodecError(f"Invalid MessagePack payload: {e}") from e
+        view = memoryview(bytes(data))
+        try:
+            value, offset = self._unpack(view, 0)
+        except (IndexError, struct.error) as e:
+            raise PayloadCodecError(f"Truncated MessagePack payload: {e}") from e
+        if offset != len(view):
+            raise PayloadCodecError("Trailing bytes after MessagePack payload.")
+        return value
+
+    def _pack(self, value: Any, out: bytearray):
+        if value is None:
+            out.append(0xC0)
+        elif value is True:
+            out.append(0xC3)
+        elif value is False:
+            out.append(0xC2)
+        elif isinstance(value, int):
+            self._pack_int(value, out)
+        elif isinstance(value, float):
+            try:
+                packed32 = struct.pack(">f", value)
+            except OverflowError:
+                packed32 = b""
+            if packed32 and struct.unpack(">f", packed32)[0] == value:
+                out.append(0xCA)
+                out += packed32
+            else:
+                out.append(0xCB)
+                out += struct.pack(">d", value)
+        elif isinstance(value, str):
+            raw = value.encode("utf-8")
+            size = len(raw)
+            if size < 32:
+                out.append(0xA0 | size)
+            elif size < 0x100:
+                out += struct.pack(">BB", 0xD9, size)
+            elif size < 0x10000:
+                out += struct.pack(">BH", 0xDA, size)
+            else:
+                out += struct.pack(">BI", 0xDB, size)
+            out += raw
+        elif isinstance(value, bytes | bytearray):
+            size = len(value)
+            if size < 0x100:
+                out += struct.pack(">BB", 0xC4, size)
+            elif size < 0x10000:
+                out += struct.pack(">BH", 0xC5, size)
+            else:
+                out += struct.pack(">BI", 0xC6, size)
+            out += value
+        elif isinstance(value, list | tuple):
+            size = len(value)
+            if size < 16:
+                out.append(0x90 | size)
+            elif size < 0x10000:
+                out += struct.pack(">BH", 0xDC, size)
+            else:
+                out += struct.pack(">BI", 0xDD, size)
+            for item in value:
+                self._pack(item, out)
+        elif isinstance(value, dict):
+            size = len(value)
+            if size < 16:
+                out.append(0x80 | size)
+            elif size < 0x10000:
+                out += struct.pack(">BH", 0xDE, size)
+            else:
+                out += struct.pack(">BI", 0xDF, size)
+            for key, item in value.items():
+                if not isinstance(key, str):
+                    raise PayloadCodecError(f"Unsupported map key type: {type(key).__name__}")
+                self._pack(key, out)
+                self._pack(item, out)
+        else:
+            raise PayloadCodecError(f"Unsupported payload type: {type(value).__name__}")
+
+    def _pack_int(self, value: int, out: bytearray):
+        if 0 <= value < 0x80:
+            out.append(value)
+        elif -32 <= value < 0:
+            out.append(value & 0xFF)
+        elif 0 <= value < 0x100:
+            out += struct.pack(">BB", 0xCC, value)
+        elif 0 <= value < 0x10000:
+            out += struct.pack(">BH", 0xCD, value)
+        elif 0 <= value < 0x100000000:
+            out += struct.pack(">BI", 0xCE, value)
+        elif 0 <= value < 0x10000000000000000:
+            out += struct.pack(">BQ", 0xCF, value)
+        elif -0x80 <= value < 0:
+            out += struct.pack(">Bb", 0xD0, value)
+        elif -0x8000 <= value < 0:
+            out += struct.pack(">Bh", 0xD1, value)
+        elif -0x80000000 <= value < 0:
+            out += struct.pack(">Bi", 0xD2, value)
+        elif -0x8000000000000000 <= value < 0:
+            out += struct.pack(">Bq", 0xD3, value)
+        else:
+            raise PayloadCodecError(f"Integer out of MessagePack range: {value}")
+
+    def _unpack(self, view: memoryview, offset: int) -> tuple[Any, int]:
+        tag = view[offset]
+        offset += 1
+        if tag < 0x80:
+            return tag, offset
+        if tag >= 0xE0:
+            return tag - 0x100, offset
+        if 0x80 <= tag <= 0x8F:
+            return self._unpack_map(view, offset, tag & 0x0F)
+        if 0x90 <= tag <= 0x9F:
+            return self._unpack_array(view, offset, tag & 0x0F)
+        if 0xA0 <= tag <= 0xBF:
+            return self._unpack_str(view, offset, tag & 0x1F)
+        if tag == 0xC0:
+            return None, offset
+        if tag == 0xC2:
+            return False, offset
+        if tag == 0xC3:
+            return True, offset
+        if tag in _FIXED_WIDTH_FORMATS:
+            fmt = _FIXED_WIDTH_FORMATS[tag]
+            (value,) = struct.unpack_from(fmt, view, offset)
+            return value, offset + struct.calcsize(fmt)
+        if tag in _LENGTH_PREFIXED_FORMATS:
+            kind, fmt = _LENGTH_PREFIXED_FORMATS[tag]
+            (size,) = struct.unpack_from(fmt, view, offset)
+            offset += struct.calcsize(fmt)
+            if kind == "str":
+                return self._unpack_str(view, offset, size)
+            if kind == "bin":
+                end = offset + size
+                if end > len(view):
+                    raise PayloadCodecError("Truncated MessagePack binary field.")
+                return bytes(view[offset:end]), end
+            if kind == "array":
+                return self._unpack_array(view, offset, size)
+            return self._unpack_map(view, offset, size)
+        raise PayloadCodecError(f"Unsupported MessagePack tag: 0x{tag:02x}")
+
+    def _unpack_str(self, view: memoryview, offset: int, size: int) -> tuple[str, int]:
+        end = offset + size
+        if end > len(view):
+            raise PayloadCodecError("Truncated MessagePack string field.")
+        return bytes(view[offset:end]).decode("utf-8"), end
+
+    def _unpack_array(self, view: memoryview, offset: int, size: int) -> tuple[list[Any], int]:
+        items = []
+        for _ in range(size):
+            item, offset = self._unpack(view, offset)
+            items.append(item)
+        return items, offset
+
+    def _unpack_map(self, view: memoryview, offset: int, size: int) -> tuple[dict[str, Any], int]:
+        result = {}
+        for _ in range(size):
+            key, offset = self._unpack(view, offset)
+            value, offset = self._unpack(view, offset)
+            result[key] = value
+        return result, offset
+
+
+_FIXED_WIDTH_FORMATS = {
+    0xCA: ">f",
+    0xCB: ">d",
+    0xCC: ">B",
+    0xCD: ">H",
+    0xCE: ">I",
+    0xCF: ">Q",
+    0xD0: ">b",
+    0xD1: ">h",
+    0xD2: ">i",
+    0xD3: ">q",
+}
+
+_LENGTH_PREFIXED_FORMATS = {
+    0xC4: ("bin", ">B"),
+    0xC5: ("bin", ">H"),
+    0xC6: ("bin", ">I"),
+    0xD9: ("str", ">B"),
+    0xDA: ("str", ">H"),
+    0xDB: ("str", ">I"),
+    0xDC: ("array", ">H"),
+    0xDD: ("array", ">I"),
+    0xDE: ("map", ">H"),
+    0xDF: ("map", ">I"),
+}
+
+_CODECS = {
+    PAYLOAD_CODEC_JSON: JsonPayloadCodec(),
+    PAYLOAD_CODEC_MSGPACK: MessagePackCodec(),
+}
+
+
+def resolve_payload_codec(name: str) -> JsonPayloadCodec | MessagePackCodec:
+    """Return the codec registered under a `ConnectivityConfig.payload_codec` name."""
+    try:
+        return _CODECS[name]
+    except KeyError as e:
+        raise ValueError(f"Unsupported payload codec: {name}") from e
+
+
+def codec_for_schema_version(schema_version: str) -> JsonPayloadCodec | MessagePackCodec:
+    """Return the codec advertised by a `TopicContract.schema_version` string."""
+    for codec in _CODECS.values():
+        if codec_schema_version(codec.name) == schema_version:
+            return codec
+    raise ValueError(f"Unsupported payload schema version: {schema_version}")
+
+
+def decode_payload(data: bytes | bytearray | str, schema_version: str | None = None) -> Any:
+    """Decode an ingested payload, sniffing the codec when no schema version is given.
+
+    JSON payloads always start with `{`; MessagePack maps start with a map tag,
+    so ingest can accept both encodings on the same topic during rollout.
+    """
+    if schema_version is not None:
+        return codec_for_schema_version(schema_version).decode(data)
+    if isinstance(data, str) or (len(data) > 0 and data[0] == ord("{")):
+        return _CODECS[PAYLOAD_CODEC_JSON].decode(data)
+    return _CODECS[PAYLOAD_CODEC_MSGPACK].decode(data)
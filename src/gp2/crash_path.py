@@ -0,0 +1,170 @@
+"""IMU-driven crash fast path that routes CRASH independently of the camera cycle."""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from .metrics import LatencyHistogram
+from .planning.carry_forward import EmergencyRoutingPolicy
+from .scheduler import FixedRateScheduler
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CrashEvent:
+    """One crash routed by the fast path, handed back to the runtime for storage."""
+
+    g_force: float
+    detected_at: float
+    route_latency_ms: float
+    routed: bool
+
+
+class CrashFastPath:
+    """Samples the IMU at `rate_hz` on its own thread and routes crashes immediately.
+
+    Crash-to-publish latency is timed from the IMU sample to the return of
+    `route_alert` and checked against `EmergencyRoutingPolicy.max_route_latency_ms`.
+    Storage and clip work stay with the runtime loop, which collects routed
+    crashes with `drain_events()`. Samples within `refractory_s` of a routed
+    crash belong to the same impact and are not routed again.
+
+    While it runs, the fast path is the only IMU reader, so the runtime takes
+    `latest_g_force` from it and folds `read_failures` into its own sensor
+    fault counter. `sample_is_stale()` reports when no sample has succeeded for
+    `stale_sample_s`, i.e. `latest_g_force` no longer describes the helmet.
+    """
+
+    def __init__(
+        self,
+        read_accel,
+        route_alert,
+        policy: EmergencyRoutingPolicy | None = None,
+        rate_hz: float = 100.0,
+        crash_threshold_g: float = 2.5,
+        refractory_s: float = 2.0,
+        stale_sample_s: float = 0.1,
+    ):
+        self.read_accel = read_accel
+        self.route_alert = route_alert
+        self.policy = policy or EmergencyRoutingPolicy()
+        self.rate_hz = max(1.0, float(rate_hz))
+        self.crash_threshold_g = crash_threshold_g
+        self.refractory_s = refractory_s
+        self.stale_sample_s = stale_sample_s
+        self.route_latency_ms = LatencyHistogram()
+        self.latest_g_force = 0.0
+        self.latest_sample_ts = None
+        self.stats = {
+            "samples": 0,
+            "read_failures": 0,
+            "crashes": 0,
+            "route_failures": 0,
+            "budget_violations": 0,
+        }
+        self._events = deque(maxlen=64)
+        self._last_crash_ts = None
+        self._started_ts = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def read_failures(self) -> int:
+        return self.stats["read_failures"]
+
+    def sample_age_s(self, now=None) -> float:
+        """Seconds since the last successful IMU sample (or since `start()` before one)."""
+        reference = self.latest_sample_ts if self.latest_sample_ts is not None else self._started_ts
+        if reference is None:
+            return math.inf
+        return (time.perf_counter() if now is None else now) - reference
+
+    def sample_is_stale(self, now=None) -> bool:
+        return self.sample_age_s(now) > self.stale_sample_s
+
+    def start(self):
+        """Start sampling on a daemon thread."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._started_ts = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="crash-fast-path", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s=1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout_s)
+            self._thread = None
+
+    def _run(self):
+        scheduler = FixedRateScheduler(period_s=1.0 / self.rate_hz)
+        while not self._stop.is_set():
+            scheduler.start_cycle()
+            try:
+                self.poll_once()
+            except (OSError, ValueError, TypeError):
+                self.stats["read_failures"] += 1
+            scheduler.wait_next()
+
+    def poll_once(self):
+        """Take one IMU sample; route it if it is a new crash. Returns the event or None."""
+        sampled = time.perf_counter()
+        ax, ay, az = self.read_accel()
+        g_force = math.sqrt(ax * ax + ay * ay + az * az)
+        self.latest_g_force = g_force
+        self.latest_sample_ts = sampled
+        self.stats["samples"] += 1
+        if g_force <= self.crash_threshold_g:
+            return None
+        if self._last_crash_ts is not None and sampled - self._last_crash_ts < self.refractory_s:
+            return None
+        self._last_crash_ts = sampled
+
+        detected_at = time.time()
+        routed = True
+        try:
+            self.route_alert(g_force)
+        except Exception:  # the runtime loop still stores the crash for replay
+            routed = False
+            self.stats["route_failures"] += 1
+            logger.exception("Crash fast path failed to route alert")
+        latency_ms = (time.perf_counter() - sampled) * 1000.0
+        self.route_latency_ms.record(latency_ms)
+        self.stats["crashes"] += 1
+        if latency_ms > self.policy.max_route_latency_ms:
+            self.stats["budget_violations"] += 1
+            logger.warning(
+                "Crash route took %.1f ms (budget %d ms)",
+                latency_ms,
+                self.policy.max_route_latency_ms,
+            )
+        event = CrashEvent(g_force, detected_at, latency_ms, routed)
+        self._events.append(event)
+        return event
+
+    def drain_events(self):
+        """Return crashes routed since the last call, oldest first."""
+        drained = []
+        while self._events:
+            drained.append(self._events.popleft())
+        return drained
+
+    def snapshot(self):
+        """Return sampling, routing and latency-budget counters for runtime health."""
+        return {
+            **self.stats,
+            "rate_hz": self.rate_hz,
+            "sample_age_ms": round(min(self.sample_age_s(), 3600.0) * 1000.0, 1),
+            "route_p95_ms": self.route_latency_ms.percentile(0.95),
+            "route_max_ms": self.route_latency_ms.max_ms,
+            "budget_ms": self.policy.max_route_latency_ms,
+        }
@@ -26,14 +26,14 @@ EYE_AR_CONSEC_FRAMES = 3  # Frame buffer for blink consistency
 PERCLOS_WINDOW_FRAMES = 1000
 
 
-def create_face_mesh() -> Any:
+def create_face_mesh(refine_landmarks: bool = True) -> Any:
     """Create a MediaPipe FaceMesh instance, or return None when unavailable."""
     if mp is None:
         return None
 
     return mp.solutions.face_mesh.FaceMesh(
         max_num_faces=1,
-        refine_landmarks=True,
+        refine_landmarks=refine_landmarks,
         min_detection_confidence=0.5,
         min_tracking_confidence=0.5,
     )
@@ -84,7 +84,40 @@ class FatigueDetector:
         self.closed_frames = 0
         self.total_frames = 0
         self.perclos_buffer = deque(maxlen=PERCLOS_WINDOW_FRAMES)
+        self.refine_landmarks = True
         self.face_mesh = create_face_mesh()
+        # Face landmarks from the most recent frame, reused by clip redaction.
+        self.last_face_landmarks = None
+
+    def export_state(self) -> dict[str, Any]:
+        """Return PERCLOS history and frame counters as a compact JSON-serializable dict."""
+        closed = list(self.perclos_buffer)  # one C-level copy; safe against a concurrent append
+        return {
+            "perclos_bits": np.packbits(np.asarray(closed, dtype=np.uint8)).tobytes().hex(),
+            "perclos_len": len(closed),
+            "counter": self.counter,
+            "closed_frames": self.closed_frames,
+            "total_frames": self.total_frames,
+        }
+
+    def restore_state(self, state: dict[str, Any]):
+        """Reload state saved by `export_state`, e.g. after a warm restart."""
+        packed = np.frombuffer(bytes.fromhex(state["perclos_bits"]), dtype=np.uint8)
+        closed = np.unpackbits(packed)[: int(state["perclos_len"])]
+        self.perclos_buffer.clear()
+        self.perclos_buffer.extend(int(value) for value in closed)
+        self.counter = int(state.get("counter", 0))
+        self.closed_frames = int(state.get("closed_frames", 0))
+        self.total_frames = int(state.get("total_frames", 0))
+
+    def set_refine_landmarks(self, refine_landmarks: bool):
+        """Rebuild FaceMesh with or without iris refinement; PERCLOS history is kept."""
+        if refine_landmarks == self.refine_landmarks:
+            return
+        if self.face_mesh is not None:
+            self.face_mesh.close()
+        self.refine_landmarks = refine_landmarks
+        self.face_mesh = create_face_mesh(refine_landmarks=refine_landmarks)
 
     def _current_perclos(self) -> float:
         if not self.perclos_buffer:
@@ -96,6 +129,7 @@ class FatigueDetector:
         if not landmarks:
             return None
 
+        self.last_face_landmarks = landmarks[0]
         return landmarks[0]
 
     def _extract_eye_landmarks_from_frame(self, frame):
@@ -152,6 +186,7 @@ class FatigueDetector:
         """Run fatigue analysis and return latency/false-alert metadata."""
         start = time.perf_counter()
         landmarks_input = landmarks
+        self.last_face_landmarks = None
 
         if landmarks_input is None and frame is not None:
             eye_landmarks = self._extract_eye_landmarks_from_frame(frame)
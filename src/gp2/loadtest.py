@@ -0,0 +1,192 @@
+"""Multi-helmet telemetry load generator against the loopback MQTT broker stand-in."""
+
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .codec import PayloadCodecError, decode_payload
+from .local_broker import LocalMQTTBroker
+from .planning.connectivity import PAYLOAD_CODEC_JSON, ConnectivityConfig
+from .telemetry import TelemetryClient
+
+
+@dataclass
+class LoadTestConfig:
+    """Load profile for simulated helmets publishing STATUS and alerts."""
+
+    helmets: int = 10
+    duration_s: float = 5.0
+    status_hz: float = 5.0
+    alert_interval_s: float = 1.0
+    outage_at_s: float | None = 2.0
+    outage_duration_s: float = 1.0
+    settle_s: float = 2.0
+    ack_delay_s: float = 0.0
+    payload_codec: str = PAYLOAD_CODEC_JSON
+    sample_interval_s: float = 0.005
+
+
+def _helmet_connectivity(port, config):
+    return ConnectivityConfig(
+        broker="127.0.0.1",
+        port=port,
+        telemetry_interval_s=1.0 / config.status_hz,
+        offline_queue_enabled=True,
+        offline_queue_max_items=1000,
+        reconnect_initial_delay_s=0.05,
+        reconnect_max_delay_s=0.8,
+        max_reconnect_attempts=10,
+        publish_ack_timeout_s=max(0.5, config.settle_s / 2),
+        payload_codec=config.payload_codec,
+    )
+
+
+def _drive_helmet(client, config, stop, sent, sent_lock):
+    status_period = 1.0 / config.status_hz
+    start = time.monotonic()
+    next_status = start
+    next_alert = start + config.alert_interval_s
+    while not stop.is_set():
+        now = time.monotonic()
+        if now >= next_status:
+            client.send_telemetry(perclos=0.05, g_force=1.0)
+            with sent_lock:
+                sent["STATUS"] += 1
+            next_status += status_period
+        if now >= next_alert:
+            client.send_alert("FATIGUE", 0.18)
+            with sent_lock:
+                sent["ALERT"] += 1
+            next_alert += config.alert_interval_s
+        time.sleep(max(0.0, min(next_status, next_alert) - time.monotonic()))
+
+
+def _percentiles(samples):
+    if not samples:
+        return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    values = np.asarray(samples, dtype=float)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(values.size),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(values.max()),
+    }
+
+
+def summarize_received(messages):
+    """Return per-type unique counts, duplicates and end-to-end latency samples."""
+    seen = set()
+    received = {"STATUS": 0, "ALERT": 0}
+    latencies = {"STATUS": [], "ALERT": []}
+    duplicates = 0
+    for message in messages:
+        try:
+            payload = decode_payload(message.payload)
+        except PayloadCodecError:
+            continue
+        kind = payload.get("type")
+        if kind not in received:
+            continue
+        key = (payload.get("device_id"), kind, payload.get("timestamp"), payload.get("value"))
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        received[kind] += 1
+        latencies[kind].append((message.received_at - float(payload["timestamp"])) * 1000.0)
+    return received, duplicates, latencies
+
+
+def run_load_test(config: LoadTestConfig | None = None) -> dict:
+    """Run N simulated helmets against a local broker and report throughput/latency."""
+    config = config or LoadTestConfig()
+    sent = {"STATUS": 0, "ALERT": 0}
+    sent_lock = threading.Lock()
+    stop = threading.Event()
+    queue_samples = {"max_offline_depth": 0, "max_inflight_depth": 0}
+
+    with LocalMQTTBroker(ack_delay_s=config.ack_delay_s) as broker:
+        clients = [
+            TelemetryClient(
+                device_id=f"helmet_{index:03d}",
+                config=_helmet_connectivity(broker.port, config),
+            )
+            for index in range(config.helmets)
+        ]
+
+        def sample_queues():
+            while not stop.is_set():
+                for client in clients:
+                    queue_samples["max_offline_depth"] = max(
+                        queue_samples["max_offline_depth"], len(client.offline_queue)
+                    )
+                    queue_samples["max_inflight_depth"] = max(
+                        queue_samples["max_inflight_depth"], len(client.inflight)
+                    )
+                time.sleep(config.sample_interval_s)
+
+        workers = [
+            threading.Thread(
+                target=_drive_helmet,
+                args=(client, config, stop, sent, sent_lock),
+                daemon=True,
+            )
+            for client in clients
+        ]
+        workers.append(threading.Thread(target=sample_queues, daemon=True))
+        started = time.monotonic()
+        for worker in workers:
+            worker.start()
+
+        if config.outage_at_s is not None and config.outage_at_s < config.duration_s:
+            time.sleep(config.outage_at_s)
+            broker.inject_outage(config.outage_duration_s)
+        time.sleep(max(0.0, config.duration_s - (time.monotonic() - started)))
+        stop.set()
+        for worker in workers:
+            worker.join(timeout=30.0)
+        elapsed_s = time.monotonic() - started
+
+        deadline = time.monotonic() + config.settle_s
+        while time.monotonic() < deadline:
+            for client in clients:
+                client._expire_inflight()
+                client.replay_offline_queue()
+            if all(not client.offline_queue and not client.inflight for client in clients):
+                break
+            time.sleep(0.05)
+
+        health = [client.health_snapshot() for client in clients]
+        for client in clients:
+            if client.client is not None:
+                client.client.loop_stop()
+                client.client.disconnect()
+        messages = broker.drain_messages()
+        connections = broker.connections_accepted
+
+    received, duplicates, latencies = summarize_received(messages)
+    counters = {}
+    for snapshot in health:
+        for name, value in snapshot["fault_counters"].items():
+            counters[name] = counters.get(name, 0) + value
+    return {
+        "helmets": config.helmets,
+        "duration_s": elapsed_s,
+        "sent": sent,
+        "received": received,
+        "lost": {kind: max(0, sent[kind] - received[kind]) for kind in sent},
+        "duplicates": duplicates,
+        "messages_per_s": sum(received.values()) / max(elapsed_s, 1e-9),
+        "latency_ms": {kind: _percentiles(samples) for kind, samples in latencies.items()},
+        "queue": {
+            **queue_samples,
+            "final_offline_depth": sum(snapshot["offline_queue_depth"] for snapshot in health),
+            "final_inflight_depth": sum(snapshot["inflight_depth"] for snapshot in health),
+        },
+        "fault_counters": counters,
+        "broker_connections": connections,
+    }
@@ -0,0 +1,210 @@
+"""Loopback MQTT 3.1.1 broker stand-in implementing the publish path for local testing."""
+
+import asyncio
+import struct
+import threading
+import time
+from dataclasses import dataclass
+
+PACKET_CONNECT = 1
+PACKET_PUBLISH = 3
+PACKET_SUBSCRIBE = 8
+PACKET_PINGREQ = 12
+PACKET_DISCONNECT = 14
+
+CONNACK_ACCEPTED = b"\x20\x02\x00\x00"
+PINGRESP = b"\xd0\x00"
+
+
+@dataclass(frozen=True)
+class ReceivedMessage:
+    """One PUBLISH packet as seen by the broker."""
+
+    received_at: float
+    client_id: str
+    topic: str
+    payload: bytes
+    qos: int
+
+
+class LocalMQTTBroker:
+    """Minimal loopback broker for throughput and outage testing.
+
+    Accepts CONNECT, PUBLISH (QoS 0/1 with PUBACK), SUBSCRIBE (acknowledged,
+    no fan-out), PINGREQ and DISCONNECT. Received messages are recorded in
+    `messages`. `inject_outage` drops every session and refuses connections
+    for a while, which exercises reconnect and offline-queue replay paths.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, ack_delay_s=0.0):
+        self.host = host
+        self.port = port
+        self.ack_delay_s = ack_delay_s
+        self.messages = []
+        self.connections_accepted = 0
+        self._messages_lock = threading.Lock()
+        self._loop = None
+        self._server = None
+        self._writers = set()
+        self._thread = None
+        self._ready = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_exc):
+        self.stop()
+
+    def start(self):
+        """Start serving on a background event-loop thread; returns the bound port."""
+        self._thread = threading.Thread(target=self._run, name="local-mqtt-broker", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout=5.0):
+            raise RuntimeError("Local MQTT broker failed to start.")
+        return self.port
+
+    def stop(self):
+        """Close all sessions and stop the broker thread."""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._close_server(), self._loop).result(timeout=5.0)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        self._loop = None
+
+    def inject_outage(self, duration_s):
+        """Drop active sessions and refuse connections for `duration_s` seconds."""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._outage(duration_s), self._loop).result(timeout=5.0)
+
+    def drain_messages(self):
+        """Return and clear the messages received so far."""
+        with self._messages_lock:
+            drained, self.messages = self.messages, []
+        return drained
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._open_server())
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    async def _open_server(self):
+        self._server = await asyncio.start_server(
+            self._handle_session, self.host, self.port, reuse_address=True
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _close_server(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in list(self._writers):
+            writer.close()
+        self._writers.clear()
+
+    async def _outage(self, duration_s):
+        await self._close_server()
+
+        async def restore():
+            await asyncio.sleep(duration_s)
+            await self._open_server()
+
+        asyncio.get_running_loop().create_task(restore())
+
+    async def _handle_session(self, reader, writer):
+        self._writers.add(writer)
+        self.connections_accepted += 1
+        client_id = ""
+        try:
+            while True:
+                header = await reader.readexactly(1)
+                packet_type = header[0] >> 4
+                flags = header[0] & 0x0F
+                body = await reader.readexactly(await self._read_remaining_length(reader))
+                if packet_type == PACKET_CONNECT:
+                    client_id = self._parse_client_id(body)
+                    writer.write(CONNACK_ACCEPTED)
+                elif packet_type == PACKET_PUBLISH:
+                    self._handle_publish(writer, client_id, flags, body)
+                elif packet_type == PACKET_SUBSCRIBE:
+                    granted = self._granted_qos(body)
+                    writer.write(bytes([0x90, 2 + len(granted)]) + body[:2] + granted)
+                elif packet_type == PACKET_PINGREQ:
+                    writer.write(PINGRESP)
+                elif packet_type == PACKET_DISCONNECT:
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _handle_publish(self, writer, client_id, flags, body):
+        qos = (flags >> 1) & 0x03
+        (topic_len,) = struct.unpack_from(">H", body, 0)
+        topic = body[2 : 2 + topic_len].decode("utf-8")
+        offset = 2 + topic_len
+        packet_id = None
+        if qos > 0:
+            packet_id = body[offset : offset + 2]
+            offset += 2
+        message = ReceivedMessage(
+            received_at=time.time(),
+            client_id=client_id,
+            topic=topic,
+            payload=bytes(body[offset:]),
+            qos=qos,
+        )
+        with self._messages_lock:
+            self.messages.append(message)
+        if packet_id is None:
+            return
+        puback = b"\x40\x02" + packet_id
+        if self.ack_delay_s > 0:
+            asyncio.get_running_loop().call_later(
+                self.ack_delay_s, self._write_if_open, writer, puback
+            )
+        else:
+            writer.write(puback)
+
+    def _write_if_open(self, writer, data):
+        if writer in self._writers:
+            writer.write(data)
+
+    @staticmethod
+    async def _read_remaining_length(reader):
+        multiplier = 1
+        value = 0
+        for _ in range(4):
+            (byte,) = await reader.readexactly(1)
+            value += (byte & 0x7F) * multiplier
+            if not byte & 0x80:
+                return value
+            multiplier *= 128
+        raise ConnectionError("Malformed MQTT remaining length.")
+
+    @staticmethod
+    def _granted_qos(body):
+        granted = bytearray()
+        offset = 2
+        while offset + 2 <= len(body):
+            (filter_len,) = struct.unpack_from(">H", body, offset)
+            offset += 2 + filter_len
+            granted.append(min(body[offset], 1) if offset < len(body) else 0)
+            offset += 1
+        return bytes(granted)
+
+    @staticmethod
+    def _parse_client_id(body):
+        (name_len,) = struct.unpack_from(">H", body, 0)
+        offset = 2 + name_len + 1 + 1 + 2  # protocol name, level, flags, keepalive
+        (id_len,) = struct.unpack_from(">H", body, offset)
+        return body[offset + 2 : offset + 2 + id_len].decode("utf-8", errors="replace")
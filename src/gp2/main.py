@@ -2,18 +2,36 @@
 
 import logging
 import time
+from collections import deque
+from dataclasses import asdict
 
 import numpy as np
 
+from .alerts import PHASE_END, PHASE_START, AlertStateMachine
+from .clips import ClipRecorder, clip_output_dir
+from .crash_path import CrashFastPath
 from .detection import FatigueDetector
+from .pipeline import PipelinedRuntime
 from .planning.ai_algorithms import build_default_ai_plan, detector_mode
 from .planning.connectivity import ConnectivityConfig, validate_connectivity_config
 from .planning.features import build_default_feature_definition, derive_runtime_feature_flags
 from .planning.power_plan import PowerProfile, estimate_total_current, has_valid_power_bounds
-from .planning.software_architecture import RuntimeOrchestratorContract, execute_runtime_cycle
+from .planning.software_architecture import (
+    DETECTION_WORKER_PROCESS,
+    RuntimeOrchestratorContract,
+    RuntimeTopology,
+    execute_runtime_cycle,
+)
 from .planning.storage_strategy import LocalStorageBuffer, StorageEvent, StoragePolicy
+from .profiling import CycleProfiler
+from .quality import LatencyBudgetController
+from .scheduler import FixedRateScheduler
 from .sensors import CameraModule, IMUSensor, IRSys
-from .telemetry import TelemetryClient
+from .telemetry import SectionDeltaEncoder, TelemetryClient
+from .timeseries import TimeSeriesStore
+from .vision_worker import ProcessFatigueDetector, VisionWorkerStarting, VisionWorkerUnavailable
+from .warm_restart import WarmRestartStore, warm_restart_path
+from .watchdog import LEVEL_ESCALATE, SAFE_DETECTION_MODE, RuntimeWatchdog
 
 # import dlib # Required for actual landmark detection
 
@@ -51,15 +69,30 @@ def build_power_profile(sensor_health):
     }
 
 
-def run_monitoring_loop(contract, loop_delay_s=0.05, max_cycles=None):
-    """Execute runtime cycles until interrupted or max cycle count is reached."""
+def run_monitoring_loop(
+    contract, loop_delay_s=0.05, max_cycles=None, scheduler=None, topology=None, alerts=None
+):
+    """Execute runtime cycles at a fixed rate until interrupted or `max_cycles` is reached.
+
+    `loop_delay_s` is the target cycle period; pass a `FixedRateScheduler` to
+    read its overrun and cycle-time statistics while the loop runs. A pipelined
+    `RuntimeTopology` runs the same callbacks on `PipelinedRuntime` workers.
+    With an `AlertStateMachine`, alerts publish once per episode plus updates.
+    """
+    scheduler = scheduler or FixedRateScheduler(period_s=loop_delay_s)
+    if topology is not None and topology.pipelined:
+        PipelinedRuntime(contract, topology, scheduler=scheduler, alerts=alerts).run(
+            max_cycles=max_cycles
+        )
+        return
     cycles = 0
     while True:
-        execute_runtime_cycle(contract)
+        scheduler.start_cycle()
+        execute_runtime_cycle(contract, alerts=alerts)
         cycles += 1
         if max_cycles is not None and cycles >= max_cycles:
             break
-        time.sleep(loop_delay_s)
+        scheduler.wait_next()
 
 
 def main():
@@ -84,17 +117,24 @@ def main():
         raise ValueError("Invalid runtime connectivity configuration.")
 
     mqtt = TelemetryClient(config=connectivity_config)
-    detector = FatigueDetector()
+    runtime_topology = RuntimeTopology()
+    if runtime_topology.detection_isolation == DETECTION_WORKER_PROCESS:
+        detector = ProcessFatigueDetector()
+    else:
+        detector = FatigueDetector()
     storage_policy = StoragePolicy(
         on_device_retention_hours=24,
         on_device_queue_max_items=500,
         cloud_sync_enabled=connectivity_config.offline_queue_enabled,
+        write_behind_enabled=True,
+        write_behind_flush_interval_s=5.0,
     )
     local_storage = LocalStorageBuffer(policy=storage_policy)
     feature_definition = build_default_feature_definition()
     runtime_flags = derive_runtime_feature_flags(feature_definition)
     ai_plan = build_default_ai_plan()
     active_detector_mode = detector_mode(ai_plan)
+    quality_controller = LatencyBudgetController(budget_ms=ai_plan.max_latency_ms)
 
     # Mocking dlib predictor for code structure (Actual implementation needs .dat file)
     # predictor = dlib.shape_predictor("shape_predictor_68_face_landmarks.dat")
@@ -103,17 +143,86 @@ def main():
     ir.set_brightness(50)  # Set IR LEDs to 50%
     sensor_health = build_sensor_health(imu, cam, ir)
     power_profile = build_power_profile(sensor_health)
+    storage_health_delta = SectionDeltaEncoder(connectivity_config.health_keyframe_interval_s)
+    trend_store = TimeSeriesStore()
+    clip_recorder = ClipRecorder(output_dir=clip_output_dir(local_storage.db_path))
+    cycle_scheduler = FixedRateScheduler(period_s=0.05)
+    cycle_profiler = CycleProfiler(slow_cycle_ms=cycle_scheduler.period_s * 1000.0)
     runtime_state = {
         "last_status_publish_ts": 0.0,
         "sensor_read_failures": 0,
         "detect_failures": 0,
+        "fast_path_read_failures": 0,
+        "last_fatigue_result": None,
     }
+    runtime_watchdog = RuntimeWatchdog(probe_interval_s=5.0)
+    watchdog_transitions = deque()  # appended by the sensor stage, drained on STATUS
+    alert_episodes = AlertStateMachine()
+    warm_restart = WarmRestartStore(warm_restart_path(local_storage.db_path))
+    warm_counters = ("sensor_read_failures", "detect_failures")
+
+    def capture_warm_state():
+        state = {
+            "runtime_state": {key: runtime_state[key] for key in warm_counters},
+            "quality_tier_index": quality_controller.tier_index,
+        }
+        detector_state = detector.export_state()  # a worker's arrives with its results
+        if detector_state is not None:
+            state["detector"] = detector_state
+        return state
+
+    warm_state = warm_restart.load()
+    if warm_state is not None:
+        # A recent snapshot means a watchdog restart or brownout: resume at full PERCLOS fidelity.
+        runtime_state.update(warm_state.get("runtime_state", {}))
+        quality_controller.tier_index = min(
+            int(warm_state.get("quality_tier_index", 0)), len(quality_controller.tiers) - 1
+        )
+        if "detector" in warm_state:
+            detector.restore_state(warm_state["detector"])  # a worker gets it at start-up
+        logger.info("Restored warm-restart snapshot")
+
+    def apply_watchdog():
+        transitions = runtime_watchdog.observe(
+            {
+                "sensor_read_failures": runtime_state["sensor_read_failures"],
+                "detect_failures": runtime_state["detect_failures"],
+                "reconnect_failures": mqtt.fault_counters["reconnect_failures"],
+            }
+        )
+        watchdog_transitions.extend(transitions)
+
+    def publish_watchdog_transitions():
+        while watchdog_transitions:
+            transition = watchdog_transitions.popleft()
+            local_storage.add_event(StorageEvent(event_type="watchdog", payload=asdict(transition)))
+            if transition.level == LEVEL_ESCALATE and runtime_flags.enable_alert_publish:
+                mqtt.send_alert(f"WATCHDOG_{transition.counter.upper()}", transition.window_count)
 
     def read_sensor_snapshot():
+        apply_watchdog()
+        tier = quality_controller.tier
+        if cam.resolution != (tier.capture_width, tier.capture_height):
+            cam.set_resolution(tier.capture_width, tier.capture_height)
         try:
-            frame = cam.get_frame()
-            ax, ay, az = imu.read_accel()
-            g_force = float(np.sqrt(ax**2 + ay**2 + az**2))
+            # While degraded, the camera is probed once per interval instead of every cycle.
+            frame = (
+                cam.get_frame() if runtime_watchdog.should_attempt("sensor_read_failures") else None
+            )
+            if crash_fast_path.running:
+                # One IMU reader, on the fast path: its failures are sensor read failures,
+                # and a stale sample fails this read instead of reporting an old g-force.
+                fast_path_failures = crash_fast_path.read_failures
+                runtime_state["sensor_read_failures"] += (
+                    fast_path_failures - runtime_state["fast_path_read_failures"]
+                )
+                runtime_state["fast_path_read_failures"] = fast_path_failures
+                if crash_fast_path.sample_is_stale():
+                    raise OSError("IMU fast-path sample is stale")
+                g_force = crash_fast_path.latest_g_force
+            else:
+                ax, ay, az = imu.read_accel()
+                g_force = float(np.sqrt(ax**2 + ay**2 + az**2))
             return {
                 "frame": frame,
                 "g_force": g_force,
@@ -126,62 +235,128 @@ def main():
             }
 
     def detect_fatigue(snapshot):
+        tier = quality_controller.tier
+        last_result = runtime_state["last_fatigue_result"]
+        face_landmarks = None
+        if last_result is not None and not quality_controller.should_infer():
+            # Reduced-cadence tiers reuse the last inference, but not its landmarks: the
+            # face may have moved, so the clip redactor finds it (or covers the frame).
+            result = {**last_result, "latency_ms": 0.0}
+        else:
+            detector.set_refine_landmarks(tier.refine_landmarks)
+            result, face_landmarks = run_fatigue_detection(snapshot)
+            runtime_state["last_fatigue_result"] = result
+        result = {**result, "quality_tier": tier.name}
+        # Clip frames carry this cycle's landmarks so redaction needs no second detector.
+        clip_recorder.push(snapshot.get("frame"), face_landmarks=face_landmarks)
+        return result
+
+    def skipped_detection_result(mode):
+        return {
+            "is_drowsy": False,
+            "ear": 0.0,
+            "latency_ms": 0.0,
+            "false_alert": False,
+            "mode": mode,
+            "perclos": 0.0,
+        }
+
+    def run_fatigue_detection(snapshot):
+        """Return `(result, face_landmarks)`; landmarks only when inference ran this cycle."""
         if not runtime_flags.enable_fatigue_detection:
-            return {
-                "is_drowsy": False,
-                "ear": 0.0,
-                "latency_ms": 0.0,
-                "false_alert": False,
-                "mode": active_detector_mode,
-                "perclos": 0.0,
-            }
+            return skipped_detection_result(active_detector_mode), None
+        if runtime_watchdog.safe_detection and not runtime_watchdog.should_attempt(
+            "detect_failures"
+        ):
+            return skipped_detection_result(SAFE_DETECTION_MODE), None
         try:
-            return detector.analyze_frame_with_metrics(
+            result = detector.analyze_frame_with_metrics(
                 None,
                 None,
                 active_detector_mode,
                 snapshot.get("frame"),
             )
-        except (ValueError, TypeError):
+            quality_controller.observe(result["latency_ms"])
+            return result, detector.last_face_landmarks
+        except VisionWorkerStarting:
+            # The worker is loading after a start or a failure that was already counted.
+            return skipped_detection_result(active_detector_mode), None
+        except (ValueError, TypeError, VisionWorkerUnavailable):
             runtime_state["detect_failures"] += 1
-            return {
-                "is_drowsy": False,
-                "ear": 0.0,
-                "latency_ms": 0.0,
-                "false_alert": False,
-                "mode": active_detector_mode,
-                "perclos": 0.0,
-            }
+            return skipped_detection_result(active_detector_mode), None
+
+    def store_completed_clips():
+        for clip in clip_recorder.drain_completed():
+            local_storage.add_event(
+                StorageEvent(event_type="clip", payload=asdict(clip), timestamp=clip.trigger_ts)
+            )
+
+    def route_crash_alert(g_force):
+        logger.warning("Crash detected (g_force=%.2f)", g_force)
+        if runtime_flags.enable_alert_publish:
+            mqtt.send_critical_alert("CRASH", g_force)
+
+    crash_fast_path = CrashFastPath(imu.read_accel, route_alert=route_crash_alert)
+
+    def store_crash(g_force, detected_at=None):
+        clip = clip_recorder.trigger("CRASH", now=detected_at)
+        local_storage.add_event(
+            StorageEvent(
+                event_type="alert_crash",
+                payload={"g_force": g_force, "clip_event_id": clip.event_id},
+                timestamp=detected_at if detected_at is not None else time.time(),
+            )
+        )
+
+    def store_fast_path_crashes():
+        for crash in crash_fast_path.drain_events():
+            store_crash(crash.g_force, crash.detected_at)
 
     def publish_runtime_event(event_type, payload):
-        if event_type == "CRASH":
-            g_force = float(payload.get("g_force", 0.0))
-            logger.warning("Crash detected (g_force=%.2f)", g_force)
-            if runtime_flags.enable_alert_publish:
-                mqtt.send_alert("CRASH", g_force)
+        if event_type == "CRASH" and crash_fast_path.running:
+            return  # already routed by the IMU fast path; stored on the next STATUS
+
+        phase = payload.get("phase", PHASE_START)
+        episode_id = payload.get("episode_id")
+        if phase == PHASE_END:
             local_storage.add_event(
                 StorageEvent(
-                    event_type="alert_crash",
-                    payload={"g_force": g_force},
+                    event_type="alert_episode_end", payload={"alert": event_type, **payload}
                 )
             )
             return
 
+        if event_type == "CRASH":
+            g_force = float(payload.get("g_force", 0.0))
+            logger.warning("Crash detected (g_force=%.2f)", g_force)
+            if runtime_flags.enable_alert_publish:
+                mqtt.send_alert("CRASH", g_force, episode_id=episode_id, phase=phase)
+            store_crash(g_force)
+            return
+
         if event_type == "FATIGUE":
             ear = float(payload.get("ear", 0.0))
-            logger.warning("Fatigue alert triggered (ear=%.2f)", ear)
             if runtime_flags.enable_alert_publish:
-                mqtt.send_alert("FATIGUE", ear)
-            local_storage.add_event(
-                StorageEvent(
-                    event_type="alert_fatigue",
-                    payload={"ear": ear},
-                )
-            )
+                mqtt.send_alert("FATIGUE", ear, episode_id=episode_id, phase=phase)
+            event_payload = {"ear": ear, "episode_id": episode_id, "phase": phase}
+            if phase == PHASE_START:
+                logger.warning("Fatigue alert triggered (ear=%.2f)", ear)
+                event_payload["clip_event_id"] = clip_recorder.trigger("FATIGUE").event_id
+            else:
+                event_payload["duration_s"] = payload.get("duration_s", 0.0)
+            local_storage.add_event(StorageEvent(event_type="alert_fatigue", payload=event_payload))
             return
 
         if event_type == "STATUS":
             current_ts = time.time()
+            store_fast_path_crashes()
+            store_completed_clips()
+            publish_watchdog_transitions()
+            trend_store.append(
+                current_ts,
+                perclos=float(payload.get("perclos", 0.0)),
+                g_force=float(payload.get("g_force", 0.0)),
+            )
             should_publish_status = (
                 runtime_flags.enable_status_telemetry
                 and (current_ts - runtime_state["last_status_publish_ts"])
@@ -197,42 +372,92 @@ def main():
                     "sensor_read_failures": runtime_state["sensor_read_failures"],
                     "detect_failures": runtime_state["detect_failures"],
                 },
+                "scheduler": cycle_scheduler.snapshot(),
+                "crash_path": crash_fast_path.snapshot(),
+                "cycle_profile": cycle_profiler.snapshot(),
+                "watchdog": runtime_watchdog.snapshot(),
+                "alert_episodes": alert_episodes.snapshot(),
+                "detection_quality": quality_controller.snapshot(),
+                "clips": {
+                    "written": clip_recorder.stats["clips_written"],
+                    "dropped": clip_recorder.stats["clips_dropped"],
+                    "redaction_fps": round(clip_recorder.redaction_stats().get("fps", 0.0), 1),
+                },
             }
-            mqtt.send_telemetry(
-                perclos=float(payload.get("perclos", 0.0)),
-                g_force=float(payload.get("g_force", 0.0)),
-                sensor_health=sensor_health,
-                power_profile=power_profile,
-                ai_metrics=ai_metrics,
-                runtime_health=runtime_health,
-            )
+            if isinstance(detector, ProcessFatigueDetector):
+                runtime_health["vision_worker"] = detector.snapshot()
+            perclos = float(payload.get("perclos", 0.0))
+            g_force = float(payload.get("g_force", 0.0))
+            # A reconnect storm suspends STATUS publishing (alerts still go out); it is
+            # still stored locally, and one publish per probe interval tests the link.
+            if not runtime_watchdog.status_publish_suspended or runtime_watchdog.should_attempt(
+                "reconnect_failures"
+            ):
+                mqtt.send_telemetry(perclos=perclos, g_force=g_force, ai_metrics=ai_metrics)
+                mqtt.send_health(
+                    sensor_health=sensor_health,
+                    power_profile=power_profile,
+                    runtime_health=runtime_health,
+                )
             local_storage.add_event(
                 StorageEvent(
                     event_type="status",
                     payload={
-                        "perclos": float(payload.get("perclos", 0.0)),
-                        "g_force": float(payload.get("g_force", 0.0)),
-                        "sensor_health": sensor_health,
-                        "power_profile": power_profile,
+                        "perclos": perclos,
+                        "g_force": g_force,
                         "ai_metrics": ai_metrics,
-                        "runtime_health": runtime_health,
                     },
                 )
             )
+            is_keyframe, changed_health = storage_health_delta.encode(
+                {
+                    "sensor_health": sensor_health,
+                    "power_profile": power_profile,
+                    "runtime_health": runtime_health,
+                }
+            )
+            if changed_health:
+                local_storage.add_event(
+                    StorageEvent(
+                        event_type="health",
+                        payload={"keyframe": is_keyframe, **changed_health},
+                    )
+                )
             runtime_state["last_status_publish_ts"] = current_ts
+            snapshot = capture_warm_state()  # also keeps a worker's export one STATUS old
+            if warm_restart.due():
+                warm_restart.save(snapshot)
 
-    contract = RuntimeOrchestratorContract(
-        read_sensor_snapshot=read_sensor_snapshot,
-        detect_fatigue=detect_fatigue,
-        publish_runtime_event=publish_runtime_event,
+    contract = cycle_profiler.instrument(
+        RuntimeOrchestratorContract(
+            read_sensor_snapshot=read_sensor_snapshot,
+            detect_fatigue=detect_fatigue,
+            publish_runtime_event=publish_runtime_event,
+        )
     )
 
+    crash_fast_path.start()
     try:
-        run_monitoring_loop(contract, loop_delay_s=0.05)
+        run_monitoring_loop(
+            contract,
+            scheduler=cycle_scheduler,
+            topology=runtime_topology,
+            alerts=alert_episodes,
+        )
 
     except KeyboardInterrupt:
         logger.info("Shutting down")
     finally:
+        crash_fast_path.stop()
+        store_fast_path_crashes()
+        publish_watchdog_transitions()
+        if isinstance(detector, ProcessFatigueDetector):
+            detector.close()
+        warm_restart.save(capture_warm_state())
+        warm_restart.close()
+        clip_recorder.close()
+        store_completed_clips()
+        local_storage.close()
         cam.release()
         ir.cleanup()
 
@@ -0,0 +1,77 @@
+"""Lightweight runtime metrics primitives shared by telemetry and orchestration."""
+
+import bisect
+import math
+
+DEFAULT_LATENCY_BUCKETS_MS = (
+    1.0,
+    2.0,
+    5.0,
+    10.0,
+    20.0,
+    50.0,
+    100.0,
+    200.0,
+    500.0,
+    1000.0,
+    2000.0,
+    5000.0,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with O(log buckets) record and constant memory.
+
+    Percentiles resolve to the upper bound of the bucket that contains them, which
+    is precise enough for SLO checks without keeping individual samples.
+    """
+
+    def __init__(self, bounds_ms=DEFAULT_LATENCY_BUCKETS_MS):
+        self.bounds_ms = tuple(float(bound) for bound in bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, latency_ms):
+        """Add one latency sample in milliseconds."""
+        value = max(0.0, float(latency_ms))
+        self.counts[bisect.bisect_left(self.bounds_ms, value)] += 1
+        self.count += 1
+        self.total_ms += value
+        if value > self.max_ms:
+            self.max_ms = value
+
+    def percentile(self, q):
+        """Return the bucket upper bound covering quantile `q` (0..1)."""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index < len(self.bounds_ms):
+                    return min(self.bounds_ms[index], self.max_ms)
+                return self.max_ms
+        return self.max_ms
+
+    def reset(self):
+        """Clear all recorded samples."""
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def snapshot(self):
+        """Return a JSON-serializable summary for health telemetry."""
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+            "bounds_ms": list(self.bounds_ms),
+            "counts": list(self.counts),
+        }
@@ -0,0 +1,234 @@
+"""Threaded sensor -> detection -> telemetry pipeline selected by `RuntimeTopology`."""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from .metrics import LatencyHistogram
+from .planning.software_architecture import (
+    TOPOLOGY_THREADED,
+    RuntimeOrchestratorContract,
+    RuntimeTopology,
+    build_status_payload,
+    fatigue_alert_payload,
+    gate_alert,
+)
+from .scheduler import FixedRateScheduler
+
+_CLOSED = object()
+
+
+class DropOldestQueue:
+    """Bounded FIFO that evicts its oldest droppable item when full.
+
+    Items put with `droppable=False` (alerts) are never evicted, so the queue
+    may briefly exceed `maxsize` while it holds only alerts.
+    """
+
+    def __init__(self, maxsize=2):
+        self.maxsize = max(1, int(maxsize))
+        self.dropped = 0
+        self._items = deque()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item, droppable=True):
+        with self._condition:
+            if len(self._items) >= self.maxsize:
+                for index, (_item, is_droppable) in enumerate(self._items):
+                    if is_droppable:
+                        del self._items[index]
+                        self.dropped += 1
+                        break
+            self._items.append((item, droppable))
+            self._condition.notify()
+
+    def get(self):
+        """Block for the next item; returns `_CLOSED` once closed and drained."""
+        with self._condition:
+            while not self._items and not self._closed:
+                self._condition.wait()
+            if not self._items:
+                return _CLOSED
+            return self._items.popleft()[0]
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+@dataclass
+class _PipelineWork:
+    captured_at: float
+    snapshot: dict[str, Any]
+    g_force: float
+    fatigue_result: dict[str, Any] = field(default_factory=dict)
+
+
+class PipelinedRuntime:
+    """Drives `RuntimeOrchestratorContract` callbacks as pipelined stages.
+
+    Sensor capture, fatigue detection and event publishing each run on a worker
+    thread when their `RuntimeTopology` loop is `threaded`, connected by
+    `DropOldestQueue`s so a slow stage sheds stale snapshots instead of building
+    latency. Non-threaded stages run inline in the upstream stage's thread.
+    CRASH is raised from the sensor stage and never waits on detection; alert
+    events are never dropped. An optional `alerts` state machine turns
+    per-cycle alert conditions into episode events.
+    """
+
+    def __init__(
+        self,
+        contract: RuntimeOrchestratorContract,
+        topology: RuntimeTopology,
+        period_s: float = 0.05,
+        queue_size: int = 2,
+        crash_threshold_g: float = 2.5,
+        scheduler: FixedRateScheduler | None = None,
+        alerts=None,
+    ):
+        self.contract = contract
+        self.topology = topology
+        self.alerts = alerts
+        self.crash_threshold_g = crash_threshold_g
+        self.scheduler = scheduler or FixedRateScheduler(period_s=period_s)
+        self.detection_queue = DropOldestQueue(queue_size)
+        self.telemetry_queue = DropOldestQueue(queue_size)
+        self.end_to_end_ms = LatencyHistogram()
+        self.stats = {"captured": 0, "detected": 0, "published": 0}
+        self._stop = threading.Event()
+        self._error: BaseException | None = None
+
+    def stop(self):
+        """Ask the sensor stage to stop; queued work is still drained."""
+        self._stop.set()
+
+    def run(self, max_cycles=None):
+        """Run until `stop()` or `max_cycles` captures, then drain and join workers.
+
+        An exception raised by a callback on any worker stops the pipeline and is
+        re-raised here, as it would be from the inline loop.
+        """
+        workers = {}
+        if self.topology.telemetry_loop == TOPOLOGY_THREADED:
+            workers["telemetry"] = self._start_worker(
+                "telemetry", self.telemetry_queue, self._publish
+            )
+        if self.topology.detection_loop == TOPOLOGY_THREADED:
+            workers["detection"] = self._start_worker(
+                "detection", self.detection_queue, self._detect
+            )
+        sensor = None
+        try:
+            if self.topology.sensor_loop == TOPOLOGY_THREADED:
+                sensor = threading.Thread(
+                    target=self._guarded,
+                    args=(self._sense_loop, max_cycles),
+                    name="pipeline-sensor",
+                )
+                sensor.start()
+                sensor.join()
+            else:
+                self._sense_loop(max_cycles)
+        finally:
+            self._stop.set()
+            if sensor is not None:
+                sensor.join()
+            # Close upstream first so each worker drains what it was already handed.
+            for name, queue in (
+                ("detection", self.detection_queue),
+                ("telemetry", self.telemetry_queue),
+            ):
+                queue.close()
+                if name in workers:
+                    workers[name].join()
+        if self._error is not None:
+            raise self._error
+
+    def _guarded(self, target, *args):
+        try:
+            target(*args)
+        except Exception as exc:  # surfaced from run() after the workers are joined
+            self._error = self._error or exc
+            self._stop.set()
+
+    def _start_worker(self, name, queue, handler):
+        def consume():
+            while (item := queue.get()) is not _CLOSED:
+                if self._error is None:
+                    handler(item)
+
+        worker = threading.Thread(
+            target=self._guarded, args=(consume,), name=f"pipeline-{name}", daemon=True
+        )
+        worker.start()
+        return worker
+
+    def _sense_loop(self, max_cycles):
+        while not self._stop.is_set():
+            self.scheduler.start_cycle()
+            self._sense()
+            if max_cycles is not None and self.stats["captured"] >= max_cycles:
+                return
+            self.scheduler.wait_next()
+
+    def _sense(self):
+        captured_at = time.perf_counter()
+        snapshot = dict(self.contract.read_sensor_snapshot())
+        g_force = float(snapshot.get("g_force", 0.0))
+        self.stats["captured"] += 1
+        crash_payload = gate_alert(
+            self.alerts, "CRASH", g_force > self.crash_threshold_g, {"g_force": g_force}
+        )
+        if crash_payload is not None:
+            self._emit(("CRASH", crash_payload, None), droppable=False)
+        work = _PipelineWork(captured_at=captured_at, snapshot=snapshot, g_force=g_force)
+        if self.topology.detection_loop == TOPOLOGY_THREADED:
+            self.detection_queue.put(work)
+        else:
+            self._detect(work)
+
+    def _detect(self, work):
+        work.fatigue_result = dict(self.contract.detect_fatigue(work.snapshot))
+        self.stats["detected"] += 1
+        fatigue_payload = gate_alert(
+            self.alerts,
+            "FATIGUE",
+            bool(work.fatigue_result.get("is_drowsy", False)),
+            fatigue_alert_payload(work.fatigue_result),
+        )
+        if fatigue_payload is not None:
+            self._emit(("FATIGUE", fatigue_payload, None), droppable=False)
+        status_payload = build_status_payload(work.g_force, work.fatigue_result)
+        self._emit(("STATUS", status_payload, work.captured_at), droppable=True)
+
+    def _emit(self, event, droppable):
+        if self.topology.telemetry_loop == TOPOLOGY_THREADED:
+            self.telemetry_queue.put(event, droppable=droppable)
+        else:
+            self._publish(event)
+
+    def _publish(self, event):
+        event_type, payload, captured_at = event
+        self.contract.publish_runtime_event(event_type, payload)
+        if captured_at is not None:
+            self.stats["published"] += 1
+            self.end_to_end_ms.record((time.perf_counter() - captured_at) * 1000.0)
+
+    def snapshot(self):
+        """Return stage counters, queue drops and end-to-end latency for runtime health."""
+        return {
+            **self.stats,
+            "dropped": {
+                "detection": self.detection_queue.dropped,
+                "telemetry": self.telemetry_queue.dropped,
+            },
+            "end_to_end_p50_ms": self.end_to_end_ms.percentile(0.50),
+            "end_to_end_p95_ms": self.end_to_end_ms.percentile(0.95),
+        }
@@ -35,6 +35,42 @@ def build_default_ai_plan() -> AIPlan:
     return AIPlan()
 
 
+@dataclass(frozen=True)
+class DetectionQualityTier:
+    """One step of detection quality traded for latency."""
+
+    name: str
+    capture_width: int = 640
+    capture_height: int = 480
+    refine_landmarks: bool = True
+    inference_every_n_frames: int = 1
+
+
+def detection_quality_tiers() -> list[DetectionQualityTier]:
+    """Returns quality tiers from full fidelity to cheapest, in step-down order."""
+    return [
+        DetectionQualityTier("full"),
+        DetectionQualityTier("no-refine", refine_landmarks=False),
+        DetectionQualityTier(
+            "low-res", capture_width=320, capture_height=240, refine_landmarks=False
+        ),
+        DetectionQualityTier(
+            "half-cadence",
+            capture_width=320,
+            capture_height=240,
+            refine_landmarks=False,
+            inference_every_n_frames=2,
+        ),
+        DetectionQualityTier(
+            "quarter-cadence",
+            capture_width=320,
+            capture_height=240,
+            refine_landmarks=False,
+            inference_every_n_frames=4,
+        ),
+    ]
+
+
 def evaluation_contract(plan: AIPlan) -> dict[str, object]:
     """Defines dataset/metrics contract for AI validation and rollout gates."""
     return {
@@ -5,6 +5,12 @@ from dataclasses import dataclass
 SUPPORTED_PROTOCOLS = {"mqtt", "ble", "usb", "wifi", "cellular"}
 PRIMARY_TRANSPORT = "wifi"
 BACKUP_TRANSPORT = "usb"
+PAYLOAD_CODEC_JSON = "json"
+PAYLOAD_CODEC_MSGPACK = "msgpack"
+PAYLOAD_SCHEMA_VERSIONS = {
+    PAYLOAD_CODEC_JSON: "v1",
+    PAYLOAD_CODEC_MSGPACK: "v1+msgpack",
+}
 
 
 @dataclass(frozen=True)
@@ -46,12 +52,21 @@ class ConnectivityConfig:
     max_alert_latency_s: float = 2.0
     status_qos: int = 0
     alert_qos: int = 1
+    health_qos: int = 1
+    health_keyframe_interval_s: float = 60.0
     offline_queue_enabled: bool = False
     offline_queue_max_items: int = 100
     reconnect_initial_delay_s: float = 0.5
     reconnect_max_delay_s: float = 8.0
     max_reconnect_attempts: int = 5
+    max_inflight_messages: int = 20
+    publish_ack_timeout_s: float = 5.0
     security_profile: str = "dev-public-broker"
+    payload_codec: str = PAYLOAD_CODEC_JSON
+
+    def __post_init__(self):
+        # Normalized once here; validation, contracts and codec lookup use it as given.
+        self.payload_codec = self.payload_codec.strip().lower()
 
 
 def validate_connectivity_config(config: ConnectivityConfig) -> bool:
@@ -67,6 +82,10 @@ def validate_connectivity_config(config: ConnectivityConfig) -> bool:
         return False
     if config.alert_qos not in {0, 1}:
         return False
+    if config.health_qos not in {0, 1}:
+        return False
+    if config.health_keyframe_interval_s <= 0:
+        return False
     if config.reconnect_initial_delay_s <= 0 or config.reconnect_max_delay_s <= 0:
         return False
     if config.reconnect_initial_delay_s > config.reconnect_max_delay_s:
@@ -75,26 +94,44 @@ def validate_connectivity_config(config: ConnectivityConfig) -> bool:
         return False
     if config.offline_queue_max_items <= 0:
         return False
+    if config.max_inflight_messages <= 0 or config.publish_ack_timeout_s <= 0:
+        return False
+    if config.payload_codec not in PAYLOAD_SCHEMA_VERSIONS:
+        return False
     return config.protocol.lower() in SUPPORTED_PROTOCOLS
 
 
-def topic_contracts() -> dict[str, TopicContract]:
-    """Return canonical topic contracts for STATUS/ALERT/HEALTH payloads."""
+def codec_schema_version(payload_codec: str) -> str:
+    """Return the topic schema version advertised for a payload codec."""
+
+    try:
+        return PAYLOAD_SCHEMA_VERSIONS[payload_codec]
+    except KeyError as e:
+        raise ValueError(f"Unsupported payload codec: {payload_codec}") from e
+
+
+def topic_contracts(payload_codec: str = PAYLOAD_CODEC_JSON) -> dict[str, TopicContract]:
+    """Return canonical topic contracts for STATUS/ALERT/HEALTH payloads.
+
+    The schema version carries the payload codec so publishers and ingest
+    negotiate the wire encoding through the same contract.
+    """
 
+    schema_version = codec_schema_version(payload_codec)
     return {
         "STATUS": TopicContract(
             topic="smarthelmet/v1/telemetry",
-            schema_version="v1",
+            schema_version=schema_version,
             payload_class="StatusPayload",
         ),
         "ALERT": TopicContract(
             topic="smarthelmet/v1/alerts",
-            schema_version="v1",
+            schema_version=schema_version,
             payload_class="AlertPayload",
         ),
         "HEALTH": TopicContract(
             topic="smarthelmet/v1/health",
-            schema_version="v1",
+            schema_version=schema_version,
             payload_class="HealthPayload",
         ),
     }
@@ -4,14 +4,42 @@ from collections.abc import Callable, Mapping
 from dataclasses import dataclass, field
 from typing import Any
 
+TOPOLOGY_SINGLE_THREAD_POLLING = "single-thread-polling"
+TOPOLOGY_INLINE = "inline"
+TOPOLOGY_THREADED = "threaded"
+DETECTION_IN_PROCESS = "in-process"
+DETECTION_WORKER_PROCESS = "worker-process"
+CYCLE_ID_KEY = "_profiler_cycle_id"  # carried from snapshot to result to STATUS when profiled
+
 
 @dataclass
 class RuntimeTopology:
-    """Declares execution style for sensor, detection, and telemetry loops."""
+    """Declares execution style for sensor, detection, and telemetry loops.
+
+    Each loop is either run inline by the loop before it (`inline`, or
+    `single-thread-polling` for the sensor loop) or on its own worker thread
+    (`threaded`) fed by a bounded drop-oldest queue. `detection_isolation`
+    selects whether fatigue inference runs in this process or in a restartable
+    `worker-process` fed through shared memory.
+    """
+
+    sensor_loop: str = TOPOLOGY_SINGLE_THREAD_POLLING
+    detection_loop: str = TOPOLOGY_INLINE
+    telemetry_loop: str = TOPOLOGY_INLINE
+    detection_isolation: str = DETECTION_IN_PROCESS
 
-    sensor_loop: str = "single-thread-polling"
-    detection_loop: str = "inline"
-    telemetry_loop: str = "inline"
+    @property
+    def pipelined(self) -> bool:
+        return TOPOLOGY_THREADED in (self.sensor_loop, self.detection_loop, self.telemetry_loop)
+
+
+def pipelined_topology() -> RuntimeTopology:
+    """Return the topology with sensor, detection and telemetry on separate workers."""
+    return RuntimeTopology(
+        sensor_loop=TOPOLOGY_THREADED,
+        detection_loop=TOPOLOGY_THREADED,
+        telemetry_loop=TOPOLOGY_THREADED,
+    )
 
 
 @dataclass
@@ -31,40 +59,71 @@ class RuntimeOrchestratorContract:
     publish_runtime_event: Callable[[str, Mapping[str, Any]], None]
 
 
+def fatigue_alert_payload(fatigue_result: Mapping[str, Any]) -> dict[str, Any]:
+    """Build the FATIGUE event payload from a detector result."""
+    return {
+        "ear": float(fatigue_result.get("ear", 0.0)),
+        "latency_ms": float(fatigue_result.get("latency_ms", 0.0)),
+        "mode": fatigue_result.get("mode", "heuristic-ear-perclos"),
+    }
+
+
+def build_status_payload(g_force: float, fatigue_result: Mapping[str, Any]) -> dict[str, Any]:
+    """Build the STATUS event payload for one sensor snapshot and detector result."""
+    ai_metrics = {
+        "mode": fatigue_result.get("mode", "heuristic-ear-perclos"),
+        "latency_ms": float(fatigue_result.get("latency_ms", 0.0)),
+        "false_alert": bool(fatigue_result.get("false_alert", False)),
+    }
+    if "quality_tier" in fatigue_result:
+        ai_metrics["quality_tier"] = fatigue_result["quality_tier"]
+    payload = {
+        "g_force": g_force,
+        "perclos": float(fatigue_result.get("perclos", 0.0)),
+        "fatigue": bool(fatigue_result.get("is_drowsy", False)),
+        "ai_metrics": ai_metrics,
+    }
+    if CYCLE_ID_KEY in fatigue_result:
+        payload[CYCLE_ID_KEY] = fatigue_result[CYCLE_ID_KEY]
+    return payload
+
+
+def gate_alert(
+    alerts: Any, alert_type: str, active: bool, payload: dict[str, Any]
+) -> dict[str, Any] | None:
+    """Return the alert payload to publish this cycle, or None.
+
+    Without an alert state machine (`gp2.alerts.AlertStateMachine`) every
+    active cycle publishes; with one, only episode start/update/end events do.
+    """
+    if alerts is None:
+        return payload if active else None
+    return alerts.observe(alert_type, active, payload)
+
+
 def execute_runtime_cycle(
     contract: RuntimeOrchestratorContract,
     crash_threshold_g: float = 2.5,
+    alerts: Any = None,
 ) -> dict[str, Any]:
     """Execute one orchestrator cycle using injected side-effect boundaries."""
     snapshot = dict(contract.read_sensor_snapshot())
     g_force = float(snapshot.get("g_force", 0.0))
     crash_detected = g_force > crash_threshold_g
 
-    if crash_detected:
-        contract.publish_runtime_event("CRASH", {"g_force": g_force})
+    crash_payload = gate_alert(alerts, "CRASH", crash_detected, {"g_force": g_force})
+    if crash_payload is not None:
+        contract.publish_runtime_event("CRASH", crash_payload)
 
     fatigue_result = dict(contract.detect_fatigue(snapshot))
     fatigue_detected = bool(fatigue_result.get("is_drowsy", False))
-    if fatigue_detected:
-        contract.publish_runtime_event(
-            "FATIGUE",
-            {
-                "ear": float(fatigue_result.get("ear", 0.0)),
-                "latency_ms": float(fatigue_result.get("latency_ms", 0.0)),
-                "mode": fatigue_result.get("mode", "heuristic-ear-perclos"),
-            },
-        )
-
-    status_payload: dict[str, Any] = {
-        "g_force": g_force,
-        "perclos": float(fatigue_result.get("perclos", 0.0)),
-        "fatigue": fatigue_detected,
-        "ai_metrics": {
-            "mode": fatigue_result.get("mode", "heuristic-ear-perclos"),
-            "latency_ms": float(fatigue_result.get("latency_ms", 0.0)),
-            "false_alert": bool(fatigue_result.get("false_alert", False)),
-        },
-    }
+    fatigue_payload = gate_alert(
+        alerts, "FATIGUE", fatigue_detected, fatigue_alert_payload(fatigue_result)
+    )
+    if fatigue_payload is not None:
+        contract.publish_runtime_event("FATIGUE", fatigue_payload)
+
+    status_payload = build_status_payload(g_force, fatigue_result)
     contract.publish_runtime_event("STATUS", status_payload)
 
     return {
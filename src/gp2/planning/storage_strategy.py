@@ -1,9 +1,16 @@
 """Storage strategy models and local retention/replay helpers."""
 
+import hashlib
+import heapq
 import json
+import math
+import os
 import sqlite3
 import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass, field
+from functools import partial
 from typing import Any
 
 
@@ -17,6 +24,31 @@ class StoragePolicy:
     cloud_sync_enabled: bool = False
     encryption_required: bool = True
     sync_conflict_policy: str = "last-write-wins"
+    write_behind_enabled: bool = False
+    write_behind_max_batch: int = 64
+    write_behind_flush_interval_s: float = 1.0
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    prune_interval_s: float = 60.0
+    prune_high_water_ratio: float = 1.1
+    partition_interval_s: int = 3600
+    payload_dedupe_sections: tuple[str, ...] = (
+        "sensor_health",
+        "power_profile",
+        "runtime_health",
+    )
+    trip_idle_gap_s: float = 300.0
+    trip_motion_threshold_g: float = 0.1
+    trip_assumed_speed_kmh: float = 15.0
+
+
+IMMEDIATE_FLUSH_EVENT_PREFIX = "alert_"
+PARTITION_TABLE_PREFIX = "events_p"
+SECTION_TABLE_PREFIX = "sections_p"
+PAYLOAD_SECTION_REF_KEY = "$section"
+PAYLOAD_SECTION_CACHE_SIZE = 256
+TRIP_TABLE = "trip_summaries"
+DEFAULT_DATA_DIR = os.path.join(os.path.expanduser("~"), ".gp2")
 
 
 @dataclass
@@ -27,6 +59,44 @@ class StorageEvent:
     payload: dict[str, Any]
     timestamp: float = field(default_factory=time.time)
     synced: bool = False
+    event_id: int | None = None
+
+
+@dataclass
+class StoredEventRecord:
+    """Stored event row whose JSON payload is decoded only when first accessed."""
+
+    event_id: int
+    event_type: str
+    timestamp: float
+    synced: bool
+    raw_payload: str = field(repr=False)
+    section_resolver: Callable[[dict[str, Any]], dict[str, Any]] | None = field(
+        default=None, repr=False, compare=False
+    )
+    _decoded_payload: dict[str, Any] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def payload(self) -> dict[str, Any]:
+        """Decoded payload, parsed from `raw_payload` on first access."""
+        if self._decoded_payload is None:
+            payload = json.loads(self.raw_payload)
+            if self.section_resolver is not None:
+                payload = self.section_resolver(payload)
+            self._decoded_payload = payload
+        return self._decoded_payload
+
+    def to_storage_event(self) -> StorageEvent:
+        """Return an eagerly decoded `StorageEvent` copy of this record."""
+        return StorageEvent(
+            event_type=self.event_type,
+            payload=self.payload,
+            timestamp=self.timestamp,
+            synced=self.synced,
+            event_id=self.event_id,
+        )
 
 
 @dataclass(frozen=True)
@@ -38,6 +108,110 @@ class TripSummary:
     ended_at: float
     distance_km: float
     event_count: int
+    event_counts: dict[str, int] = field(default_factory=dict, hash=False)
+    active_s: float = 0.0
+
+
+@dataclass
+class _TripState:
+    trip_id: str
+    started_at: float
+    last_event_ts: float
+    last_motion_ts: float
+    active_s: float = 0.0
+    event_counts: dict[str, int] = field(default_factory=dict)
+
+
+class TripAggregator:
+    """Streaming trip segmentation over stored events.
+
+    A trip opens on the first event showing motion (IMU `g_force` deviating from
+    1 g by at least `trip_motion_threshold_g`) and closes once no event, or no
+    motion, has been seen for `trip_idle_gap_s`. Moving time between
+    consecutive events accumulates as activity; distance is estimated from it
+    at `trip_assumed_speed_kmh` because the IMU cannot measure speed directly.
+    """
+
+    def __init__(self, policy: StoragePolicy):
+        self.policy = policy
+        self.current: _TripState | None = None
+        self._dirty: dict[str, TripSummary] = {}
+
+    def is_motion(self, event: StorageEvent) -> bool:
+        g_force = event.payload.get("g_force") if isinstance(event.payload, dict) else None
+        if not isinstance(g_force, int | float) or g_force <= 0.0:
+            return False  # 0 g means the IMU read failed, not free fall
+        return abs(float(g_force) - 1.0) >= self.policy.trip_motion_threshold_g
+
+    def observe(self, event: StorageEvent) -> TripSummary | None:
+        """Fold one event into trip state; returns the trip it closed, if any."""
+        timestamp = float(event.timestamp)
+        moving = self.is_motion(event)
+        closed = None
+        trip = self.current
+        idle_gap_s = self.policy.trip_idle_gap_s
+        if trip is not None and (
+            timestamp - trip.last_event_ts > idle_gap_s
+            or timestamp - trip.last_motion_ts > idle_gap_s
+        ):
+            closed = self.close()
+            trip = None
+
+        if trip is None:
+            if not moving:
+                return closed
+            trip = self.current = _TripState(
+                trip_id=f"trip-{int(timestamp * 1000)}",
+                started_at=timestamp,
+                last_event_ts=timestamp,
+                last_motion_ts=timestamp,
+            )
+        elif moving and timestamp > trip.last_event_ts:
+            trip.active_s += timestamp - trip.last_event_ts
+
+        trip.event_counts[event.event_type] = trip.event_counts.get(event.event_type, 0) + 1
+        trip.last_event_ts = max(trip.last_event_ts, timestamp)
+        if moving:
+            trip.last_motion_ts = max(trip.last_motion_ts, timestamp)
+        self._dirty[trip.trip_id] = self.summary(trip)
+        return closed
+
+    def close(self) -> TripSummary | None:
+        """Close the open trip, if any, and return its final summary."""
+        trip, self.current = self.current, None
+        if trip is None:
+            return None
+        summary = self.summary(trip)
+        self._dirty[trip.trip_id] = summary
+        return summary
+
+    def summary(self, trip: _TripState) -> TripSummary:
+        return TripSummary(
+            trip_id=trip.trip_id,
+            started_at=trip.started_at,
+            ended_at=trip.last_motion_ts,
+            distance_km=trip.active_s / 3600.0 * self.policy.trip_assumed_speed_kmh,
+            event_count=sum(trip.event_counts.values()),
+            event_counts=dict(trip.event_counts),
+            active_s=trip.active_s,
+        )
+
+    def drain_dirty(self) -> list[tuple[TripSummary, bool]]:
+        """Return `(summary, is_open)` for trips changed since the last drain."""
+        dirty, self._dirty = self._dirty, {}
+        open_id = self.current.trip_id if self.current is not None else None
+        return [(summary, summary.trip_id == open_id) for summary in dirty.values()]
+
+    def restore(self, summary: TripSummary, last_event_ts: float):
+        """Resume an open trip persisted by a previous process."""
+        self.current = _TripState(
+            trip_id=summary.trip_id,
+            started_at=summary.started_at,
+            last_event_ts=last_event_ts,
+            last_motion_ts=summary.ended_at,
+            active_s=summary.active_s,
+            event_counts=dict(summary.event_counts),
+        )
 
 
 @dataclass(frozen=True)
@@ -62,20 +236,183 @@ class EventClipMetadata:
 
 
 class LocalStorageBuffer:
-    """SQLite-backed local buffer for retention, replay, and sync bookkeeping."""
+    """SQLite-backed local buffer for retention, replay, and sync bookkeeping.
+
+    Events are stored in time-bucketed partition tables (`events_p<bucket>`, one
+    per `partition_interval_s` of event time) that share one id sequence; a
+    temporary `events` view spans them so reads stay in insertion order.
+    Retention drops whole expired partitions and trims only the one partition
+    that straddles the cutoff.
+
+    With `policy.write_behind_enabled`, events are held in memory and written in
+    one transaction per `write_behind_max_batch` events or
+    `write_behind_flush_interval_s` seconds; `alert_*` events flush immediately.
+    Reads flush pending events first so callers always see their own writes.
+
+    Pruning is amortized: retention runs at most every `prune_interval_s`, and
+    capacity pruning runs only once the maintained row counter crosses the
+    high-water mark (`prune_high_water_ratio` x max items), then trims back to
+    `on_device_queue_max_items` with id-range deletes.
+
+    Every added event is also folded into a `TripAggregator`; changed trip
+    summaries are upserted into `trip_summaries` in the same flush transaction,
+    so `trip_history()` reads one row per trip instead of rescanning events.
+    Trip summaries outlive event retention.
+
+    The connection is not bound to the creating thread, so a pipeline worker
+    may own the buffer; callers must not use one buffer from two threads at once.
+    """
 
     def __init__(self, policy: StoragePolicy, db_path: str = ":memory:"):
+        if policy.partition_interval_s <= 0:
+            raise ValueError("partition_interval_s must be positive.")
         self.policy = policy
         self.db_path = db_path
-        self._conn = sqlite3.connect(self.db_path)
+        self._pending: list[StorageEvent] = []
+        self._last_flush_ts = time.monotonic()
+        self._last_retention_prune_ts: float | None = None
+        self._partitions: dict[int, int] = {}
+        self._next_id = 1
+        self._row_count = 0
+        self._section_cache: OrderedDict[str, str] = OrderedDict()
+        self._known_sections: dict[int, set[str]] = {}
+        self.trips = TripAggregator(policy)
+        self.stats = {
+            "events_added": 0,
+            "flushes": 0,
+            "commits": 0,
+            "prunes": 0,
+            "partitions_dropped": 0,
+            "section_refs": 0,
+        }
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self._conn.row_factory = sqlite3.Row
+        self._configure_connection()
         self._init_schema()
 
+    def _configure_connection(self):
+        journal_mode = self.policy.sqlite_journal_mode.strip().upper()
+        synchronous = self.policy.sqlite_synchronous.strip().upper()
+        if journal_mode not in {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}:
+            raise ValueError(f"Unsupported SQLite journal mode: {journal_mode}")
+        if synchronous not in {"OFF", "NORMAL", "FULL", "EXTRA"}:
+            raise ValueError(f"Unsupported SQLite synchronous setting: {synchronous}")
+        self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+
     def _init_schema(self):
         self._conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+            "CREATE TABLE IF NOT EXISTS storage_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO storage_meta(key, value) VALUES ('next_event_id', 1)"
+        )
+        next_row = self._conn.execute(
+            "SELECT value FROM storage_meta WHERE key = 'next_event_id'"
+        ).fetchone()
+        self._next_id = int(next_row["value"])
+
+        rows = self._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?",
+            (f"{PARTITION_TABLE_PREFIX}[0-9]*",),
+        ).fetchall()
+        for row in rows:
+            table = str(row["name"])
+            count_row = self._conn.execute(f"SELECT COUNT(*) AS total FROM {table}").fetchone()
+            self._partitions[int(table[len(PARTITION_TABLE_PREFIX) :])] = int(count_row["total"])
+            self._row_count += int(count_row["total"])
+            self._create_partition_companions(int(table[len(PARTITION_TABLE_PREFIX) :]))
+
+        self._migrate_unpartitioned_events()
+        self._rebuild_events_view()
+        self._init_trip_schema()
+        self._commit()
+
+    def _migrate_unpartitioned_events(self):
+        """Move rows from a pre-partitioning `events` table into partitions."""
+        legacy = self._conn.execute(
+            "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'events'"
+        ).fetchone()
+        if legacy is None:
+            return
+        rows = self._conn.execute(
+            "SELECT event_type, payload, timestamp, synced FROM main.events ORDER BY id ASC"
+        ).fetchall()
+        self._write_rows([tuple(row) for row in rows])
+        self._conn.execute("DROP TABLE main.events")
+
+    def _init_trip_schema(self):
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {TRIP_TABLE} ("
+            "trip_id TEXT PRIMARY KEY, started_at REAL NOT NULL, ended_at REAL NOT NULL, "
+            "distance_km REAL NOT NULL, event_count INTEGER NOT NULL, "
+            "event_counts TEXT NOT NULL, active_s REAL NOT NULL, open_last_event_ts REAL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{TRIP_TABLE}_started_at ON {TRIP_TABLE}(started_at)"
+        )
+        row = self._conn.execute(
+            f"SELECT * FROM {TRIP_TABLE} WHERE open_last_event_ts IS NOT NULL "
+            "ORDER BY started_at DESC LIMIT 1"
+        ).fetchone()
+        if row is not None:
+            self.trips.restore(self._row_to_trip(row), float(row["open_last_event_ts"]))
+
+    @staticmethod
+    def _row_to_trip(row: sqlite3.Row) -> TripSummary:
+        return TripSummary(
+            trip_id=str(row["trip_id"]),
+            started_at=float(row["started_at"]),
+            ended_at=float(row["ended_at"]),
+            distance_km=float(row["distance_km"]),
+            event_count=int(row["event_count"]),
+            event_counts=json.loads(row["event_counts"]),
+            active_s=float(row["active_s"]),
+        )
+
+    def _write_trips(self):
+        dirty = self.trips.drain_dirty()
+        if not dirty:
+            return
+        open_last_event_ts = self.trips.current.last_event_ts if self.trips.current else None
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO {TRIP_TABLE}(trip_id, started_at, ended_at, distance_km, "
+            "event_count, event_counts, active_s, open_last_event_ts) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    summary.trip_id,
+                    summary.started_at,
+                    summary.ended_at,
+                    summary.distance_km,
+                    summary.event_count,
+                    json.dumps(summary.event_counts, sort_keys=True),
+                    summary.active_s,
+                    open_last_event_ts if is_open else None,
+                )
+                for summary, is_open in dirty
+            ],
+        )
+
+    def _commit(self):
+        self._conn.commit()
+        self.stats["commits"] += 1
+
+    def _bucket_for(self, timestamp: float) -> int:
+        return max(0, int(timestamp // self.policy.partition_interval_s))
+
+    @staticmethod
+    def _partition_table(bucket: int) -> str:
+        return f"{PARTITION_TABLE_PREFIX}{bucket}"
+
+    def _ensure_partition(self, bucket: int) -> str:
+        table = self._partition_table(bucket)
+        if bucket in self._partitions:
+            return table
+        self._conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY,
                 event_type TEXT NOT NULL,
                 payload TEXT NOT NULL,
                 timestamp REAL NOT NULL,
@@ -83,87 +420,501 @@ class LocalStorageBuffer:
             )
             """
         )
-        self._conn.commit()
+        self._create_partition_companions(bucket)
+        self._partitions[bucket] = 0
+        self._rebuild_events_view()
+        return table
+
+    def _create_partition_companions(self, bucket: int):
+        """Create a partition's indexes and its content-addressed section table."""
+        table = self._partition_table(bucket)
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_timestamp ON {table}(timestamp)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_unsynced ON {table}(id) WHERE synced = 0"
+        )
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {SECTION_TABLE_PREFIX}{bucket} "
+            "(hash TEXT PRIMARY KEY, body TEXT NOT NULL) WITHOUT ROWID"
+        )
+
+    def _drop_partition(self, bucket: int):
+        self._conn.execute(f"DROP TABLE IF EXISTS {self._partition_table(bucket)}")
+        self._conn.execute(f"DROP TABLE IF EXISTS {SECTION_TABLE_PREFIX}{bucket}")
+        self._known_sections.pop(bucket, None)
+        self._row_count -= self._partitions.pop(bucket, 0)
+        self.stats["partitions_dropped"] += 1
+
+    def _rebuild_events_view(self):
+        """Recreate the temporary `events` view over the current partition set."""
+        selects = [
+            f"SELECT id, event_type, payload, timestamp, synced, {bucket} AS partition_bucket "
+            f"FROM {self._partition_table(bucket)}"
+            for bucket in sorted(self._partitions)
+        ]
+        body = " UNION ALL ".join(selects) or (
+            "SELECT NULL AS id, NULL AS event_type, NULL AS payload, NULL AS timestamp, "
+            "NULL AS synced, NULL AS partition_bucket WHERE 0"
+        )
+        self._conn.execute("DROP VIEW IF EXISTS temp.events")
+        self._conn.execute(f"CREATE TEMP VIEW events AS {body}")
+
+    def _write_rows(self, rows: list[tuple]):
+        """Insert `(event_type, payload_json, timestamp, synced)` rows into their partitions."""
+        by_bucket: dict[int, list[tuple]] = {}
+        for event_type, payload, timestamp, synced in rows:
+            by_bucket.setdefault(self._bucket_for(float(timestamp)), []).append(
+                (self._next_id, event_type, payload, float(timestamp), int(synced))
+            )
+            self._next_id += 1
+        for bucket, bucket_rows in by_bucket.items():
+            table = self._ensure_partition(bucket)
+            self._conn.executemany(
+                f"INSERT INTO {table}(id, event_type, payload, timestamp, synced) "
+                "VALUES (?, ?, ?, ?, ?)",
+                bucket_rows,
+            )
+            self._partitions[bucket] += len(bucket_rows)
+        self._conn.execute(
+            "UPDATE storage_meta SET value = ? WHERE key = 'next_event_id'", (self._next_id,)
+        )
+        self._row_count += len(rows)
+
+    @property
+    def row_count(self) -> int:
+        """Number of flushed rows, maintained without `COUNT(*)` scans."""
+        return self._row_count
+
+    @property
+    def partitions(self) -> dict[str, int]:
+        """Row count per partition table, oldest partition first."""
+        return {
+            self._partition_table(bucket): self._partitions[bucket]
+            for bucket in sorted(self._partitions)
+        }
+
+    @property
+    def capacity_high_water(self) -> int:
+        """Row count at which amortized capacity pruning is triggered."""
+        max_items = max(1, self.policy.on_device_queue_max_items)
+        return max(max_items + 1, math.ceil(max_items * self.policy.prune_high_water_ratio))
+
+    @property
+    def database_bytes(self) -> int:
+        """Size of the main database file in bytes (page count times page size)."""
+        page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return int(page_count) * int(page_size)
+
+    @property
+    def pending_writes(self) -> int:
+        """Number of write-behind events not yet flushed to SQLite."""
+        return len(self._pending)
 
     @property
     def events(self) -> list[StorageEvent]:
         """Return all events in insertion order for compatibility with tests."""
-        rows = self._conn.execute(
-            "SELECT event_type, payload, timestamp, synced FROM events ORDER BY id ASC"
-        ).fetchall()
-        return [
-            StorageEvent(
-                event_type=str(row["event_type"]),
-                payload=json.loads(str(row["payload"])),
-                timestamp=float(row["timestamp"]),
-                synced=bool(row["synced"]),
-            )
-            for row in rows
+        return [record.to_storage_event() for record in self.iter_events()]
+
+    def iter_events(
+        self,
+        event_type: str | None = None,
+        start_ts: float | None = None,
+        end_ts: float | None = None,
+        synced: bool | None = None,
+        batch_size: int = 256,
+    ) -> Iterator[StoredEventRecord]:
+        """Stream stored events in insertion order with optional filters.
+
+        Only partitions overlapping `[start_ts, end_ts)` are scanned; rows are
+        read with `fetchmany(batch_size)` per partition and merged by id, so
+        memory stays bounded by the batch size. Payloads decode lazily. Finish
+        or close the iterator before writing, since retention may drop tables.
+        """
+        self.flush()
+        clauses = []
+        params: list[Any] = []
+        if event_type is not None:
+            clauses.append("event_type = ?")
+            params.append(event_type)
+        if start_ts is not None:
+            clauses.append("timestamp >= ?")
+            params.append(float(start_ts))
+        if end_ts is not None:
+            clauses.append("timestamp < ?")
+            params.append(float(end_ts))
+        if synced is not None:
+            clauses.append("synced = ?")
+            params.append(int(synced))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        interval = self.policy.partition_interval_s
+        streams = [
+            self._stream_partition(bucket, where, params, batch_size)
+            for bucket in sorted(self._partitions)
+            if (start_ts is None or (bucket + 1) * interval > start_ts)
+            and (end_ts is None or bucket * interval < end_ts)
         ]
+        yield from heapq.merge(*streams, key=lambda record: record.event_id)
+
+    def _stream_partition(
+        self, bucket: int, where: str, params: list[Any], batch_size: int
+    ) -> Iterator[StoredEventRecord]:
+        resolver = partial(self._resolve_sections, bucket)
+        cursor = self._conn.execute(
+            f"SELECT id, event_type, payload, timestamp, synced "
+            f"FROM {self._partition_table(bucket)}{where} ORDER BY id ASC",
+            params,
+        )
+        try:
+            while rows := cursor.fetchmany(max(1, batch_size)):
+                for row in rows:
+                    yield StoredEventRecord(
+                        event_id=int(row["id"]),
+                        event_type=str(row["event_type"]),
+                        timestamp=float(row["timestamp"]),
+                        synced=bool(row["synced"]),
+                        raw_payload=str(row["payload"]),
+                        section_resolver=resolver,
+                    )
+        finally:
+            cursor.close()
+
+    def _row_to_event(self, row: sqlite3.Row, bucket: int) -> StorageEvent:
+        return StorageEvent(
+            event_type=str(row["event_type"]),
+            payload=self._resolve_sections(bucket, json.loads(str(row["payload"]))),
+            timestamp=float(row["timestamp"]),
+            synced=bool(row["synced"]),
+            event_id=int(row["id"]),
+        )
 
-    def add_event(self, event: StorageEvent):
-        """Append event and enforce retention/queue bounds."""
-        self._conn.execute(
-            "INSERT INTO events(event_type, payload, timestamp, synced) VALUES (?, ?, ?, ?)",
-            (
-                event.event_type,
-                json.dumps(event.payload),
-                float(event.timestamp),
-                int(event.synced),
-            ),
+    def add_event(self, event: StorageEvent, flush: bool = False):
+        """Append event and enforce retention/queue bounds.
+
+        In write-behind mode the event is buffered until the batch/interval
+        threshold is reached, `flush=True` is passed, or it is an alert event.
+        """
+        self.stats["events_added"] += 1
+        self._pending.append(event)
+        self.trips.observe(event)
+        if not self.policy.write_behind_enabled:
+            self.flush()
+            return
+
+        if (
+            flush
+            or event.event_type.startswith(IMMEDIATE_FLUSH_EVENT_PREFIX)
+            or len(self._pending) >= max(1, self.policy.write_behind_max_batch)
+        ):
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def add_events(self, events: list[StorageEvent]) -> int:
+        """Append a batch of events and flush them in one transaction.
+
+        Used to seed large histories (imports, benchmarks) without one commit
+        per event; returns the number of rows written.
+        """
+        self.stats["events_added"] += len(events)
+        for event in events:
+            self._pending.append(event)
+            self.trips.observe(event)
+        return self.flush()
+
+    def flush_if_due(self, now: float | None = None) -> bool:
+        """Flush buffered events when the write-behind interval has elapsed."""
+        effective_now = now if now is not None else time.monotonic()
+        if (
+            not self._pending
+            or (effective_now - self._last_flush_ts) < self.policy.write_behind_flush_interval_s
+        ):
+            return False
+        self.flush()
+        return True
+
+    def flush(self) -> int:
+        """Write buffered events and apply retention/capacity bounds in one transaction."""
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, []
+        sections: dict[int, dict[str, str]] = {}
+        self._write_rows(
+            [
+                (
+                    event.event_type,
+                    self._encode_payload(
+                        event.payload,
+                        sections.setdefault(self._bucket_for(float(event.timestamp)), {}),
+                    ),
+                    event.timestamp,
+                    event.synced,
+                )
+                for event in batch
+            ]
         )
-        self._conn.commit()
-        self.prune_retention()
-        self.prune_capacity()
+        for bucket, bucket_sections in sections.items():
+            known = self._known_sections.setdefault(bucket, set())
+            new_sections = [item for item in bucket_sections.items() if item[0] not in known]
+            if new_sections:
+                self._conn.executemany(
+                    f"INSERT OR IGNORE INTO {SECTION_TABLE_PREFIX}{bucket}(hash, body) "
+                    "VALUES (?, ?)",
+                    new_sections,
+                )
+                known.update(digest for digest, _ in new_sections)
+        self._write_trips()
+        self._prune_if_due()
+        self._commit()
+        self.stats["flushes"] += 1
+        self._last_flush_ts = time.monotonic()
+        return len(batch)
+
+    def _encode_payload(self, payload: dict[str, Any], sections: dict[str, str]) -> str:
+        """Serialize a payload, replacing dedupe sections with content-hash references."""
+        encoded = payload
+        for name in self.policy.payload_dedupe_sections:
+            value = payload.get(name)
+            if not isinstance(value, dict):
+                continue
+            body = json.dumps(value, sort_keys=True)
+            digest = hashlib.blake2b(body.encode("utf-8"), digest_size=8).hexdigest()
+            sections[digest] = body
+            if encoded is payload:
+                encoded = dict(payload)
+            encoded[name] = {PAYLOAD_SECTION_REF_KEY: digest}
+            self.stats["section_refs"] += 1
+        return json.dumps(encoded)
+
+    def _resolve_sections(self, bucket: int, payload: dict[str, Any]) -> dict[str, Any]:
+        """Replace content-hash section references with their stored bodies."""
+        for name, value in payload.items():
+            if not (isinstance(value, dict) and len(value) == 1):
+                continue
+            digest = value.get(PAYLOAD_SECTION_REF_KEY)
+            if digest is None:
+                continue
+            body = self._section_cache.get(digest)
+            if body is None:
+                row = self._conn.execute(
+                    f"SELECT body FROM {SECTION_TABLE_PREFIX}{bucket} WHERE hash = ?", (digest,)
+                ).fetchone()
+                if row is None:
+                    continue
+                body = str(row["body"])
+                self._section_cache[digest] = body
+                if len(self._section_cache) > PAYLOAD_SECTION_CACHE_SIZE:
+                    self._section_cache.popitem(last=False)
+            else:
+                self._section_cache.move_to_end(digest)
+            payload[name] = json.loads(body)
+        return payload
+
+    def checkpoint(self):
+        """Copy the WAL into the database file and truncate it (no-op outside WAL mode)."""
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        """Flush buffered events and close the database connection."""
+        self.flush()
+        self._conn.close()
+
+    def _prune_if_due(self):
+        now_mono = time.monotonic()
+        if (
+            self._last_retention_prune_ts is None
+            or (now_mono - self._last_retention_prune_ts) >= self.policy.prune_interval_s
+        ):
+            self._delete_expired(time.time())
+        if self._row_count >= self.capacity_high_water:
+            self._delete_overflow()
+
+    def _delete_expired(self, now: float):
+        cutoff = now - (self.policy.on_device_retention_hours * 3600)
+        interval = self.policy.partition_interval_s
+        dropped = False
+        for bucket in sorted(self._partitions):
+            if bucket * interval >= cutoff:
+                break
+            if (bucket + 1) * interval <= cutoff:
+                self._drop_partition(bucket)
+                dropped = True
+                continue
+            # Only the partition straddling the cutoff needs a row-level delete.
+            cursor = self._conn.execute(
+                f"DELETE FROM {self._partition_table(bucket)} WHERE timestamp < ?", (cutoff,)
+            )
+            self._partitions[bucket] -= max(0, cursor.rowcount)
+            self._row_count -= max(0, cursor.rowcount)
+            if self._partitions[bucket] <= 0:
+                self._drop_partition(bucket)
+                dropped = True
+        if dropped:
+            self._rebuild_events_view()
+        self._last_retention_prune_ts = time.monotonic()
+        self.stats["prunes"] += 1
+
+    def _delete_overflow(self):
+        overflow = self._row_count - max(1, self.policy.on_device_queue_max_items)
+        if overflow <= 0:
+            return
+
+        # The id of the first row to keep bounds one primary-key range delete per partition.
+        keep_row = self._conn.execute(
+            "SELECT id FROM events ORDER BY id ASC LIMIT 1 OFFSET ?", (overflow,)
+        ).fetchone()
+        for bucket in sorted(self._partitions):
+            if keep_row is None:
+                self._drop_partition(bucket)
+                continue
+            cursor = self._conn.execute(
+                f"DELETE FROM {self._partition_table(bucket)} WHERE id < ?", (int(keep_row["id"]),)
+            )
+            self._partitions[bucket] -= max(0, cursor.rowcount)
+            self._row_count -= max(0, cursor.rowcount)
+            if self._partitions[bucket] <= 0:
+                self._drop_partition(bucket)
+        self._rebuild_events_view()
+        self.stats["prunes"] += 1
 
     def prune_retention(self, now: float | None = None):
         """Drop events older than retention window in hours."""
-        effective_now = now if now is not None else time.time()
-        cutoff = effective_now - (self.policy.on_device_retention_hours * 3600)
-        self._conn.execute("DELETE FROM events WHERE timestamp < ?", (cutoff,))
-        self._conn.commit()
+        self.flush()
+        self._delete_expired(now if now is not None else time.time())
+        self._commit()
 
     def prune_capacity(self):
         """Bound stored events by configured maximum queue length."""
-        max_items = max(1, self.policy.on_device_queue_max_items)
-        count_row = self._conn.execute("SELECT COUNT(*) AS total FROM events").fetchone()
-        total = int(count_row["total"] if count_row else 0)
-        overflow = total - max_items
-        if overflow <= 0:
-            return
-
-        self._conn.execute(
-            "DELETE FROM events WHERE id IN (SELECT id FROM events ORDER BY id ASC LIMIT ?)",
-            (overflow,),
+        self.flush()
+        self._delete_overflow()
+        self._commit()
+
+    def trip_history(
+        self,
+        start_ts: float | None = None,
+        end_ts: float | None = None,
+        limit: int | None = None,
+    ) -> list[TripSummary]:
+        """Return trip summaries overlapping `[start_ts, end_ts)`, newest first.
+
+        The open trip, if any, is included with its running totals.
+        """
+        self.flush()
+        clauses, params = [], []
+        if start_ts is not None:
+            clauses.append("ended_at >= ?")
+            params.append(float(start_ts))
+        if end_ts is not None:
+            clauses.append("started_at < ?")
+            params.append(float(end_ts))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"SELECT * FROM {TRIP_TABLE}{where} ORDER BY started_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(max(0, int(limit)))
+        return [self._row_to_trip(row) for row in self._conn.execute(query, params)]
+
+    def _unsynced_ids_after(self, cursor: int, limit: int) -> list[tuple[int, int]]:
+        """Return up to `limit` `(id, bucket)` pairs of unsynced rows with id > cursor."""
+        per_partition = []
+        for bucket in self._partitions:
+            rows = self._conn.execute(
+                f"SELECT id FROM {self._partition_table(bucket)} "
+                "WHERE synced = 0 AND id > ? ORDER BY id ASC LIMIT ?",
+                (cursor, limit),
+            ).fetchall()
+            per_partition.append([(int(row["id"]), bucket) for row in rows])
+        return list(heapq.merge(*per_partition))[:limit]
+
+    def pending_replay_events(
+        self, cursor: int = 0, limit: int | None = None
+    ) -> list[StorageEvent]:
+        """Return unsynced events with id > `cursor` in insertion order for replay.
+
+        Pass `limit` to page through a large backlog; resume with the last
+        returned `event_id` as the next `cursor`.
+        """
+        self.flush()
+        page_size = limit if limit is not None else max(1, self._row_count)
+        if page_size <= 0:
+            return []
+        selected = self._unsynced_ids_after(cursor, page_size)
+        ids_by_bucket: dict[int, list[int]] = {}
+        for event_id, bucket in selected:
+            ids_by_bucket.setdefault(bucket, []).append(event_id)
+
+        events = []
+        for bucket, event_ids in ids_by_bucket.items():
+            rows = self._conn.execute(
+                f"SELECT id, event_type, payload, timestamp, synced "
+                f"FROM {self._partition_table(bucket)} WHERE id >= ? AND id <= ? "
+                "AND synced = 0 ORDER BY id ASC LIMIT ?",
+                (event_ids[0], event_ids[-1], len(event_ids)),
+            ).fetchall()
+            events.extend(self._row_to_event(row, bucket) for row in rows)
+        events.sort(key=lambda event: event.event_id or 0)
+        return events
+
+    def mark_synced_ids(self, event_ids: list[int]) -> int:
+        """Mark events synced by stable id with one set-based update per partition."""
+        self.flush()
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS sync_ids (id INTEGER PRIMARY KEY)")
+        self._conn.execute("DELETE FROM temp.sync_ids")
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO temp.sync_ids(id) VALUES (?)",
+            [(int(event_id),) for event_id in event_ids],
         )
-        self._conn.commit()
-
-    def pending_replay_events(self):
-        """Return unsynced events in insertion order for replay."""
-        rows = self._conn.execute(
-            "SELECT event_type, payload, timestamp, synced "
-            "FROM events WHERE synced = 0 ORDER BY id ASC"
-        ).fetchall()
-        return [
-            StorageEvent(
-                event_type=str(row["event_type"]),
-                payload=json.loads(str(row["payload"])),
-                timestamp=float(row["timestamp"]),
-                synced=bool(row["synced"]),
+        updated = 0
+        for bucket in self._partitions:
+            cursor = self._conn.execute(
+                f"UPDATE {self._partition_table(bucket)} SET synced = 1 "
+                "WHERE synced = 0 AND id IN (SELECT id FROM temp.sync_ids)"
             )
-            for row in rows
-        ]
+            updated += max(0, cursor.rowcount)
+        self._conn.execute("DELETE FROM temp.sync_ids")
+        self._commit()
+        return updated
+
+    def mark_synced_through(self, event_id: int) -> int:
+        """Mark every unsynced event with id <= `event_id` synced (replay cursor ack)."""
+        self.flush()
+        updated = 0
+        for bucket in self._partitions:
+            cursor = self._conn.execute(
+                f"UPDATE {self._partition_table(bucket)} SET synced = 1 "
+                "WHERE synced = 0 AND id <= ?",
+                (int(event_id),),
+            )
+            updated += max(0, cursor.rowcount)
+        self._commit()
+        return updated
 
     def mark_synced(self, indexes: list[int]):
-        """Mark selected event indexes as synced after successful upload."""
-        id_rows = self._conn.execute("SELECT id FROM events ORDER BY id ASC").fetchall()
-        ordered_ids = [int(row["id"]) for row in id_rows]
-        for index in indexes:
-            if 0 <= index < len(ordered_ids):
-                self._conn.execute(
-                    "UPDATE events SET synced = 1 WHERE id = ?", (ordered_ids[index],)
-                )
-        self._conn.commit()
+        """Mark selected event indexes (positions in `events`) as synced."""
+        self.flush()
+        positions = sorted({index for index in indexes if index >= 0})
+        if not positions:
+            return
+        id_rows = self._conn.execute(
+            "SELECT id FROM events ORDER BY id ASC LIMIT ?", (positions[-1] + 1,)
+        ).fetchall()
+        self.mark_synced_ids(
+            [int(id_rows[index]["id"]) for index in positions if index < len(id_rows)]
+        )
+
+
+def storage_data_dir(db_path: str = ":memory:") -> str:
+    """Return the persistent directory for files that live alongside the database.
+
+    That is the database file's directory, or `DEFAULT_DATA_DIR` for an
+    in-memory database. Never a temp directory: on the Pi that is tmpfs.
+    """
+    if db_path and db_path != ":memory:":
+        return os.path.dirname(os.path.abspath(db_path))
+    return DEFAULT_DATA_DIR
 
 
 def needs_cloud_policy(policy: StoragePolicy) -> bool:
@@ -0,0 +1,189 @@
+"""Per-callback and whole-cycle profiling for `RuntimeOrchestratorContract`."""
+
+import inspect
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from .metrics import LatencyHistogram
+from .planning.software_architecture import CYCLE_ID_KEY, RuntimeOrchestratorContract
+from .scheduler import CYCLE_BUCKETS_MS
+
+logger = logging.getLogger(__name__)
+
+CALLBACK_BUCKETS_MS = (0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 250.0, 1000.0)
+MAX_OPEN_CYCLES = 8
+
+
+class CycleProfiler:
+    """Times contract callbacks and whole cycles into fixed-bucket histograms.
+
+    `instrument(contract)` returns a contract whose callbacks record into one
+    `LatencyHistogram` per callback (publishes per event type) and one for the
+    cycle, from the start of `read_sensor_snapshot` to the end of that cycle's
+    STATUS publish. A cycle id (`CYCLE_ID_KEY`) travels in the snapshot, the
+    detect result and the STATUS payload, so a cycle is closed by its own
+    STATUS even when stages run on different threads and queues drop events;
+    cycles whose STATUS never arrives are evicted oldest-first. Open cycles are
+    shared by the stages and kept under a lock; each histogram has a single
+    writer thread under every topology.
+
+    A cycle slower than `slow_cycle_ms` is kept as an exemplar with its
+    per-stage timings and snapshot metadata and logged, at most once per
+    `exemplar_log_interval_s`.
+    """
+
+    def __init__(
+        self,
+        slow_cycle_ms: float = 50.0,
+        max_exemplars: int = 8,
+        exemplar_log_interval_s: float = 10.0,
+        clock=time.perf_counter,
+    ):
+        self.slow_cycle_ms = slow_cycle_ms
+        self.exemplar_log_interval_s = exemplar_log_interval_s
+        self.clock = clock
+        self.callback_ms: dict[str, LatencyHistogram] = {}
+        self.cycle_ms = LatencyHistogram(CYCLE_BUCKETS_MS)
+        self.exemplars = deque(maxlen=max_exemplars)
+        self.slow_cycles = 0
+        self._cycle_ids = itertools.count(1)
+        self._open_cycles: dict[int, dict[str, Any]] = {}
+        self._awaiting_status: dict[int, dict[str, Any]] = {}
+        self._cycles_lock = threading.Lock()
+        self._last_exemplar_log = None
+
+    def _histogram(self, name):
+        histogram = self.callback_ms.get(name)
+        if histogram is None:
+            histogram = self.callback_ms.setdefault(name, LatencyHistogram(CALLBACK_BUCKETS_MS))
+        return histogram
+
+    def instrument(self, contract: RuntimeOrchestratorContract) -> RuntimeOrchestratorContract:
+        """Return a contract with timed callbacks; coroutine callbacks stay coroutines."""
+        return RuntimeOrchestratorContract(
+            read_sensor_snapshot=self._wrap(
+                contract.read_sensor_snapshot, self._before_read, self._after_read
+            ),
+            detect_fatigue=self._wrap(
+                contract.detect_fatigue, self._before_detect, self._after_detect
+            ),
+            publish_runtime_event=self._wrap(
+                contract.publish_runtime_event, self._before_publish, self._after_publish
+            ),
+        )
+
+    def _wrap(self, callback, before, after):
+        if inspect.iscoroutinefunction(callback):
+
+            async def timed_async(*args):
+                started, context = before(*args)
+                result = await callback(*args)
+                return after(started, context, result)
+
+            return timed_async
+
+        def timed(*args):
+            started, context = before(*args)
+            result = callback(*args)
+            return after(started, context, result)
+
+        return timed
+
+    def _before_read(self):
+        return self.clock(), None
+
+    def _after_read(self, started, _context, snapshot):
+        read_ms = (self.clock() - started) * 1000.0
+        self._histogram("read_sensor_snapshot").record(read_ms)
+        cycle = {"started": started, "read_ms": read_ms, "snapshot": _snapshot_metadata(snapshot)}
+        with self._cycles_lock:
+            cycle_id = next(self._cycle_ids)
+            _put_bounded(self._open_cycles, cycle_id, cycle)  # evicts cycles detection dropped
+        return {**snapshot, CYCLE_ID_KEY: cycle_id}
+
+    def _before_detect(self, snapshot):
+        return self.clock(), snapshot.get(CYCLE_ID_KEY)
+
+    def _after_detect(self, started, cycle_id, result):
+        detect_ms = (self.clock() - started) * 1000.0
+        self._histogram("detect_fatigue").record(detect_ms)
+        if cycle_id is None:
+            return result
+        with self._cycles_lock:
+            cycle = self._open_cycles.pop(cycle_id, None)
+            if cycle is not None:
+                cycle["detect_ms"] = detect_ms
+                _put_bounded(self._awaiting_status, cycle_id, cycle)  # evicts dropped STATUS
+        return {**result, CYCLE_ID_KEY: cycle_id}
+
+    def _before_publish(self, event_type, payload):
+        return self.clock(), (event_type, payload.get(CYCLE_ID_KEY))
+
+    def _after_publish(self, started, context, result):
+        ended = self.clock()
+        event_type, cycle_id = context
+        publish_ms = (ended - started) * 1000.0
+        self._histogram(f"publish:{event_type}").record(publish_ms)
+        if event_type == "STATUS" and cycle_id is not None:
+            with self._cycles_lock:
+                cycle = self._awaiting_status.pop(cycle_id, None)
+            if cycle is not None:
+                cycle["status_publish_ms"] = publish_ms
+                self._close_cycle(cycle, ended)
+        return result
+
+    def _close_cycle(self, cycle, ended):
+        total_ms = (ended - cycle.pop("started")) * 1000.0
+        self.cycle_ms.record(total_ms)
+        if total_ms <= self.slow_cycle_ms:
+            return
+        self.slow_cycles += 1
+        exemplar = {"cycle_ms": round(total_ms, 3), "at": time.time(), **cycle}
+        self.exemplars.append(exemplar)
+        if (
+            self._last_exemplar_log is None
+            or ended - self._last_exemplar_log >= self.exemplar_log_interval_s
+        ):
+            self._last_exemplar_log = ended
+            logger.warning("Slow runtime cycle (%.1f ms): %s", total_ms, exemplar)
+
+    def snapshot(self, max_exemplars=3):
+        """Return per-callback and cycle percentiles plus recent slow-cycle exemplars."""
+
+        def summary(histogram):
+            return {
+                "count": histogram.count,
+                "p50_ms": histogram.percentile(0.50),
+                "p95_ms": histogram.percentile(0.95),
+                "p99_ms": histogram.percentile(0.99),
+                "max_ms": round(histogram.max_ms, 3),
+            }
+
+        return {
+            "cycle": summary(self.cycle_ms),
+            "callbacks": {name: summary(hist) for name, hist in list(self.callback_ms.items())},
+            "slow_cycle_ms": self.slow_cycle_ms,
+            "slow_cycles": self.slow_cycles,
+            "exemplars": list(self.exemplars)[-max_exemplars:] if max_exemplars else [],
+        }
+
+
+def _put_bounded(cycles, cycle_id, cycle):
+    if len(cycles) >= MAX_OPEN_CYCLES:
+        cycles.pop(next(iter(cycles)))
+    cycles[cycle_id] = cycle
+
+
+def _snapshot_metadata(snapshot):
+    """Describe a sensor snapshot without copying frame pixels."""
+    metadata = {}
+    for key, value in snapshot.items():
+        if hasattr(value, "shape"):
+            metadata[f"{key}_shape"] = list(value.shape)
+        elif value is None or isinstance(value, bool | int | float | str):
+            metadata[key] = value
+    return metadata
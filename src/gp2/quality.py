@@ -0,0 +1,103 @@
+"""Latency-budget controller that steps detection quality down and back up."""
+
+import logging
+import math
+from collections import deque
+
+from .planning.ai_algorithms import DetectionQualityTier, detection_quality_tiers
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyBudgetController:
+    """Keeps detection p95 latency under `budget_ms` by moving between quality tiers.
+
+    Inference latencies are evaluated every `evaluation_samples` samples over
+    the last `window_samples`. When p95 exceeds the budget the controller steps
+    one tier down (cheaper); when p95 is below `headroom` x budget and at least
+    `min_dwell_samples` have passed since the last change, it steps one tier up.
+    Samples from before a change are discarded so each tier is judged on its own.
+    """
+
+    def __init__(
+        self,
+        budget_ms: float = 80.0,
+        tiers: list[DetectionQualityTier] | None = None,
+        window_samples: int = 40,
+        evaluation_samples: int = 20,
+        headroom: float = 0.6,
+        min_dwell_samples: int = 100,
+    ):
+        self.budget_ms = budget_ms
+        self.tiers = list(tiers or detection_quality_tiers())
+        self.evaluation_samples = max(1, int(evaluation_samples))
+        self.headroom = headroom
+        self.min_dwell_samples = min_dwell_samples
+        self.tier_index = 0
+        self.stats = {"step_downs": 0, "step_ups": 0, "skipped_frames": 0}
+        self._latencies = deque(maxlen=max(self.evaluation_samples, int(window_samples)))
+        self._since_evaluation = 0
+        self._since_change = 0
+        self._frame = 0
+
+    @property
+    def tier(self) -> DetectionQualityTier:
+        return self.tiers[self.tier_index]
+
+    def should_infer(self) -> bool:
+        """Return whether this frame runs inference at the current tier's cadence."""
+        self._frame += 1
+        if self._frame % self.tier.inference_every_n_frames == 0:
+            return True
+        self.stats["skipped_frames"] += 1
+        return False
+
+    def p95_ms(self) -> float:
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def observe(self, latency_ms: float) -> DetectionQualityTier | None:
+        """Record one inference latency; return the new tier when it changes."""
+        self._latencies.append(float(latency_ms))
+        self._since_evaluation += 1
+        self._since_change += 1
+        if self._since_evaluation < self.evaluation_samples:
+            return None
+        self._since_evaluation = 0
+        p95 = self.p95_ms()
+        if p95 > self.budget_ms and self.tier_index < len(self.tiers) - 1:
+            step = 1
+            self.stats["step_downs"] += 1
+        elif (
+            p95 < self.headroom * self.budget_ms
+            and self.tier_index > 0
+            and self._since_change >= self.min_dwell_samples
+        ):
+            step = -1
+            self.stats["step_ups"] += 1
+        else:
+            return None
+        previous = self.tier
+        self.tier_index += step
+        self._latencies.clear()
+        self._since_change = 0
+        logger.info(
+            "Detection quality %s -> %s (p95 %.1f ms, budget %.0f ms)",
+            previous.name,
+            self.tier.name,
+            p95,
+            self.budget_ms,
+        )
+        return self.tier
+
+    def snapshot(self):
+        """Return the active tier and step counters for runtime health."""
+        return {
+            **self.stats,
+            "tier": self.tier.name,
+            "tier_index": self.tier_index,
+            "p95_ms": round(self.p95_ms(), 2),
+            "budget_ms": self.budget_ms,
+        }
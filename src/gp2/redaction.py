@@ -0,0 +1,153 @@
+"""Face redaction for stored clips, reusing fatigue-detector landmarks where available."""
+
+import time
+
+import numpy as np
+
+from .detection import create_face_mesh, extract_face_landmarks
+
+try:
+    import cv2  # type: ignore
+except ImportError:  # pragma: no cover
+    cv2 = None
+
+REDACTION_SOURCE_LANDMARKS = "landmarks"
+REDACTION_SOURCE_DETECTOR = "detector"
+REDACTION_SOURCE_FULL_FRAME = "full-frame"
+REDACTION_SOURCE_NO_FACE = "no-face"
+
+
+def face_box_from_landmarks(face_landmarks, margin=0.2):
+    """Return a normalized `(x0, y0, x1, y1)` face box around landmarks, or None.
+
+    Accepts a MediaPipe face-landmark object (with `.landmark`) or an array-like
+    of normalized `(x, y)` points.
+    """
+    if face_landmarks is None:
+        return None
+    if hasattr(face_landmarks, "landmark"):
+        points = np.array([(point.x, point.y) for point in face_landmarks.landmark], dtype=float)
+    else:
+        points = np.asarray(face_landmarks, dtype=float).reshape(-1, 2)
+    if points.size == 0:
+        return None
+    x0, y0 = points.min(axis=0)
+    x1, y1 = points.max(axis=0)
+    pad_x, pad_y = (x1 - x0) * margin, (y1 - y0) * margin
+    return (
+        float(np.clip(x0 - pad_x, 0.0, 1.0)),
+        float(np.clip(y0 - pad_y, 0.0, 1.0)),
+        float(np.clip(x1 + pad_x, 0.0, 1.0)),
+        float(np.clip(y1 + pad_y, 0.0, 1.0)),
+    )
+
+
+def pixelate_region(frame, box, block_size=12):
+    """Pixelate a normalized box of `frame` in place with block means."""
+    height, width = frame.shape[:2]
+    x0, y0 = int(box[0] * width), int(box[1] * height)
+    x1, y1 = int(np.ceil(box[2] * width)), int(np.ceil(box[3] * height))
+    region = frame[y0:y1, x0:x1]
+    if region.size == 0:
+        return frame
+    block = max(1, int(block_size))
+    rows, cols = region.shape[0] // block, region.shape[1] // block
+    if rows and cols:
+        core = region[: rows * block, : cols * block]
+        shape = (rows, block, cols, block, *core.shape[2:])
+        means = core.reshape(shape).mean(axis=(1, 3), keepdims=True)
+        core[...] = np.broadcast_to(means, shape).reshape(core.shape).astype(frame.dtype)
+    # Ragged right/bottom edges collapse to their own mean.
+    if region.shape[0] > rows * block:
+        edge = region[rows * block :]
+        edge[...] = edge.mean(axis=(0, 1)).astype(frame.dtype)
+    if region.shape[1] > cols * block:
+        edge = region[:, cols * block :]
+        edge[...] = edge.mean(axis=(0, 1)).astype(frame.dtype)
+    return frame
+
+
+class FaceRedactor:
+    """Pixelates faces using supplied landmark boxes, detecting only when none is given.
+
+    Detection falls back to an OpenCV Haar cascade or MediaPipe face mesh. When
+    neither backend is installed, or the detector finds no face, the whole frame
+    is pixelated (fail closed); misses are still counted as `no-face`.
+    """
+
+    def __init__(self, block_size=12, margin=0.2, detect_missing=True):
+        self.block_size = block_size
+        self.margin = margin
+        self.detect_missing = detect_missing
+        self._cascade = None
+        self._face_mesh = None
+        self._detector_ready = False
+        self.stats = {
+            "frames": 0,
+            REDACTION_SOURCE_LANDMARKS: 0,
+            REDACTION_SOURCE_DETECTOR: 0,
+            REDACTION_SOURCE_FULL_FRAME: 0,
+            REDACTION_SOURCE_NO_FACE: 0,
+            "elapsed_s": 0.0,
+        }
+
+    def _init_detector(self):
+        self._detector_ready = True
+        if cv2 is not None and hasattr(cv2, "data"):
+            cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+            )
+            if not cascade.empty():
+                self._cascade = cascade
+                return
+        self._face_mesh = create_face_mesh()
+
+    @property
+    def has_detector(self):
+        if not self._detector_ready:
+            self._init_detector()
+        return self._cascade is not None or self._face_mesh is not None
+
+    def detect_face_boxes(self, frame):
+        """Run the fallback detector and return normalized face boxes."""
+        if not self.has_detector:
+            return []
+        height, width = frame.shape[:2]
+        if self._cascade is not None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+            faces = self._cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=4)
+            return [
+                (x / width, y / height, (x + w) / width, (y + h) / height) for x, y, w, h in faces
+            ]
+        return [
+            box
+            for box in (
+                face_box_from_landmarks(face, self.margin)
+                for face in extract_face_landmarks(frame, self._face_mesh)
+            )
+            if box is not None
+        ]
+
+    def redact(self, frame, face_box=None):
+        """Return `(redacted_copy, source)` for one frame."""
+        started = time.perf_counter()
+        redacted = np.array(frame, copy=True)
+        if face_box is not None:
+            boxes, source = [face_box], REDACTION_SOURCE_LANDMARKS
+        elif not self.detect_missing or not self.has_detector:
+            boxes, source = [(0.0, 0.0, 1.0, 1.0)], REDACTION_SOURCE_FULL_FRAME
+        else:
+            boxes = self.detect_face_boxes(redacted)
+            source = REDACTION_SOURCE_DETECTOR if boxes else REDACTION_SOURCE_NO_FACE
+            boxes = boxes or [(0.0, 0.0, 1.0, 1.0)]
+        for box in boxes:
+            pixelate_region(redacted, box, self.block_size)
+        self.stats["frames"] += 1
+        self.stats[source] += 1
+        self.stats["elapsed_s"] += time.perf_counter() - started
+        return redacted, source
+
+    def fps(self):
+        """Redaction throughput in frames per second on this CPU."""
+        elapsed = self.stats["elapsed_s"]
+        return self.stats["frames"] / elapsed if elapsed > 0 else 0.0
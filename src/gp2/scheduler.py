@@ -0,0 +1,108 @@
+"""Deadline-driven fixed-rate cycle scheduling on the monotonic clock."""
+
+import asyncio
+import math
+import time
+from collections import deque
+
+from .metrics import LatencyHistogram
+
+CYCLE_BUCKETS_MS = (5.0, 10.0, 20.0, 30.0, 40.0, 50.0, 75.0, 100.0, 150.0, 250.0, 500.0, 1000.0)
+ACHIEVED_RATE_WINDOW = 64
+
+
+class FixedRateScheduler:
+    """Paces a loop to `period_s` using absolute monotonic deadlines.
+
+    Deadlines advance by whole periods from the start time, so cycle work and
+    sleep jitter never accumulate as drift. Each sleep is shortened by a running
+    estimate of how late the OS wakes the thread. A cycle that runs past its deadline is
+    an overrun; any further deadlines it swallowed are skipped rather than
+    replayed back to back, and the schedule re-anchors on the next slot.
+    """
+
+    def __init__(self, period_s=0.05, clock=time.monotonic, sleep=time.sleep):
+        self.period_s = max(0.0, float(period_s))
+        self.clock = clock
+        self.sleep = sleep
+        self.cycle_ms = LatencyHistogram(CYCLE_BUCKETS_MS)
+        self.wake_jitter_ms = LatencyHistogram((0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0))
+        self.cycles = 0
+        self.overruns = 0
+        self.skipped = 0
+        self._sleep_bias_s = 0.0
+        self._cycle_start = None
+        self._next_deadline = None
+        self._starts = deque(maxlen=ACHIEVED_RATE_WINDOW)
+
+    @property
+    def target_hz(self):
+        return 1.0 / self.period_s if self.period_s > 0 else 0.0
+
+    def start_cycle(self):
+        """Mark the start of a cycle; the first call anchors the schedule."""
+        now = self.clock()
+        if self._next_deadline is None:
+            self._next_deadline = now + self.period_s
+        self._cycle_start = now
+        self._starts.append(now)
+
+    def wait_next(self):
+        """Record the finished cycle and sleep until the next deadline."""
+        now, requested = self._finish_cycle()
+        if requested is not None:
+            self.sleep(requested)
+            self._woke(now, requested)
+
+    async def wait_next_async(self):
+        """`wait_next` for event-loop schedulers: awaits instead of blocking."""
+        now, requested = self._finish_cycle()
+        if requested is not None:
+            await asyncio.sleep(requested)
+            self._woke(now, requested)
+
+    def _finish_cycle(self):
+        """Record cycle stats; return `(now, sleep_s)`, with `sleep_s` None on overrun."""
+        if self._cycle_start is None:
+            self.start_cycle()
+        now = self.clock()
+        self.cycles += 1
+        self.cycle_ms.record((now - self._cycle_start) * 1000.0)
+        if self.period_s <= 0:
+            return now, None
+
+        if now >= self._next_deadline:
+            self.overruns += 1
+            missed = math.floor((now - self._next_deadline) / self.period_s)
+            self.skipped += missed
+            self._next_deadline += (missed + 1) * self.period_s
+            return now, None
+        return now, max(0.0, self._next_deadline - now - self._sleep_bias_s)
+
+    def _woke(self, slept_at, requested):
+        woke = self.clock()
+        oversleep = (woke - slept_at) - requested
+        self._sleep_bias_s += 0.1 * (min(oversleep, self.period_s / 2) - self._sleep_bias_s)
+        self.wake_jitter_ms.record(abs(woke - self._next_deadline) * 1000.0)
+        self._next_deadline += self.period_s
+
+    def achieved_hz(self):
+        """Cycle rate over the last `ACHIEVED_RATE_WINDOW` cycle starts."""
+        if len(self._starts) < 2:
+            return 0.0
+        elapsed = self._starts[-1] - self._starts[0]
+        return (len(self._starts) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        """Return a JSON-serializable summary for runtime health."""
+        return {
+            "target_hz": self.target_hz,
+            "achieved_hz": round(self.achieved_hz(), 2),
+            "cycles": self.cycles,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "cycle_p50_ms": self.cycle_ms.percentile(0.50),
+            "cycle_p95_ms": self.cycle_ms.percentile(0.95),
+            "cycle_p99_ms": self.cycle_ms.percentile(0.99),
+            "wake_jitter_p95_ms": self.wake_jitter_ms.percentile(0.95),
+        }
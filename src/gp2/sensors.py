@@ -104,14 +104,21 @@ class CameraModule:
     def __init__(self):
         self.interface = interface_spec(INTERFACE_CAMERA)
         self.is_stub = cv2 is None
+        self.resolution = (640, 480)
         if cv2 is None:
             self.cap = None
             return
 
         # Index 0 is usually the default camera
         self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        self.set_resolution(640, 480)
+
+    def set_resolution(self, width, height):
+        """Request a capture resolution; a no-op for the stub backend."""
+        self.resolution = (int(width), int(height))
+        if self.cap is not None:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
 
     def get_frame(self):
         """Capture and return a single frame, or None if unavailable."""
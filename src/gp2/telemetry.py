@@ -1,9 +1,17 @@
 """MQTT telemetry client for GP2 status and alert publishing."""
 
-import json
+import copy
+import threading
 import time
+from collections import OrderedDict, deque
 
-from .planning.connectivity import ConnectivityConfig, validate_connectivity_config
+from .codec import codec_for_schema_version
+from .metrics import LatencyHistogram
+from .planning.connectivity import (
+    ConnectivityConfig,
+    topic_contracts,
+    validate_connectivity_config,
+)
 
 try:
     import paho.mqtt.client as mqtt  # type: ignore
@@ -12,6 +20,42 @@ except ImportError:  # pragma: no cover
 
 TOPIC_TELEMETRY = "smarthelmet/v1/telemetry"
 TOPIC_ALERTS = "smarthelmet/v1/alerts"
+TOPIC_HEALTH = "smarthelmet/v1/health"
+MQTT_ERR_SUCCESS = 0
+MQTT_ERR_NO_CONN = 4
+
+
+class SectionDeltaEncoder:
+    """Suppresses unchanged payload sections between periodic full keyframes."""
+
+    def __init__(self, keyframe_interval_s=60.0):
+        self.keyframe_interval_s = keyframe_interval_s
+        self._last_sections = {}
+        self._last_keyframe_ts = None
+
+    def force_keyframe(self):
+        """Emit every section on the next `encode` call (e.g. after reconnect)."""
+        self._last_keyframe_ts = None
+
+    def encode(self, sections, now=None):
+        """Return `(is_keyframe, changed_sections)`; empty when nothing changed."""
+        effective_now = now if now is not None else time.monotonic()
+        is_keyframe = (
+            self._last_keyframe_ts is None
+            or (effective_now - self._last_keyframe_ts) >= self.keyframe_interval_s
+        )
+        if is_keyframe:
+            changed = dict(sections)
+            self._last_keyframe_ts = effective_now
+        else:
+            changed = {
+                name: value
+                for name, value in sections.items()
+                if self._last_sections.get(name) != value
+            }
+        for name, value in changed.items():
+            self._last_sections[name] = copy.deepcopy(value)
+        return is_keyframe, changed
 
 
 class TelemetryClient:
@@ -22,11 +66,22 @@ class TelemetryClient:
         if not validate_connectivity_config(self.config):
             raise ValueError("Invalid connectivity configuration.")
 
+        self.schema_version = topic_contracts(self.config.payload_codec)["STATUS"].schema_version
+        self.codec = codec_for_schema_version(self.schema_version)
+        self.health_delta = SectionDeltaEncoder(self.config.health_keyframe_interval_s)
         self.offline_queue = []
+        self.critical_backlog = deque()
+        self.inflight = OrderedDict()
+        self.ack_latency = LatencyHistogram()
+        self._early_acks = OrderedDict()
+        self._inflight_lock = threading.Lock()
         self.client = None
+        self._network_loop_running = False
         self.device_id = device_id
         self.fault_counters = {
             "publish_failures": 0,
+            "ack_timeouts": 0,
+            "inflight_window_full": 0,
             "reconnect_attempts": 0,
             "reconnect_failures": 0,
             "replay_attempts": 0,
@@ -38,6 +93,14 @@ class TelemetryClient:
             return
 
         self.client = mqtt.Client(device_id)
+        self.client.on_publish = self._on_publish
+        self.client.on_connect = self._on_connect
+        self.client.on_connect_fail = self._on_connect_fail
+        self.client.on_disconnect = self._on_disconnect
+        self.client.reconnect_delay_set(
+            min_delay=self.config.reconnect_initial_delay_s,
+            max_delay=self.config.reconnect_max_delay_s,
+        )
         self._connect_and_start_loop()
 
     def _connect_and_start_loop(self):
@@ -48,10 +111,15 @@ class TelemetryClient:
         try:
             self.client.connect(self.config.broker, self.config.port, 60)
             self.client.loop_start()
+            self._network_loop_running = True
             self._flush_offline_queue()
             return True
         except (OSError, ConnectionError, ValueError) as e:
             print(f"MQTT Connection Failed: {e}")
+            # Let paho's network thread keep retrying in the background so failed
+            # publishes queue offline instead of blocking the caller in backoff sleeps.
+            self.client.loop_start()
+            self._network_loop_running = True
             return False
 
     def _enqueue_offline(self, topic, payload, qos):
@@ -65,15 +133,20 @@ class TelemetryClient:
 
     def _flush_offline_queue(self):
         """Attempt to replay queued messages when connectivity is available."""
+        while self.critical_backlog:
+            self.offline_queue.insert(0, self.critical_backlog.pop())
         if self.client is None or not self.offline_queue:
             return {"replayed": 0, "remaining": len(self.offline_queue)}
 
         remaining = []
         replayed = 0
         for item in self.offline_queue:
+            if item["qos"] > 0 and self._inflight_full():
+                remaining.append(item)
+                continue
             self.fault_counters["replay_attempts"] += 1
             try:
-                self.client.publish(item["topic"], json.dumps(item["payload"]), qos=item["qos"])
+                self._send(item["topic"], item["payload"], item["qos"])
                 replayed += 1
             except (OSError, ConnectionError, ValueError):
                 remaining.append(item)
@@ -100,6 +173,10 @@ class TelemetryClient:
             self.fault_counters["reconnect_attempts"] += 1
             try:
                 self.client.reconnect()
+                if not self._network_loop_running:
+                    self.client.loop_start()
+                    self._network_loop_running = True
+                self.health_delta.force_keyframe()
                 self._flush_offline_queue()
                 return True
             except (OSError, ConnectionError, ValueError):
@@ -112,37 +189,136 @@ class TelemetryClient:
         """Public wrapper for reconnect/recovery flow with bounded retries."""
         return self._attempt_reconnect()
 
+    def _on_connect(self, client, _userdata, _flags, rc, *_args):
+        """Paho callback: resend full health sections after every (re)connect."""
+        if rc == 0:
+            self.health_delta.force_keyframe()
+        elif client is self.client:
+            self.fault_counters["reconnect_failures"] += 1  # CONNACK refused
+
+    def _on_connect_fail(self, client, _userdata):
+        """Paho callback: a background (re)connect attempt could not reach the broker."""
+        if client is self.client:  # not a client that has since been replaced
+            self.fault_counters["reconnect_failures"] += 1
+
+    def _on_disconnect(self, client, _userdata, rc, *_args):
+        """Paho callback: an unexpected disconnect counts as a failed link."""
+        if rc != 0 and client is self.client:
+            self.fault_counters["reconnect_failures"] += 1
+
+    def _on_publish(self, _client, _userdata, mid, *_args):
+        """Paho callback: QoS>0 messages are acknowledged once the broker PUBACKs."""
+        with self._inflight_lock:
+            entry = self.inflight.pop(mid, None)
+            if entry is None:
+                # PUBACK raced ahead of _track_inflight, or a QoS 0 send completed.
+                self._early_acks[mid] = True
+                while len(self._early_acks) > 4 * self.config.max_inflight_messages:
+                    self._early_acks.popitem(last=False)
+                return
+            self.ack_latency.record((time.monotonic() - entry["sent_ts"]) * 1000.0)
+
+    def _track_inflight(self, mid, topic, payload, qos):
+        with self._inflight_lock:
+            if self._early_acks.pop(mid, None):
+                self.ack_latency.record(0.0)
+                return
+            self.inflight[mid] = {
+                "topic": topic,
+                "payload": payload,
+                "qos": qos,
+                "sent_ts": time.monotonic(),
+            }
+
+    def _inflight_full(self):
+        return len(self.inflight) >= self.config.max_inflight_messages
+
+    def _expire_inflight(self, now=None):
+        """Stop waiting on messages unacknowledged past the ack timeout.
+
+        paho keeps every unacknowledged QoS>0 message and resends it after the
+        next reconnect, so expired entries only free their in-flight window slot
+        and count as ack timeouts; requeueing them would deliver them twice.
+        """
+        effective_now = now if now is not None else time.monotonic()
+        cutoff = effective_now - self.config.publish_ack_timeout_s
+        expired = []
+        with self._inflight_lock:
+            while self.inflight:
+                mid, entry = next(iter(self.inflight.items()))
+                if entry["sent_ts"] > cutoff:
+                    break
+                del self.inflight[mid]
+                expired.append(entry)
+        self.fault_counters["ack_timeouts"] += len(expired)
+        return len(expired)
+
+    def _send(self, topic, payload, qos):
+        """Hand one message to the client and register it in the in-flight window.
+
+        Returns False when the client is disconnected but paho kept a QoS>0
+        message to resend after reconnecting; raises `ConnectionError` when the
+        message was not accepted and must be queued by the caller.
+        """
+        info = self.client.publish(topic, self.codec.encode(payload), qos=qos)
+        rc = getattr(info, "rc", MQTT_ERR_SUCCESS)
+        held = qos > 0 and rc == MQTT_ERR_NO_CONN
+        if isinstance(rc, int) and rc != MQTT_ERR_SUCCESS and not held:
+            raise ConnectionError(f"MQTT publish rejected (rc={rc})")
+        mid = getattr(info, "mid", None)
+        if qos > 0 and isinstance(mid, int):
+            self._track_inflight(mid, topic, payload, qos)
+        return not held
+
     def _publish(self, topic, payload, qos):
         """Publish payload with offline queue + reconnect fallback policy."""
         if self.client is None:
             self._enqueue_offline(topic, payload, qos)
             return False
 
+        self._expire_inflight()
+        if qos > 0 and self._inflight_full():
+            self.fault_counters["inflight_window_full"] += 1
+            self._enqueue_offline(topic, payload, qos)
+            return False
+
         try:
-            self.client.publish(topic, json.dumps(payload), qos=qos)
-            if self.offline_queue:
+            if not self._send(topic, payload, qos):
+                self.fault_counters["publish_failures"] += 1
+                return False
+            if self.offline_queue or self.critical_backlog:
                 self._flush_offline_queue()
             return True
         except (OSError, ConnectionError, ValueError):
             self.fault_counters["publish_failures"] += 1
             self._enqueue_offline(topic, payload, qos)
-            self._attempt_reconnect()
+            if not self._network_loop_running:
+                # Once paho's network thread runs it reconnects on its own backoff.
+                self._attempt_reconnect()
             return False
 
     def health_snapshot(self):
         """Return transport health and recovery counters for status telemetry."""
+        self._expire_inflight()
         queue_max = max(1, self.config.offline_queue_max_items)
         queue_ratio = len(self.offline_queue) / queue_max
+        with self._inflight_lock:
+            publish_ack = self.ack_latency.snapshot()
+            inflight_depth = len(self.inflight)
         return {
             "connected": self.client is not None,
+            "schema_version": self.schema_version,
             "offline_queue_depth": len(self.offline_queue),
             "offline_queue_max_items": queue_max,
+            "inflight_depth": inflight_depth,
+            "inflight_max": self.config.max_inflight_messages,
+            "publish_ack": publish_ack,
             "degraded_mode": queue_ratio >= 0.8 or self.fault_counters["reconnect_failures"] > 0,
             "fault_counters": dict(self.fault_counters),
         }
 
-    def send_alert(self, alert_type, value):
-        """Publish a high-priority alert event payload."""
+    def send_alert(self, alert_type, value, episode_id=None, phase=None):
+        """Publish a high-priority alert event payload, tagged with its episode when given."""
         payload = {
             "device_id": self.device_id,
             "type": "ALERT",
@@ -150,8 +326,41 @@ class TelemetryClient:
             "value": value,
             "timestamp": time.time(),
         }
+        if episode_id is not None:
+            payload["episode_id"] = episode_id
+            payload["phase"] = phase
         self._publish(TOPIC_ALERTS, payload, self.config.alert_qos)
 
+    def send_critical_alert(self, alert_type, value):
+        """Publish an alert straight to the client from any thread.
+
+        Skips the in-flight window cap, inflight expiry and offline-queue replay
+        that `send_alert` runs inline, so a crash never waits behind status
+        traffic. While disconnected, paho keeps a QoS 1 alert and resends it
+        after reconnecting; an alert paho rejects is parked in `critical_backlog`
+        and replayed ahead of the offline queue.
+        """
+        payload = {
+            "device_id": self.device_id,
+            "type": "ALERT",
+            "alert": alert_type,
+            "value": value,
+            "timestamp": time.time(),
+        }
+        if self.client is not None:
+            try:
+                if self._send(TOPIC_ALERTS, payload, self.config.alert_qos):
+                    return True
+                self.fault_counters["publish_failures"] += 1
+                return False  # paho resends it after reconnecting
+            except (OSError, ConnectionError, ValueError):
+                self.fault_counters["publish_failures"] += 1
+        if self.config.offline_queue_enabled:
+            self.critical_backlog.append(
+                {"topic": TOPIC_ALERTS, "payload": payload, "qos": self.config.alert_qos}
+            )
+        return False
+
     def send_telemetry(
         self,
         perclos,
@@ -161,12 +370,17 @@ class TelemetryClient:
         ai_metrics=None,
         runtime_health=None,
     ):
-        """Publish periodic status telemetry with optional sensor health metadata."""
+        """Publish periodic status telemetry with optional sensor health metadata.
+
+        The runtime loop sends only the hot numeric fields here and routes the
+        slow-changing sections through `send_health`.
+        """
         payload = {
             "device_id": self.device_id,
             "type": "STATUS",
             "perclos": perclos,
             "g_force": g_force,
+            "timestamp": time.time(),
         }
         if sensor_health is not None:
             payload["sensor_health"] = sensor_health
@@ -177,3 +391,20 @@ class TelemetryClient:
         if runtime_health is not None:
             payload["runtime_health"] = runtime_health
         self._publish(TOPIC_TELEMETRY, payload, self.config.status_qos)
+
+    def send_health(self, now=None, **sections):
+        """Publish changed health sections (or a periodic keyframe) on the HEALTH topic."""
+        present = {name: value for name, value in sections.items() if value is not None}
+        is_keyframe, changed = self.health_delta.encode(present, now=now)
+        if not changed:
+            return False
+
+        payload = {
+            "device_id": self.device_id,
+            "type": "HEALTH",
+            "keyframe": is_keyframe,
+            "timestamp": time.time(),
+            **changed,
+        }
+        self._publish(TOPIC_HEALTH, payload, self.config.health_qos)
+        return True
@@ -0,0 +1,224 @@
+"""Columnar in-memory time series for numeric status metrics with incremental rollups."""
+
+import numpy as np
+
+from .planning.carry_forward import DashboardIntegrationContract
+
+DEFAULT_TREND_METRICS = ("perclos", "g_force")
+
+
+def trend_rollup_intervals(contract: DashboardIntegrationContract | None = None):
+    """Return rollup widths in seconds: 1 s, the dashboard trend interval and 1 h."""
+    trend_interval_s = (contract or DashboardIntegrationContract()).trend_interval_s
+    return tuple(sorted({1, int(trend_interval_s), 3600}))
+
+
+class _SampleChunk:
+    """Fixed-size chunk of float32 time offsets (from a float64 base) and float32 values."""
+
+    def __init__(self, base_ts, size):
+        self.base_ts = float(base_ts)
+        self.offsets = np.empty(size, dtype=np.float32)
+        self.values = np.empty(size, dtype=np.float32)
+        self.length = 0
+        self.min_ts = float("inf")
+        self.max_ts = float("-inf")
+
+    @property
+    def full(self):
+        return self.length == self.offsets.size
+
+    def append(self, timestamp, value):
+        self.offsets[self.length] = timestamp - self.base_ts
+        self.values[self.length] = value
+        self.length += 1
+        self.min_ts = min(self.min_ts, timestamp)
+        self.max_ts = max(self.max_ts, timestamp)
+
+    def select(self, start_ts, end_ts):
+        timestamps = self.base_ts + self.offsets[: self.length].astype(np.float64)
+        mask = (timestamps >= start_ts) & (timestamps < end_ts)
+        return timestamps[mask], self.values[: self.length][mask]
+
+
+class _RollupSeries:
+    """Closed min/max/sum/count buckets in growable arrays plus one open bucket."""
+
+    def __init__(self, interval_s, capacity=64):
+        self.interval_s = float(interval_s)
+        self.starts = np.empty(capacity, dtype=np.float64)
+        self.mins = np.empty(capacity, dtype=np.float32)
+        self.maxs = np.empty(capacity, dtype=np.float32)
+        self.sums = np.empty(capacity, dtype=np.float64)
+        self.counts = np.empty(capacity, dtype=np.int64)
+        self.head = 0
+        self.tail = 0
+        self.open_start = None
+        self.open = [0.0, 0.0, 0.0, 0]  # min, max, sum, count
+
+    def add(self, timestamp, value):
+        """Fold one sample in; returns False for a late sample whose bucket is gone."""
+        bucket_start = (timestamp // self.interval_s) * self.interval_s
+        if self.open_start is None or bucket_start > self.open_start:
+            self._close_open_bucket()
+            self.open_start = bucket_start
+            self.open = [value, value, value, 1]
+            return True
+        if bucket_start == self.open_start:
+            self.open[0] = min(self.open[0], value)
+            self.open[1] = max(self.open[1], value)
+            self.open[2] += value
+            self.open[3] += 1
+            return True
+
+        index = self.head + int(np.searchsorted(self.starts[self.head : self.tail], bucket_start))
+        if index >= self.tail or self.starts[index] != bucket_start:
+            return False
+        self.mins[index] = min(self.mins[index], value)
+        self.maxs[index] = max(self.maxs[index], value)
+        self.sums[index] += value
+        self.counts[index] += 1
+        return True
+
+    def _close_open_bucket(self):
+        if self.open_start is None:
+            return
+        if self.tail == self.starts.size:
+            self._grow()
+        self.starts[self.tail] = self.open_start
+        self.mins[self.tail], self.maxs[self.tail] = self.open[0], self.open[1]
+        self.sums[self.tail], self.counts[self.tail] = self.open[2], self.open[3]
+        self.tail += 1
+
+    def _grow(self):
+        live = self.tail - self.head
+        capacity = max(64, live * 2)
+        for name in ("starts", "mins", "maxs", "sums", "counts"):
+            column = getattr(self, name)
+            resized = np.empty(capacity, dtype=column.dtype)
+            resized[:live] = column[self.head : self.tail]
+            setattr(self, name, resized)
+        self.head, self.tail = 0, live
+
+    def trim_before(self, cutoff_ts):
+        self.head += int(np.searchsorted(self.starts[self.head : self.tail], cutoff_ts))
+
+    def query(self, start_ts, end_ts):
+        starts = self.starts[self.head : self.tail]
+        counts = self.counts[self.head : self.tail]
+        mins, maxs = self.mins[self.head : self.tail], self.maxs[self.head : self.tail]
+        sums = self.sums[self.head : self.tail]
+        if self.open_start is not None:
+            starts = np.append(starts, self.open_start)
+            mins = np.append(mins, np.float32(self.open[0]))
+            maxs = np.append(maxs, np.float32(self.open[1]))
+            sums = np.append(sums, self.open[2])
+            counts = np.append(counts, self.open[3])
+        mask = (starts >= start_ts) & (starts < end_ts)
+        return {
+            "start_ts": starts[mask],
+            "min": mins[mask],
+            "max": maxs[mask],
+            "mean": (sums[mask] / counts[mask]).astype(np.float32),
+            "count": counts[mask],
+        }
+
+
+class MetricSeries:
+    """One numeric metric as raw sample chunks plus 1 s / trend / 1 h rollups."""
+
+    def __init__(
+        self,
+        rollup_intervals_s=None,
+        chunk_size=1024,
+        raw_retention_s=3600.0,
+        rollup_retention_s=24 * 3600.0,
+    ):
+        self.chunk_size = max(1, int(chunk_size))
+        self.raw_retention_s = float(raw_retention_s)
+        self.rollup_retention_s = float(rollup_retention_s)
+        self.chunks = []
+        self.rollups = {
+            int(interval): _RollupSeries(interval)
+            for interval in (rollup_intervals_s or trend_rollup_intervals())
+        }
+        self.late_samples = 0
+
+    def append(self, timestamp, value):
+        """Record one sample and update every rollup incrementally."""
+        timestamp, value = float(timestamp), float(value)
+        if not self.chunks or self.chunks[-1].full:
+            self._seal_and_trim(timestamp)
+            self.chunks.append(_SampleChunk(timestamp, self.chunk_size))
+        self.chunks[-1].append(timestamp, value)
+        for rollup in self.rollups.values():
+            if not rollup.add(timestamp, value):
+                self.late_samples += 1
+
+    def _seal_and_trim(self, now):
+        raw_cutoff = now - self.raw_retention_s
+        while self.chunks and self.chunks[0].max_ts < raw_cutoff:
+            self.chunks.pop(0)
+        for rollup in self.rollups.values():
+            rollup.trim_before(now - self.rollup_retention_s)
+
+    def sample_count(self):
+        """Number of raw samples currently retained."""
+        return sum(chunk.length for chunk in self.chunks)
+
+    def range(self, start_ts, end_ts):
+        """Return `(timestamps, values)` arrays for raw samples in `[start_ts, end_ts)`."""
+        parts = [
+            chunk.select(start_ts, end_ts)
+            for chunk in self.chunks
+            if chunk.max_ts >= start_ts and chunk.min_ts < end_ts
+        ]
+        if not parts:
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float32)
+        return (
+            np.concatenate([timestamps for timestamps, _ in parts]),
+            np.concatenate([values for _, values in parts]),
+        )
+
+    def rollup(self, interval_s, start_ts=float("-inf"), end_ts=float("inf")):
+        """Return bucket arrays (`start_ts`, `min`, `max`, `mean`, `count`) for one width."""
+        if int(interval_s) not in self.rollups:
+            raise ValueError(f"No rollup maintained for interval {interval_s}s.")
+        return self.rollups[int(interval_s)].query(start_ts, end_ts)
+
+
+class TimeSeriesStore:
+    """Columnar store of numeric status metrics keyed by metric name."""
+
+    def __init__(self, metrics=DEFAULT_TREND_METRICS, rollup_intervals_s=None, **series_kwargs):
+        self.rollup_intervals_s = tuple(rollup_intervals_s or trend_rollup_intervals())
+        self.series = {
+            name: MetricSeries(rollup_intervals_s=self.rollup_intervals_s, **series_kwargs)
+            for name in metrics
+        }
+
+    def append(self, timestamp, **values):
+        """Record one sample per provided metric at `timestamp`."""
+        for name, value in values.items():
+            series = self.series.get(name)
+            if series is not None and value is not None:
+                series.append(timestamp, value)
+
+    def range(self, metric, start_ts, end_ts):
+        """Return raw `(timestamps, values)` arrays for a metric in `[start_ts, end_ts)`."""
+        return self.series[metric].range(start_ts, end_ts)
+
+    def rollup(self, metric, interval_s, start_ts=float("-inf"), end_ts=float("inf")):
+        """Return rollup bucket arrays for a metric and interval."""
+        return self.series[metric].rollup(interval_s, start_ts, end_ts)
+
+    def trend(self, metric, start_ts, end_ts, interval_s=None):
+        """Return JSON-ready trend points at the dashboard trend interval by default."""
+        width = interval_s or DashboardIntegrationContract().trend_interval_s
+        buckets = self.rollup(metric, width, start_ts, end_ts)
+        return [
+            {"start_ts": float(start), "min": float(low), "max": float(high), "mean": float(mean)}
+            for start, low, high, mean in zip(
+                buckets["start_ts"], buckets["min"], buckets["max"], buckets["mean"], strict=True
+            )
+        ]
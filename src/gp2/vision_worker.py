@@ -0,0 +1,262 @@
+"""Process-isolated fatigue inference with shared-memory frame handoff."""
+
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .detection import FatigueDetector
+
+WORKER_START_METHOD = "spawn"  # forking a process that runs threads is unsafe
+
+
+READY_SEQ = 0  # result sequence number the worker sends once its detector is loaded
+
+
+class VisionWorkerUnavailable(RuntimeError):
+    """Raised when the vision worker is dead, hung or restarting."""
+
+
+class VisionWorkerStarting(VisionWorkerUnavailable):
+    """Raised while a (re)started worker is loading; the failure that caused it was counted."""
+
+
+def _landmarks_xy(face_landmarks):
+    if face_landmarks is None:
+        return None
+    if hasattr(face_landmarks, "landmark"):
+        return np.array([(point.x, point.y) for point in face_landmarks.landmark], np.float32)
+    return np.asarray(face_landmarks, dtype=np.float32).reshape(-1, 2)
+
+
+def _vision_worker_main(shm_name, requests, results, initial_state=None):
+    """Worker process: read each frame from the shared buffer and run `FatigueDetector`."""
+    shm = shared_memory.SharedMemory(name=shm_name)  # the parent owns and unlinks it
+    detector = FatigueDetector()
+    if initial_state is not None:
+        detector.restore_state(initial_state)
+    try:
+        results.send((READY_SEQ, None, None, None))
+        while True:
+            request = requests.recv()
+            if request is None:
+                return
+            seq, shape, dtype, mode, refine_landmarks, export_state = request
+            detector.set_refine_landmarks(refine_landmarks)
+            frame = None
+            if shape is not None:  # None: no camera frame this cycle
+                frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            result = detector.analyze_frame_with_metrics(None, None, mode, frame)
+            del frame  # release the buffer export so the segment can close
+            state = detector.export_state() if export_state else None
+            results.send((seq, result, _landmarks_xy(detector.last_face_landmarks), state))
+    except (EOFError, KeyboardInterrupt):
+        return
+    finally:
+        shm.close()
+
+
+class ProcessFatigueDetector:
+    """`FatigueDetector` stand-in whose inference runs in a separate process.
+
+    Frames are copied into one frame-sized `multiprocessing.shared_memory`
+    buffer and only `(seq, shape, dtype, mode, refine)` is sent over a pipe, so
+    frames are never pickled; results and the face landmarks (as normalized
+    `(x, y)` points for clip redaction) come back over a second pipe. Only one
+    request is ever in flight, and a worker that misses its deadline is stopped
+    before the next frame is written, so a single buffer is never overwritten
+    while the worker reads it.
+
+    A worker that exits or misses `timeout_s` is stopped and that call raises
+    `VisionWorkerUnavailable`; the next call starts a fresh worker, at most
+    once per `restart_backoff_s`. Until the new worker reports that its
+    detector is loaded, calls raise `VisionWorkerStarting` instead of blocking;
+    a worker not ready within `start_timeout_s` counts as a timeout. The
+    PERCLOS window lives in the worker. A `None` frame still reaches the
+    worker so the window records a no-face sample, as `FatigueDetector` does.
+
+    `export_state()` returns the worker detector's state from the most recent
+    export and asks the worker to piggyback a fresh one on the next result, so
+    snapshots never add a round trip. `restore_state(state)` seeds the next
+    worker started. A replacement worker also starts from the latest export, so
+    a crash costs at most one export interval of PERCLOS history.
+    """
+
+    def __init__(self, timeout_s=0.5, restart_backoff_s=1.0, start_timeout_s=30.0):
+        self.timeout_s = timeout_s
+        self.restart_backoff_s = restart_backoff_s
+        self.start_timeout_s = start_timeout_s
+        self.last_face_landmarks = None
+        self.refine_landmarks = True
+        self.stats = {"frames": 0, "restarts": 0, "timeouts": 0, "worker_deaths": 0}
+        self._context = multiprocessing.get_context(WORKER_START_METHOD)
+        self._shm = None
+        self._process = None
+        self._requests = None
+        self._results = None
+        self._seq = 0
+        self._last_start_ts = None
+        self._ready = False
+        self._state = None
+        self._export_requested = False
+
+    def set_refine_landmarks(self, refine_landmarks: bool):
+        """Applied by the worker with the next frame."""
+        self.refine_landmarks = refine_landmarks
+
+    def export_state(self):
+        """Return the last state exported by the worker (or restored); None before any."""
+        self._export_requested = True
+        return self._state
+
+    def restore_state(self, state):
+        """Seed the next worker started with `state` saved by `export_state`."""
+        self._state = state
+
+    @property
+    def worker_pid(self):
+        return self._process.pid if self._process is not None else None
+
+    def _ensure_buffer(self, nbytes):
+        if self._shm is not None and nbytes <= self._shm.size:
+            return
+        self._stop_worker()
+        self._release_buffer()
+        self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+
+    def _start_worker(self):
+        request_reader, self._requests = self._context.Pipe(duplex=False)
+        self._results, result_writer = self._context.Pipe(duplex=False)
+        self._process = self._context.Process(
+            target=_vision_worker_main,
+            args=(self._shm.name, request_reader, result_writer, self._state),
+            name="gp2-vision-worker",
+            daemon=True,
+        )
+        self._process.start()
+        request_reader.close()
+        result_writer.close()
+        if self._last_start_ts is not None:
+            self.stats["restarts"] += 1
+        self._last_start_ts = time.monotonic()
+        self._ready = False
+
+    def _stop_worker(self, timeout_s=1.0):
+        if self._process is None:
+            return
+        try:
+            self._requests.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(timeout=timeout_s)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join(timeout=timeout_s)
+        for conn in (self._requests, self._results):
+            conn.close()
+        self._process = None
+
+    def _fail(self, reason, message):
+        self.stats[reason] += 1
+        self._stop_worker(timeout_s=0.1)
+        raise VisionWorkerUnavailable(message)
+
+    def _ensure_worker(self):
+        if self._process is not None and not self._process.is_alive():
+            self._fail("worker_deaths", "Vision worker exited.")
+        if self._process is None:
+            if (
+                self._last_start_ts is not None
+                and time.monotonic() - self._last_start_ts < self.restart_backoff_s
+            ):
+                raise VisionWorkerStarting("Vision worker is restarting.")
+            self._start_worker()
+        if not self._ready:
+            self._await_ready()
+
+    def _await_ready(self):
+        try:
+            while self._results.poll(0):
+                if self._results.recv()[0] == READY_SEQ:
+                    self._ready = True
+                    return
+        except (EOFError, OSError):
+            self._fail("worker_deaths", "Vision worker exited.")
+        if time.monotonic() - self._last_start_ts > self.start_timeout_s:
+            self._fail("timeouts", "Vision worker did not start.")
+        raise VisionWorkerStarting("Vision worker is starting.")
+
+    def analyze_frame_with_metrics(
+        self,
+        landmarks,
+        expected_drowsy=None,
+        mode="heuristic-ear-perclos",
+        frame=None,
+    ):
+        """Run fatigue analysis on `frame` in the worker; same result shape as `FatigueDetector`."""
+        if landmarks is not None:
+            raise ValueError("ProcessFatigueDetector analyzes camera frames only.")
+        started = time.perf_counter()
+        self.last_face_landmarks = None
+        if frame is None and self._shm is None:
+            # No worker has run yet, so there is no PERCLOS window to record into.
+            return {
+                "is_drowsy": False,
+                "ear": 0.0,
+                "latency_ms": (time.perf_counter() - started) * 1000.0,
+                "false_alert": False,
+                "mode": mode,
+                "perclos": 0.0,
+            }
+        if frame is not None:
+            frame = np.ascontiguousarray(frame)
+            self._ensure_buffer(frame.nbytes)
+        self._ensure_worker()
+
+        shape = dtype = None
+        if frame is not None:
+            view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=self._shm.buf)
+            view[...] = frame
+            del view
+            shape, dtype = frame.shape, frame.dtype.str
+        self._seq += 1
+        export_state, self._export_requested = self._export_requested, False
+        deadline = started + self.timeout_s
+        try:
+            self._requests.send(
+                (self._seq, shape, dtype, mode, self.refine_landmarks, export_state)
+            )
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or not self._results.poll(remaining):
+                    self._fail("timeouts", "Vision worker missed its deadline.")
+                seq, result, landmarks_xy, state = self._results.recv()
+                if seq == self._seq:
+                    break
+        except (EOFError, OSError):
+            self._fail("worker_deaths", "Vision worker exited.")
+
+        self.stats["frames"] += 1
+        self.last_face_landmarks = landmarks_xy
+        if state is not None:
+            self._state = state
+        result = dict(result)
+        result["false_alert"] = bool(expected_drowsy is False and result["is_drowsy"])
+        result["latency_ms"] = (time.perf_counter() - started) * 1000.0
+        return result
+
+    def snapshot(self):
+        """Return frame, timeout and restart counters for runtime health."""
+        return {**self.stats, "worker_pid": self.worker_pid}
+
+    def close(self):
+        """Stop the worker and release the shared-memory frame buffer."""
+        self._stop_worker()
+        self._release_buffer()
+
+    def _release_buffer(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
@@ -0,0 +1,172 @@
+"""Runtime watchdog that carries out `watchdog_escalation_policy()` actions."""
+
+import logging
+import time
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from .planning.software_architecture import watchdog_escalation_policy
+
+logger = logging.getLogger(__name__)
+
+LEVEL_OK = "ok"
+LEVEL_WARN = "warn"
+LEVEL_DEGRADE = "degrade"
+LEVEL_ESCALATE = "escalate"
+WATCHDOG_LEVELS = (LEVEL_OK, LEVEL_WARN, LEVEL_DEGRADE, LEVEL_ESCALATE)
+
+ACTION_DEGRADED_MODE = "enter_degraded_mode_and_raise_health_alert"
+ACTION_SAFE_DETECTION = "switch_to_safe_detection_defaults"
+ACTION_SUSPEND_STATUS = "disable_noncritical_status_publish_and_raise_connectivity_alert"
+SAFE_DETECTION_MODE = "watchdog-safe-defaults"
+
+
+@dataclass(frozen=True)
+class WatchdogTransition:
+    """One counter moving between watchdog levels."""
+
+    counter: str
+    previous: str
+    level: str
+    window_count: int
+    action: str
+
+
+class _CounterWindow:
+    def __init__(self):
+        self.last_total = None
+        self.deltas = deque()
+        self.window_count = 0
+        self.last_fault_ts = None
+        self.level = LEVEL_OK
+        self.last_attempt_ts = None
+
+
+class RuntimeWatchdog:
+    """Evaluates cumulative fault counters over a sliding window and applies policy actions.
+
+    `observe(counters)` turns each counter's increase into timestamped faults and
+    counts those inside `window_s`. Reaching `degrade_at` applies the counter's
+    action: degraded mode for sensor reads, safe detection defaults for
+    detection, and suspended STATUS publishing for reconnects. Reaching
+    `escalate_at` also returns an escalation transition for the runtime to
+    alert on. While degraded, `should_attempt(counter)` allows one probe per
+    `probe_interval_s` instead of a retry every cycle. A counter steps back down
+    only after `recovery_s` without new faults.
+    """
+
+    def __init__(
+        self,
+        policy: Mapping[str, Mapping[str, int | str]] | None = None,
+        window_s: float = 30.0,
+        recovery_s: float = 30.0,
+        probe_interval_s: float = 1.0,
+        clock=time.monotonic,
+    ):
+        self.policy = dict(policy or watchdog_escalation_policy())
+        self.window_s = window_s
+        self.recovery_s = recovery_s
+        self.probe_interval_s = probe_interval_s
+        self.clock = clock
+        self.transitions = 0
+        self._windows = {counter: _CounterWindow() for counter in self.policy}
+
+    def _level_for(self, counter, count):
+        thresholds = self.policy[counter]
+        if count >= int(thresholds["escalate_at"]):
+            return LEVEL_ESCALATE
+        if count >= int(thresholds["degrade_at"]):
+            return LEVEL_DEGRADE
+        if count >= int(thresholds["warn_at"]):
+            return LEVEL_WARN
+        return LEVEL_OK
+
+    def observe(self, counters: Mapping[str, int], now=None) -> list[WatchdogTransition]:
+        """Fold in cumulative counter values; return the level changes they caused."""
+        now = self.clock() if now is None else now
+        transitions = []
+        for counter, window in self._windows.items():
+            total = int(counters.get(counter, 0))
+            if window.last_total is not None and total > window.last_total:
+                delta = total - window.last_total
+                window.deltas.append((now, delta))
+                window.window_count += delta
+                window.last_fault_ts = now
+            window.last_total = total
+            while window.deltas and now - window.deltas[0][0] > self.window_s:
+                window.window_count -= window.deltas.popleft()[1]
+
+            level = self._level_for(counter, window.window_count)
+            current = WATCHDOG_LEVELS.index(window.level)
+            target = WATCHDOG_LEVELS.index(level)
+            if target < current and now - window.last_fault_ts < self.recovery_s:
+                continue
+            if target != current:
+                transition = WatchdogTransition(
+                    counter=counter,
+                    previous=window.level,
+                    level=level,
+                    window_count=window.window_count,
+                    action=str(self.policy[counter]["action"]),
+                )
+                window.level = level
+                self.transitions += 1
+                transitions.append(transition)
+                log = logger.warning if target > current else logger.info
+                log(
+                    "Watchdog %s: %s -> %s (%d in window)",
+                    counter,
+                    transition.previous,
+                    level,
+                    window.window_count,
+                )
+        return transitions
+
+    def level(self, counter: str) -> str:
+        return self._windows[counter].level
+
+    def _action_active(self, action):
+        return any(
+            self.policy[counter]["action"] == action
+            and WATCHDOG_LEVELS.index(window.level) >= WATCHDOG_LEVELS.index(LEVEL_DEGRADE)
+            for counter, window in self._windows.items()
+        )
+
+    @property
+    def degraded_mode(self) -> bool:
+        return self._action_active(ACTION_DEGRADED_MODE)
+
+    @property
+    def safe_detection(self) -> bool:
+        return self._action_active(ACTION_SAFE_DETECTION)
+
+    @property
+    def status_publish_suspended(self) -> bool:
+        return self._action_active(ACTION_SUSPEND_STATUS)
+
+    def should_attempt(self, counter: str, now=None) -> bool:
+        """Return whether to run the guarded operation this cycle (probe-limited while degraded)."""
+        window = self._windows[counter]
+        if WATCHDOG_LEVELS.index(window.level) < WATCHDOG_LEVELS.index(LEVEL_DEGRADE):
+            return True
+        now = self.clock() if now is None else now
+        if window.last_attempt_ts is not None and now - window.last_attempt_ts < (
+            self.probe_interval_s
+        ):
+            return False
+        window.last_attempt_ts = now
+        return True
+
+    def snapshot(self):
+        """Return per-counter levels and active actions for runtime health."""
+        return {
+            "counters": {
+                counter: {"level": window.level, "window_count": window.window_count}
+                for counter, window in self._windows.items()
+            },
+            "degraded_mode": self.degraded_mode,
+            "safe_detection": self.safe_detection,
+            "status_publish_suspended": self.status_publish_suspended,
+            "transitions": self.transitions,
+        }
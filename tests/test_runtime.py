@@ -1,13 +1,39 @@
 """Unit tests for GP2 prototype logic and feature-flag wiring."""
 
+import asyncio
 import json
+import os
+import tempfile
+import threading
 import time
 import unittest
 from typing import cast
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, PropertyMock, patch
 
+import numpy as np
+
+from src.gp2.alerts import PHASE_END, PHASE_START, PHASE_UPDATE, AlertPolicy, AlertStateMachine
+from src.gp2.async_runtime import (
+    StageTimeouts,
+    execute_runtime_cycle_async,
+    run_monitoring_loop_async,
+)
+from src.gp2.async_telemetry import AsyncTelemetryClient
+from src.gp2.benchmarks import benchmark_payload_codecs, benchmark_storage_write_behind
+from src.gp2.clips import ClipRecorder, clip_output_dir, load_clip_frames
+from src.gp2.codec import (
+    MessagePackCodec,
+    PayloadCodecError,
+    codec_for_schema_version,
+    decode_payload,
+)
+from src.gp2.crash_path import CrashFastPath
 from src.gp2.detection import FatigueDetector
-from src.gp2.main import build_power_profile, build_sensor_health
+from src.gp2.loadtest import LoadTestConfig, run_load_test
+from src.gp2.local_broker import LocalMQTTBroker
+from src.gp2.main import build_power_profile, build_sensor_health, run_monitoring_loop
+from src.gp2.metrics import LatencyHistogram
+from src.gp2.pipeline import DropOldestQueue, PipelinedRuntime
 from src.gp2.planning.ai_algorithms import (
     MODEL_MODE,
     AIPlan,
@@ -59,8 +85,11 @@ from src.gp2.planning.power_plan import (
 )
 from src.gp2.planning.software_architecture import (
     RuntimeOrchestratorContract,
+    RuntimeTopology,
+    build_status_payload,
     dependency_versions,
     execute_runtime_cycle,
+    pipelined_topology,
     side_effect_boundaries,
     watchdog_escalation_policy,
 )
@@ -72,8 +101,20 @@ from src.gp2.planning.storage_strategy import (
     dsar_supported_actions,
     resolve_sync_conflict,
 )
+from src.gp2.profiling import CYCLE_ID_KEY, CycleProfiler
+from src.gp2.quality import LatencyBudgetController
+from src.gp2.redaction import FaceRedactor, face_box_from_landmarks
+from src.gp2.scheduler import FixedRateScheduler
 from src.gp2.sensors import CameraModule, IMUSensor, IRSys
-from src.gp2.telemetry import TelemetryClient
+from src.gp2.telemetry import TOPIC_ALERTS, TOPIC_HEALTH, SectionDeltaEncoder, TelemetryClient
+from src.gp2.timeseries import TimeSeriesStore, trend_rollup_intervals
+from src.gp2.vision_worker import (
+    ProcessFatigueDetector,
+    VisionWorkerStarting,
+    VisionWorkerUnavailable,
+)
+from src.gp2.warm_restart import WarmRestartStore, warm_restart_path
+from src.gp2.watchdog import LEVEL_DEGRADE, LEVEL_ESCALATE, LEVEL_OK, RuntimeWatchdog
 
 
 class TestSmartHelmet(unittest.TestCase):
@@ -341,6 +382,393 @@ class TestSmartHelmet(unittest.TestCase):
         self.assertIn("runtime_health", payload)
         self.assertEqual(payload["runtime_health"]["fault_counters"]["sensor_read_failures"], 1)
 
+    def test_msgpack_codec_negotiated_via_topic_contract(self):
+        """Publishes compact binary payloads advertised by the topic schema version."""
+        config = ConnectivityConfig(payload_codec="msgpack")
+        client = TelemetryClient(config=config)
+        client.client = MagicMock()
+        client.send_telemetry(perclos=0.25, g_force=1.1, ai_metrics={"latency_ms": 4.5})
+
+        contracts = topic_contracts(config.payload_codec)
+        wire = client.client.publish.call_args.args[1]
+        self.assertIsInstance(wire, bytes)
+        self.assertEqual(client.schema_version, contracts["STATUS"].schema_version)
+        payload = decode_payload(wire, contracts["STATUS"].schema_version)
+        self.assertEqual(payload["perclos"], 0.25)
+        self.assertEqual(payload["ai_metrics"]["latency_ms"], 4.5)
+        self.assertEqual(decode_payload(wire), payload)
+        self.assertFalse(validate_connectivity_config(ConnectivityConfig(payload_codec="xml")))
+        self.assertEqual(ConnectivityConfig(payload_codec=" MsgPack ").payload_codec, "msgpack")
+
+    def test_msgpack_pure_python_round_trip(self):
+        """Round-trips runtime payload types without the optional msgpack extension."""
+        payload = {
+            "device_id": "helmet_01",
+            "ints": [0, 127, 255, -1, -33, 70000, -70000, 2**40],
+            "floats": [0.5, 0.1, -1e300],
+            "flags": [True, False, None],
+            "nested": {"text": "x" * 40, "blob": b"\x00\x01"},
+        }
+        codec = MessagePackCodec()
+        with patch("src.gp2.codec.msgpack", None):
+            wire = codec.encode(payload)
+            self.assertEqual(codec.decode(wire), payload)
+            with self.assertRaises(PayloadCodecError):
+                codec.decode(wire[:-1])
+        self.assertEqual(
+            codec_for_schema_version("v1").decode(json.dumps(payload["ints"])), payload["ints"]
+        )
+
+    def test_codec_benchmark_reports_size_against_json(self):
+        """Reports per-codec encode timing and wire size relative to JSON."""
+        results = benchmark_payload_codecs(iterations=5)
+
+        self.assertEqual(results["json"]["size_ratio_vs_json"], 1.0)
+        self.assertLess(results["msgpack"]["size_bytes"], results["json"]["size_bytes"])
+        self.assertGreaterEqual(results["msgpack"]["encode_us"], 0.0)
+
+    def test_health_sections_sent_only_on_change_or_keyframe(self):
+        """Publishes slow-changing sections on HEALTH only when changed or on keyframes."""
+        client = TelemetryClient(config=ConnectivityConfig(health_keyframe_interval_s=60.0))
+        client.client = MagicMock()
+        sensor_health = {"imu": {"available": True}}
+        power_profile = {"average_ma": 100.0}
+
+        self.assertTrue(
+            client.send_health(now=0.0, sensor_health=sensor_health, power_profile=power_profile)
+        )
+        self.assertFalse(
+            client.send_health(now=1.0, sensor_health=sensor_health, power_profile=power_profile)
+        )
+        self.assertTrue(
+            client.send_health(
+                now=2.0, sensor_health={"imu": {"available": False}}, power_profile=power_profile
+            )
+        )
+        client.send_health(now=61.0, sensor_health=sensor_health, power_profile=power_profile)
+
+        calls = client.client.publish.call_args_list
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(calls[0].args[0], TOPIC_HEALTH)
+        first, delta, keyframe = (json.loads(call.args[1]) for call in calls)
+        self.assertTrue(first["keyframe"])
+        self.assertFalse(delta["keyframe"])
+        self.assertNotIn("power_profile", delta)
+        self.assertTrue(keyframe["keyframe"])
+        self.assertIn("power_profile", keyframe)
+
+    def test_section_delta_encoder_forced_keyframe(self):
+        """Re-sends all sections after a forced keyframe such as a reconnect."""
+        encoder = SectionDeltaEncoder(keyframe_interval_s=60.0)
+        encoder.encode({"a": 1, "b": 2}, now=0.0)
+        self.assertEqual(encoder.encode({"a": 1, "b": 2}, now=1.0), (False, {}))
+
+        encoder.force_keyframe()
+        self.assertEqual(encoder.encode({"a": 1, "b": 2}, now=2.0), (True, {"a": 1, "b": 2}))
+
+    def test_publish_ack_tracking_and_timeout_expiry(self):
+        """Tracks QoS 1 publishes until PUBACK and leaves unacked messages to paho's resend."""
+        config = ConnectivityConfig(offline_queue_enabled=True, publish_ack_timeout_s=1.0)
+        client = TelemetryClient(config=config)
+        client.client = MagicMock()
+        client.client.publish.side_effect = [
+            MagicMock(rc=0, mid=1),
+            MagicMock(rc=0, mid=2),
+        ]
+
+        client.send_alert("CRASH", 3.1)
+        client.send_alert("FATIGUE", 0.2)
+        self.assertEqual(list(client.inflight), [1, 2])
+
+        client._on_publish(client.client, None, 1)
+        expired = client._expire_inflight(now=time.monotonic() + 5.0)
+
+        health = client.health_snapshot()
+        self.assertEqual(expired, 1)
+        self.assertEqual(health["inflight_depth"], 0)
+        self.assertEqual(health["publish_ack"]["count"], 1)
+        self.assertEqual(health["fault_counters"]["ack_timeouts"], 1)
+        self.assertEqual(client.offline_queue, [])
+
+    def test_inflight_window_bounds_unacked_publishes(self):
+        """Diverts QoS 1 publishes to the outbox while the in-flight window is full."""
+        config = ConnectivityConfig(offline_queue_enabled=True, max_inflight_messages=1)
+        client = TelemetryClient(config=config)
+        client.client = MagicMock()
+        client.client.publish.return_value = MagicMock(rc=0, mid=7)
+
+        client.send_alert("CRASH", 3.0)
+        client.send_alert("CRASH", 3.2)
+
+        self.assertEqual(client.client.publish.call_count, 1)
+        self.assertEqual(len(client.offline_queue), 1)
+        self.assertEqual(client.fault_counters["inflight_window_full"], 1)
+
+    def test_publish_rejected_return_code_is_not_delivered(self):
+        """Treats a non-success publish return code as a failed delivery."""
+        config = ConnectivityConfig(offline_queue_enabled=True, max_reconnect_attempts=1)
+        client = TelemetryClient(config=config)
+        client.client = MagicMock()
+        client.client.publish.return_value = MagicMock(rc=15, mid=3)  # paho queue full
+        client.client.reconnect.side_effect = OSError("network down")
+
+        with patch("src.gp2.telemetry.time.sleep", return_value=None):
+            client.send_alert("CRASH", 3.0)
+
+        self.assertEqual(client.fault_counters["publish_failures"], 1)
+        self.assertEqual(len(client.offline_queue), 1)
+        self.assertEqual(len(client.inflight), 0)
+
+    def test_latency_histogram_percentiles(self):
+        """Summarizes latency samples into fixed buckets with bucket-bound percentiles."""
+        histogram = LatencyHistogram(bounds_ms=(1.0, 10.0, 100.0))
+        for value in [0.5] * 90 + [50.0] * 9 + [250.0]:
+            histogram.record(value)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 100)
+        self.assertEqual(snapshot["p50_ms"], 1.0)
+        self.assertEqual(snapshot["p95_ms"], 100.0)
+        self.assertEqual(snapshot["max_ms"], 250.0)
+        self.assertEqual(snapshot["counts"], [90, 0, 9, 1])
+
+    def test_async_telemetry_publishes_alerts_before_status_backlog(self):
+        """Drains the outbox from a cooperative task with alerts ahead of status."""
+
+        async def scenario():
+            client = AsyncTelemetryClient()
+            client.client = MagicMock()
+            client.client.connect.side_effect = lambda *_args: client._on_connect(
+                client.client, None, {}, 0
+            )  # the broker's CONNACK
+            await client.start()
+            client.send_telemetry(0.1, 1.0)
+            client.send_alert("CRASH", 3.4)
+            await client.drain(timeout_s=1.0)
+            health = client.health_snapshot()
+            await client.stop()
+            return client, health
+
+        client, health = asyncio.run(scenario())
+        topics = [call.args[0] for call in client.client.publish.call_args_list]
+        self.assertEqual(topics, ["smarthelmet/v1/alerts", "smarthelmet/v1/telemetry"])
+        self.assertEqual(health["outbox_depth"], 0)
+        client.client.connect.assert_called_once()
+
+    def test_async_telemetry_reconnect_does_not_block_loop(self):
+        """Backs off with asyncio.sleep so other coroutines keep running while offline."""
+
+        async def scenario():
+            config = ConnectivityConfig(
+                offline_queue_enabled=True,
+                reconnect_initial_delay_s=0.01,
+                reconnect_max_delay_s=0.02,
+                max_reconnect_attempts=2,
+            )
+            client = AsyncTelemetryClient(config=config)
+            client.client = MagicMock()
+            client.client.connect.side_effect = OSError("network down")
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                for _ in range(5):
+                    ticks += 1
+                    await asyncio.sleep(0.005)
+
+            await client.start()
+            client.send_alert("CRASH", 3.0)
+            await ticker()
+            await asyncio.sleep(0.05)
+            health = client.health_snapshot()
+            await client.stop()
+            return client, ticks, health
+
+        client, ticks, health = asyncio.run(scenario())
+        self.assertEqual(ticks, 5)
+        self.assertGreaterEqual(client.fault_counters["reconnect_failures"], 2)
+        self.assertFalse(health["connected"])
+        self.assertEqual(health["outbox_depth"], 1)
+        client.client.publish.assert_not_called()
+
+    def test_async_telemetry_disconnect_keeps_base_bookkeeping(self):
+        """Counts an unexpected disconnect like the base client and schedules a reconnect."""
+
+        async def scenario():
+            client = AsyncTelemetryClient()
+            client.client = MagicMock()
+            await client.start()
+            client.connected = True
+            client.client.on_disconnect(client.client, None, 7)
+            await asyncio.sleep(0)
+            connected = client.connected
+            await client.stop()
+            return client, connected
+
+        client, connected = asyncio.run(scenario())
+        self.assertEqual(client.fault_counters["reconnect_failures"], 1)
+        self.assertFalse(connected)
+
+    def test_async_telemetry_connects_on_connack(self):
+        """Keeps the link down after the socket connect until the broker accepts the CONNACK."""
+
+        async def scenario():
+            client = AsyncTelemetryClient()
+            client.client = MagicMock()
+            await client.start()
+            await asyncio.sleep(0.05)  # connect() has returned; no CONNACK yet
+            before = client.connected
+            client.client.on_connect(client.client, None, {}, 0)
+            after = client.connected
+            await client.stop()
+            return client, before, after
+
+        client, before, after = asyncio.run(scenario())
+        client.client.connect.assert_called_once()
+        self.assertFalse(before)
+        self.assertTrue(after)
+
+    def test_async_telemetry_publishes_over_loopback_broker(self):
+        """Drives a real paho socket from the event loop through connect, publish and stop."""
+
+        async def wait_for(predicate, timeout_s=2.0):
+            deadline = time.monotonic() + timeout_s
+            while not predicate() and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+
+        async def scenario(broker):
+            config = ConnectivityConfig(
+                broker="127.0.0.1",
+                port=broker.port,
+                reconnect_initial_delay_s=0.05,
+                reconnect_max_delay_s=0.1,
+            )
+            client = AsyncTelemetryClient(device_id="helmet_async", config=config)
+            await client.start()
+            await wait_for(lambda: client.connected)
+            client.send_alert("CRASH", 3.1)
+            await client.drain(timeout_s=2.0)
+            await wait_for(lambda: broker.messages)
+            await client.stop()
+
+        with LocalMQTTBroker() as broker:
+            asyncio.run(scenario(broker))
+            messages = broker.drain_messages()
+
+        self.assertEqual([m.topic for m in messages], [TOPIC_ALERTS])
+        self.assertEqual(messages[0].client_id, "helmet_async")
+
+    def test_local_broker_receives_and_acks_publishes(self):
+        """Delivers real paho publishes to the loopback broker and records PUBACK latency."""
+        with LocalMQTTBroker() as broker:
+            config = ConnectivityConfig(broker="127.0.0.1", port=broker.port)
+            client = TelemetryClient(device_id="helmet_test", config=config)
+            client.send_alert("CRASH", 3.3)
+            client.send_telemetry(0.1, 1.0)
+            deadline = time.monotonic() + 2.0
+            while len(broker.messages) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            while client.inflight and time.monotonic() < deadline:
+                time.sleep(0.01)
+            client.client.loop_stop()
+            client.client.disconnect()
+            messages = broker.drain_messages()
+
+        self.assertEqual([m.topic for m in messages], [TOPIC_ALERTS, "smarthelmet/v1/telemetry"])
+        self.assertEqual(messages[0].client_id, "helmet_test")
+        self.assertEqual(decode_payload(messages[0].payload)["alert"], "CRASH")
+        self.assertEqual(client.health_snapshot()["publish_ack"]["count"], 1)
+
+    def test_broker_outage_drives_reconnect_watchdog(self):
+        """Counts paho's failed reconnects during a real outage and suspends STATUS publishing."""
+        watchdog = RuntimeWatchdog(window_s=30.0, recovery_s=30.0)
+        with LocalMQTTBroker() as broker:
+            config = ConnectivityConfig(
+                broker="127.0.0.1",
+                port=broker.port,
+                reconnect_initial_delay_s=0.05,
+                reconnect_max_delay_s=0.1,
+            )
+            client = TelemetryClient(config=config)
+            watchdog.observe(client.fault_counters)
+            deadline = time.monotonic() + 6.0
+            while broker.connections_accepted < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)  # the outage must drop an established session
+            broker.inject_outage(2.0)  # long enough for four failed reconnects under load
+            while not watchdog.status_publish_suspended and time.monotonic() < deadline:
+                watchdog.observe(client.fault_counters)
+                time.sleep(0.02)
+            health = client.health_snapshot()
+            while broker.connections_accepted < 2 and time.monotonic() < deadline:
+                time.sleep(0.02)
+            client.client.loop_stop()
+            client.client.disconnect()
+
+        self.assertTrue(watchdog.status_publish_suspended)
+        self.assertGreaterEqual(client.fault_counters["reconnect_failures"], 4)
+        self.assertTrue(health["degraded_mode"])
+        self.assertEqual(broker.connections_accepted, 2)
+
+    def test_alerts_across_broker_outage_are_delivered_once(self):
+        """Leaves alerts sent while disconnected to paho's resend instead of requeueing them."""
+        with LocalMQTTBroker() as broker:
+            config = ConnectivityConfig(
+                broker="127.0.0.1",
+                port=broker.port,
+                reconnect_initial_delay_s=0.05,
+                reconnect_max_delay_s=0.1,
+                publish_ack_timeout_s=0.05,
+                offline_queue_enabled=True,
+            )
+            client = TelemetryClient(config=config)
+            client.send_alert("FATIGUE", 1.0)
+            deadline = time.monotonic() + 3.0
+            while client.inflight and time.monotonic() < deadline:
+                time.sleep(0.01)
+            broker.inject_outage(0.5)
+            while client.client.is_connected() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            client.send_alert("FATIGUE", 2.0)
+            client.send_critical_alert("CRASH", 3.0)
+            time.sleep(0.1)
+            client.health_snapshot()  # expires the unacknowledged alerts
+            while broker.connections_accepted < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            client.send_alert("FATIGUE", 4.0)
+            while len(broker.messages) < 4 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.1)
+            client.client.loop_stop()
+            client.client.disconnect()
+            messages = broker.drain_messages()
+
+        values = sorted(decode_payload(message.payload)["value"] for message in messages)
+        self.assertEqual(values, [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(client.offline_queue, [])
+        self.assertEqual(len(client.critical_backlog), 0)
+        self.assertEqual(client.fault_counters["publish_failures"], 2)
+
+    def test_load_generator_survives_injected_outage(self):
+        """Reports throughput, latency percentiles and queue recovery across an outage."""
+        report = run_load_test(
+            LoadTestConfig(
+                helmets=2,
+                duration_s=1.0,
+                status_hz=10.0,
+                alert_interval_s=0.3,
+                outage_at_s=0.4,
+                outage_duration_s=0.3,
+                settle_s=2.0,
+            )
+        )
+
+        self.assertEqual(report["lost"]["ALERT"], 0)
+        self.assertGreater(report["messages_per_s"], 0.0)
+        self.assertGreater(report["latency_ms"]["STATUS"]["count"], 0)
+        self.assertGreaterEqual(report["broker_connections"], 4)
+        self.assertEqual(report["queue"]["final_offline_depth"], 0)
+        self.assertEqual(report["queue"]["final_inflight_depth"], 0)
+
     def test_health_snapshot_reports_degraded_mode(self):
         """Reports degraded mode when queue pressure is high."""
         config = ConnectivityConfig(offline_queue_enabled=True, offline_queue_max_items=4)
@@ -377,6 +805,72 @@ class TestSmartHelmet(unittest.TestCase):
         self.assertEqual(buffer.events[0].payload["id"], 2)
         self.assertEqual(buffer.events[1].payload["id"], 3)
 
+    def test_storage_amortized_capacity_pruning(self):
+        """Prunes back to capacity only after crossing the high-water mark."""
+        policy = StoragePolicy(on_device_queue_max_items=10, prune_high_water_ratio=1.5)
+        buffer = LocalStorageBuffer(policy=policy)
+        for index in range(14):
+            buffer.add_event(StorageEvent("status", {"id": index}))
+        self.assertEqual(buffer.capacity_high_water, 15)
+        self.assertEqual(buffer.row_count, 14)
+
+        buffer.add_event(StorageEvent("status", {"id": 14}))
+        self.assertEqual(buffer.row_count, 10)
+        self.assertEqual([event.payload["id"] for event in buffer.events], list(range(5, 15)))
+
+    def test_storage_retention_runs_on_schedule(self):
+        """Runs retention at most once per prune interval and keeps the row counter exact."""
+        policy = StoragePolicy(on_device_retention_hours=1, prune_interval_s=3600.0)
+        buffer = LocalStorageBuffer(policy=policy)
+        now = time.time()
+        buffer.add_event(StorageEvent("status", {"id": 1}, timestamp=now))
+        buffer.add_event(StorageEvent("status", {"id": 2}, timestamp=now - 5000))
+        self.assertEqual(buffer.row_count, 2)
+
+        buffer.prune_retention(now=now)
+        self.assertEqual(buffer.row_count, 1)
+        (partition,) = buffer.partitions
+        indexes = buffer._conn.execute(f"PRAGMA index_list({partition})").fetchall()
+        self.assertIn(f"idx_{partition}_timestamp", [row["name"] for row in indexes])
+
+    def test_storage_retention_drops_whole_partitions(self):
+        """Stores events in hourly partitions and expires them by dropping tables."""
+        policy = StoragePolicy(on_device_retention_hours=2, prune_interval_s=3600.0)
+        buffer = LocalStorageBuffer(policy=policy)
+        hour = 3600 * int(time.time() // 3600)
+        for offset_h, event_id in ((0, 1), (1, 2), (2, 3), (3, 4), (0, 5)):
+            buffer.add_event(
+                StorageEvent("status", {"id": event_id}, timestamp=hour + offset_h * 3600)
+            )
+        self.assertEqual(len(buffer.partitions), 4)
+        self.assertEqual([event.payload["id"] for event in buffer.events], [1, 2, 3, 4, 5])
+
+        buffer.prune_retention(now=hour + 3 * 3600)
+        self.assertEqual(buffer.stats["partitions_dropped"], 1)
+        self.assertEqual(len(buffer.partitions), 3)
+        self.assertEqual(buffer.row_count, 3)
+        self.assertEqual([event.payload["id"] for event in buffer.events], [2, 3, 4])
+
+    def test_storage_partitions_persist_id_order_across_reopen(self):
+        """Keeps one id sequence across partitions and reopened database files."""
+        policy = StoragePolicy(on_device_queue_max_items=3, prune_high_water_ratio=1.0)
+        now = time.time()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "events.db")
+            buffer = LocalStorageBuffer(policy=policy, db_path=db_path)
+            buffer.add_event(StorageEvent("status", {"id": 1}, timestamp=now))
+            buffer.add_event(StorageEvent("status", {"id": 2}, timestamp=now - 3600))
+            buffer.close()
+
+            reopened = LocalStorageBuffer(policy=policy, db_path=db_path)
+            self.assertEqual(reopened.row_count, 2)
+            reopened.add_event(StorageEvent("status", {"id": 3}, timestamp=now - 7200))
+            reopened.add_event(StorageEvent("status", {"id": 4}, timestamp=now))
+            self.assertEqual([event.payload["id"] for event in reopened.events], [2, 3, 4])
+            reopened.mark_synced([0])
+            self.assertEqual(len(reopened.pending_replay_events()), 2)
+            reopened.close()
+
     def test_storage_replay_and_sync_marking(self):
         """Returns unsynced records for replay and marks selected entries synced."""
         buffer = LocalStorageBuffer(policy=StoragePolicy())
@@ -391,6 +885,316 @@ class TestSmartHelmet(unittest.TestCase):
         pending_after = buffer.pending_replay_events()
         self.assertEqual(len(pending_after), 0)
 
+    def test_storage_replay_pages_with_cursor_and_bulk_marking(self):
+        """Pages unsynced events by stable id and acknowledges them in bulk."""
+        buffer = LocalStorageBuffer(policy=StoragePolicy(write_behind_enabled=True))
+        now = time.time()
+        for index in range(10):
+            buffer.add_event(
+                StorageEvent("status", {"id": index}, timestamp=now - (index % 3) * 3600)
+            )
+
+        first = buffer.pending_replay_events(limit=4)
+        self.assertEqual([event.payload["id"] for event in first], [0, 1, 2, 3])
+        second = buffer.pending_replay_events(cursor=first[-1].event_id, limit=4)
+        self.assertEqual([event.payload["id"] for event in second], [4, 5, 6, 7])
+
+        self.assertEqual(buffer.mark_synced_through(first[-1].event_id), 4)
+        self.assertEqual(buffer.mark_synced_ids([event.event_id for event in second[:2]]), 2)
+        remaining = buffer.pending_replay_events()
+        self.assertEqual([event.payload["id"] for event in remaining], [6, 7, 8, 9])
+        partition = next(iter(buffer.partitions))
+        indexes = buffer._conn.execute(f"PRAGMA index_list({partition})").fetchall()
+        self.assertIn(f"idx_{partition}_unsynced", [row["name"] for row in indexes])
+
+    def test_storage_iter_events_filters_and_decodes_lazily(self):
+        """Streams filtered events across partitions in id order without eager decoding."""
+        buffer = LocalStorageBuffer(policy=StoragePolicy())
+        hour = 3600 * int(time.time() // 3600)
+        buffer.add_event(StorageEvent("status", {"id": 1}, timestamp=hour + 3600))
+        buffer.add_event(StorageEvent("alert_fatigue", {"id": 2}, timestamp=hour))
+        buffer.add_event(StorageEvent("status", {"id": 3}, timestamp=hour + 10, synced=True))
+        buffer.add_event(StorageEvent("status", {"id": 4}, timestamp=hour + 3700))
+
+        records = list(buffer.iter_events(event_type="status", batch_size=1))
+        self.assertEqual([record.event_id for record in records], [1, 3, 4])
+        self.assertIsNone(records[0]._decoded_payload)
+        self.assertEqual(records[0].payload["id"], 1)
+
+        in_range = buffer.iter_events(start_ts=hour + 5, end_ts=hour + 3650, synced=False)
+        self.assertEqual([record.payload["id"] for record in in_range], [1])
+        unsynced_first_hour = buffer.iter_events(end_ts=hour + 3600, synced=False)
+        self.assertEqual([record.event_type for record in unsynced_first_hour], ["alert_fatigue"])
+
+    def test_storage_dedupes_repeated_payload_sections(self):
+        """Stores repeated health sections once per partition and rebuilds payloads on read."""
+        buffer = LocalStorageBuffer(policy=StoragePolicy())
+        hour = 3600 * int(time.time() // 3600)
+        sensor_health = {"imu": {"available": True, "bus": "I2C"}}
+        for index in range(5):
+            payload = {"perclos": index, "sensor_health": sensor_health}
+            buffer.add_event(StorageEvent("status", payload, timestamp=hour + index))
+        payload = {"perclos": 5, "sensor_health": {"imu": {}}}
+        buffer.add_event(StorageEvent("status", payload, timestamp=hour + 5))
+
+        (partition,) = buffer.partitions
+        section_table = partition.replace("events_p", "sections_p")
+        stored = buffer._conn.execute(f"SELECT COUNT(*) FROM {section_table}").fetchone()[0]
+        self.assertEqual(stored, 2)
+        raw = buffer._conn.execute(f"SELECT payload FROM {partition} LIMIT 1").fetchone()[0]
+        self.assertNotIn("I2C", raw)
+
+        events = buffer.events
+        self.assertEqual(events[0].payload, {"perclos": 0, "sensor_health": sensor_health})
+        self.assertEqual(events[5].payload["sensor_health"], {"imu": {}})
+        self.assertEqual(buffer.pending_replay_events(limit=1)[0].payload, events[0].payload)
+
+    def test_storage_trip_summaries_aggregate_incrementally(self):
+        """Splits trips on idle motion gaps and resumes the open trip after reopen."""
+        policy = StoragePolicy(
+            write_behind_enabled=True,
+            on_device_queue_max_items=5000,
+            trip_idle_gap_s=60.0,
+            trip_assumed_speed_kmh=36.0,
+        )
+        start = time.time() - 3600
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "events.db")
+            buffer = LocalStorageBuffer(policy=policy, db_path=db_path)
+            buffer.add_event(StorageEvent("status", {"g_force": 1.0}, timestamp=start))
+            for second in range(101):
+                buffer.add_event(StorageEvent("status", {"g_force": 1.3}, timestamp=start + second))
+            buffer.add_event(StorageEvent("alert_fatigue", {"perclos": 0.5}, timestamp=start + 50))
+            for second in range(101, 200):
+                buffer.add_event(StorageEvent("status", {"g_force": 1.0}, timestamp=start + second))
+            buffer.add_event(StorageEvent("status", {"g_force": 0.0}, timestamp=start + 200))
+            buffer.add_event(StorageEvent("status", {"g_force": 1.5}, timestamp=start + 300))
+            buffer.close()
+
+            reopened = LocalStorageBuffer(policy=policy, db_path=db_path)
+            reopened.add_event(StorageEvent("status", {"g_force": 1.5}, timestamp=start + 310))
+            newest, first = reopened.trip_history()
+            self.assertEqual((first.started_at, first.ended_at), (start, start + 100))
+            self.assertAlmostEqual(first.active_s, 100.0)
+            self.assertAlmostEqual(first.distance_km, 1.0)
+            self.assertEqual(first.event_counts, {"alert_fatigue": 1, "status": 161})
+            self.assertEqual(first.event_count, 162)
+            self.assertEqual(newest.trip_id, reopened.trips.current.trip_id)
+            self.assertEqual((newest.event_count, newest.active_s), (2, 10.0))
+            self.assertEqual(reopened.trip_history(start_ts=start + 250), [newest])
+            self.assertEqual(reopened.trip_history(limit=1), [newest])
+            reopened.close()
+
+    def test_storage_write_behind_group_commit(self):
+        """Buffers status events and writes them in one transaction per batch."""
+        policy = StoragePolicy(
+            write_behind_enabled=True,
+            write_behind_max_batch=3,
+            write_behind_flush_interval_s=60.0,
+        )
+        buffer = LocalStorageBuffer(policy=policy)
+        commits_before = buffer.stats["commits"]
+        buffer.add_event(StorageEvent("status", {"id": 1}))
+        buffer.add_event(StorageEvent("status", {"id": 2}))
+        self.assertEqual(buffer.pending_writes, 2)
+        self.assertEqual(buffer.stats["commits"], commits_before)
+
+        buffer.add_event(StorageEvent("status", {"id": 3}))
+        self.assertEqual(buffer.pending_writes, 0)
+        self.assertEqual(buffer.stats["commits"], commits_before + 1)
+
+        buffer.add_event(StorageEvent("status", {"id": 4}))
+        buffer.add_event(StorageEvent("alert_crash", {"g_force": 3.2}))
+        self.assertEqual(buffer.pending_writes, 0)
+        self.assertEqual([event.payload.get("id") for event in buffer.events], [1, 2, 3, 4, None])
+
+    def test_storage_bulk_add_commits_once(self):
+        """Seeds a batch of events in one transaction and still folds them into trip summaries."""
+        buffer = LocalStorageBuffer(policy=StoragePolicy())
+        commits_before = buffer.stats["commits"]
+        written = buffer.add_events(
+            [StorageEvent("status", {"id": index, "g_force": 1.5}) for index in range(50)]
+        )
+
+        self.assertEqual(written, 50)
+        self.assertEqual(buffer.stats["commits"], commits_before + 1)
+        self.assertEqual(buffer.stats["events_added"], 50)
+        self.assertEqual(buffer.row_count, 50)
+        self.assertEqual(len(buffer.trip_history()), 1)
+        self.assertGreater(buffer.database_bytes, 0)
+        buffer.close()
+
+    def test_storage_write_behind_interval_flush_and_read_through(self):
+        """Flushes on interval expiry and before reads so callers see their own writes."""
+        policy = StoragePolicy(write_behind_enabled=True, write_behind_flush_interval_s=1.0)
+        buffer = LocalStorageBuffer(policy=policy)
+        buffer.add_event(StorageEvent("status", {"id": 1}))
+
+        self.assertFalse(buffer.flush_if_due(now=buffer._last_flush_ts + 0.5))
+        self.assertTrue(buffer.flush_if_due(now=buffer._last_flush_ts + 1.5))
+        buffer.add_event(StorageEvent("status", {"id": 2}))
+        self.assertEqual(len(buffer.pending_replay_events()), 2)
+
+    def test_storage_write_behind_benchmark_reduces_commits(self):
+        """Reports throughput and commit counts for immediate vs write-behind storage."""
+        results = benchmark_storage_write_behind(events=50, alert_every=25)
+
+        self.assertEqual(results["immediate"]["flushes"], 50)
+        self.assertLess(results["write_behind"]["commits"], results["immediate"]["commits"])
+        self.assertGreater(results["write_behind"]["events_per_s"], 0.0)
+
+    def test_timeseries_rollups_match_dashboard_trend_interval(self):
+        """Maintains 1 s / trend / 1 h rollups and answers raw range queries from chunks."""
+        self.assertEqual(trend_rollup_intervals(), (1, 60, 3600))
+        store = TimeSeriesStore(chunk_size=16)
+        start = 3600.0 * 500000
+        for index in range(240):
+            store.append(start + index * 0.5, perclos=index % 60 / 100.0, g_force=1.0)
+
+        timestamps, values = store.range("perclos", start + 10, start + 20)
+        self.assertEqual(len(timestamps), 20)
+        self.assertAlmostEqual(float(timestamps[0]), start + 10, places=3)
+        self.assertEqual(values.dtype.name, "float32")
+
+        minutes = store.rollup("perclos", 60, start, start + 3600)
+        self.assertEqual(minutes["count"].tolist(), [120, 120])
+        self.assertAlmostEqual(float(minutes["max"][0]), 0.59, places=5)
+        trend = store.trend("perclos", start, start + 3600)
+        self.assertAlmostEqual(trend[0]["mean"], 0.295, places=4)
+        self.assertEqual(len(store.rollup("g_force", 1)["count"]), 120)
+        self.assertEqual(store.rollup("g_force", 3600)["count"].tolist(), [240])
+
+    def test_clip_recorder_captures_pre_and_post_roll_off_loop(self):
+        """Snapshots pre-roll on trigger, collects post-roll and writes the clip in background."""
+        contract = ClipBufferContract(pre_event_s=1, post_event_s=1)
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            recorder = ClipRecorder(contract=contract, output_dir=tmp_dir, fps=10.0)
+            start = 1000.0
+            for index in range(30):
+                recorder.push(frame, now=start + index * 0.1)
+            self.assertEqual(len(recorder.ring), 10)
+
+            trigger_ts = start + 3.0
+            clip = recorder.trigger("CRASH", now=trigger_ts)
+            self.assertIs(recorder.trigger("CRASH", now=trigger_ts + 0.1), clip)
+            for index in range(1, 12):
+                recorder.push(frame if index % 2 else None, now=trigger_ts + index * 0.1)
+            self.assertNotIn("CRASH", recorder.active)
+            recorder.close()
+
+            (completed,) = recorder.drain_completed()
+            self.assertEqual(completed.event_id, clip.event_id)
+            self.assertTrue(completed.storage_uri.startswith("file://"))
+            timestamps, frames = load_clip_frames(completed.storage_uri[len("file://") :])
+            self.assertGreaterEqual(timestamps[0], trigger_ts - 1.0)
+            self.assertGreaterEqual(timestamps[-1], trigger_ts + 0.9)
+            self.assertEqual(len(frames), 15)
+            self.assertEqual(frames[0].shape[:2], (24, 32))
+
+    def test_clip_recorder_push_and_trigger_on_separate_threads(self):
+        """Holds a trigger from another thread until push has finished with the active clips."""
+        contract = ClipBufferContract(pre_event_s=1, post_event_s=5)
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            recorder = ClipRecorder(contract=contract, output_dir=tmp_dir, fps=10.0)
+            recorder.push(frame, now=0.0)
+            recorder.trigger("CRASH", now=0.0)
+            telemetry = threading.Thread(
+                target=recorder.trigger, args=("FATIGUE",), kwargs={"now": 0.1}
+            )
+
+            class TriggerDuringAppend(list):
+                def append(self, item):
+                    super().append(item)
+                    if telemetry.ident is None:
+                        telemetry.start()  # the telemetry stage triggers mid-iteration
+                        telemetry.join(timeout=0.2)
+
+            recorder.active["CRASH"].frames = TriggerDuringAppend(recorder.active["CRASH"].frames)
+            recorder.push(frame, now=0.1)
+            telemetry.join()
+            self.assertEqual(set(recorder.active), {"CRASH", "FATIGUE"})
+            self.assertEqual(len(recorder.active["CRASH"].frames), 2)
+            recorder.close()
+        self.assertEqual(recorder.stats["clips_written"], 2)
+
+    def test_clip_encoder_survives_a_failing_clip(self):
+        """Counts a clip whose redaction raises as dropped and keeps writing later clips."""
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        redactor = FaceRedactor(detect_missing=False)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            recorder = ClipRecorder(
+                contract=ClipBufferContract(pre_event_s=1, post_event_s=0),
+                output_dir=tmp_dir,
+                redactor=redactor,
+            )
+            with (
+                patch.object(redactor, "redact", side_effect=ValueError("bad face box")),
+                self.assertLogs("src.gp2.clips", level="ERROR"),
+            ):
+                recorder.push(frame, now=10.0)
+                recorder.trigger("CRASH", now=10.0)
+                recorder.push(frame, now=10.2)
+                deadline = time.monotonic() + 5.0
+                while recorder.stats["clips_dropped"] == 0 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            recorder.trigger("FATIGUE", now=10.2)
+            recorder.push(frame, now=10.4)
+            recorder.close()
+            completed = recorder.drain_completed()
+
+        self.assertEqual(recorder.stats["clips_dropped"], 1)
+        self.assertEqual([clip.event_id.split("-")[0] for clip in completed], ["fatigue"])
+        self.assertTrue(completed[0].redacted)
+
+    def test_face_redaction_reuses_landmark_boxes(self):
+        """Pixelates only the landmark face box and fails closed without landmarks."""
+        frame = np.tile(np.arange(64, dtype=np.uint8), (48, 1))[..., None].repeat(3, axis=2)
+        landmarks = [(0.25, 0.25), (0.5, 0.5)]
+        box = face_box_from_landmarks(landmarks, margin=0.0)
+        self.assertEqual(box, (0.25, 0.25, 0.5, 0.5))
+
+        redactor = FaceRedactor(block_size=4, detect_missing=False)
+        redacted, source = redactor.redact(frame, box)
+        self.assertEqual(source, "landmarks")
+        self.assertTrue(np.array_equal(redacted[:12], frame[:12]))
+        self.assertEqual(len(np.unique(redacted[12:16, 16:20, 0])), 1)
+        self.assertFalse(np.array_equal(redacted[12:24, 16:32], frame[12:24, 16:32]))
+
+        full, source = redactor.redact(frame)
+        self.assertEqual(source, "full-frame")
+        self.assertEqual(len(np.unique(full[:4, :4, 0])), 1)
+        self.assertEqual(redactor.stats["frames"], 2)
+        self.assertGreater(redactor.fps(), 0.0)
+
+        detecting = FaceRedactor(block_size=4)
+        with (
+            patch.object(FaceRedactor, "has_detector", new_callable=PropertyMock) as has_detector,
+            patch.object(detecting, "detect_face_boxes", return_value=[]),
+        ):
+            has_detector.return_value = True
+            missed, source = detecting.redact(frame)
+        self.assertEqual(source, "no-face")
+        self.assertEqual(len(np.unique(missed[:4, :4, 0])), 1)  # a miss still covers the frame
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            recorder = ClipRecorder(
+                contract=ClipBufferContract(pre_event_s=1, post_event_s=0),
+                output_dir=tmp_dir,
+                scale=1.0,
+                redactor=FaceRedactor(block_size=4, detect_missing=False),
+            )
+            recorder.push(frame, now=10.0, face_landmarks=landmarks)
+            recorder.trigger("FATIGUE", now=10.0)
+            recorder.push(None, now=10.1)
+            recorder.close()
+            (clip,) = recorder.drain_completed()
+            self.assertTrue(clip.redacted)
+            _timestamps, frames = load_clip_frames(clip.storage_uri[len("file://") :])
+            self.assertTrue(np.array_equal(frames[0][:8], frame[:8]))
+            self.assertEqual(recorder.redaction_stats()["landmarks"], 1)
+
     def test_storage_conflict_resolution_last_write_wins(self):
         """Selects the latest timestamp event for last-write-wins policy."""
         local = StorageEvent("status", {"source": "local"}, timestamp=200.0)
@@ -443,6 +1247,541 @@ class TestSmartHelmet(unittest.TestCase):
         self.assertTrue(result["crash_detected"])
         self.assertTrue(result["fatigue_detected"])
 
+    def test_fixed_rate_scheduler_keeps_deadlines_and_counts_overruns(self):
+        """Paces cycles to absolute deadlines and skips slots swallowed by an overrun."""
+        clock = {"now": 0.0}
+
+        def sleep(seconds):
+            clock["now"] += seconds
+
+        scheduler = FixedRateScheduler(period_s=0.05, clock=lambda: clock["now"], sleep=sleep)
+        starts = []
+        for work_s in (0.01, 0.02, 0.01, 0.01, 0.13, 0.01, 0.01):
+            scheduler.start_cycle()
+            starts.append(clock["now"])
+            clock["now"] += work_s
+            scheduler.wait_next()
+
+        expected = (0.0, 0.05, 0.10, 0.15, 0.20, 0.33, 0.35)
+        for actual, deadline in zip(starts, expected, strict=True):
+            self.assertAlmostEqual(actual, deadline)
+        snapshot = scheduler.snapshot()
+        self.assertEqual((snapshot["cycles"], snapshot["overruns"], snapshot["skipped"]), (7, 1, 1))
+        self.assertEqual(snapshot["target_hz"], 20.0)
+        self.assertEqual(snapshot["cycle_p99_ms"], 130.0)
+        self.assertAlmostEqual(clock["now"], 0.40)
+
+        contract = RuntimeOrchestratorContract(
+            read_sensor_snapshot=lambda: {"g_force": 1.0},
+            detect_fatigue=lambda _snapshot: {"is_drowsy": False},
+            publish_runtime_event=lambda _event_type, _payload: None,
+        )
+        run_monitoring_loop(contract, max_cycles=3, scheduler=scheduler)
+        self.assertEqual(scheduler.cycles, 9)
+        self.assertAlmostEqual(clock["now"], 0.50)
+
+    def test_drop_oldest_queue_keeps_alerts(self):
+        """Evicts the oldest droppable item when full and never evicts alerts."""
+        queue = DropOldestQueue(maxsize=2)
+        queue.put("status-1")
+        queue.put("crash", droppable=False)
+        queue.put("status-2")
+        queue.put("status-3")
+        self.assertEqual(queue.dropped, 2)
+        queue.close()
+        self.assertEqual([queue.get(), queue.get()], ["crash", "status-3"])
+
+    def test_pipelined_topology_drives_contract_callbacks(self):
+        """Runs the contract on sensor/detection/telemetry workers with crash ahead of detection."""
+        published = []
+
+        def read_sensor_snapshot():
+            return {"g_force": 3.0}
+
+        def detect_fatigue(_snapshot):
+            return {"is_drowsy": True, "ear": 0.1, "perclos": 0.4}
+
+        def publish_runtime_event(event_type, payload):
+            published.append((event_type, threading.current_thread().name, payload))
+
+        contract = RuntimeOrchestratorContract(
+            read_sensor_snapshot=read_sensor_snapshot,
+            detect_fatigue=detect_fatigue,
+            publish_runtime_event=publish_runtime_event,
+        )
+        topology = pipelined_topology()
+        self.assertTrue(topology.pipelined)
+        self.assertFalse(RuntimeTopology().pipelined)
+        runtime = PipelinedRuntime(contract, topology, period_s=0.0, queue_size=64)
+        runtime.run(max_cycles=5)
+
+        event_types = [event for event, _thread, _payload in published]
+        self.assertEqual(event_types[0], "CRASH")
+        self.assertEqual(event_types.count("CRASH"), 5)
+        self.assertEqual(event_types.count("FATIGUE"), 5)
+        self.assertEqual(event_types.count("STATUS"), 5)
+        self.assertEqual({thread for _event, thread, _payload in published}, {"pipeline-telemetry"})
+        status = next(payload for event, _thread, payload in published if event == "STATUS")
+        self.assertEqual(
+            (status["g_force"], status["perclos"], status["fatigue"]), (3.0, 0.4, True)
+        )
+        self.assertEqual(runtime.snapshot()["published"], 5)
+
+        def failing_detect(_snapshot):
+            raise ValueError("detector crashed")
+
+        failing = PipelinedRuntime(
+            RuntimeOrchestratorContract(
+                read_sensor_snapshot, failing_detect, publish_runtime_event
+            ),
+            topology,
+            period_s=0.0,
+        )
+        with self.assertRaises(ValueError):
+            failing.run(max_cycles=1000)
+
+    def test_async_orchestrator_publishes_crash_without_waiting_on_detection(self):
+        """Sends CRASH while detection runs and times out a slow detection stage."""
+        published = []
+
+        async def read_sensor_snapshot():
+            return {"g_force": 3.2}
+
+        async def slow_detect_fatigue(_snapshot):
+            await asyncio.sleep(0.5)
+            return {"is_drowsy": True}
+
+        def publish_runtime_event(event_type, payload):
+            published.append((event_type, threading.current_thread().name, payload))
+
+        contract = RuntimeOrchestratorContract(
+            read_sensor_snapshot, slow_detect_fatigue, publish_runtime_event
+        )
+        started = time.perf_counter()
+        result = asyncio.run(
+            execute_runtime_cycle_async(contract, timeouts=StageTimeouts(detect_s=0.05))
+        )
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertTrue(result["crash_detected"])
+        self.assertEqual(result["skipped_stages"], ["detect"])
+        self.assertEqual([event for event, _thread, _payload in published], ["CRASH", "STATUS"])
+        self.assertTrue(all(thread.startswith("runtime-publish") for _e, thread, _p in published))
+        self.assertEqual(published[1][2]["ai_metrics"]["mode"], "detection-skipped")
+
+    def test_async_monitoring_loop_offloads_blocking_callbacks(self):
+        """Runs blocking callbacks on stage executors and skips a stage still busy past its timeout."""
+        detect_threads = []
+
+        def detect_fatigue(_snapshot):
+            detect_threads.append(threading.current_thread().name)
+            time.sleep(0.12 if len(detect_threads) == 1 else 0.0)
+            return {"is_drowsy": False, "perclos": 0.2}
+
+        published = []
+        contract = RuntimeOrchestratorContract(
+            read_sensor_snapshot=lambda: {"g_force": 1.0},
+            detect_fatigue=detect_fatigue,
+            publish_runtime_event=lambda event_type, payload: published.append(payload),
+        )
+        orchestrator = asyncio.run(
+            run_monitoring_loop_async(
+                contract,
+                loop_delay_s=0.02,
+                max_cycles=8,
+                timeouts=StageTimeouts(detect_s=0.03),
+            )
+        )
+        self.assertEqual(orchestrator.stats["timeouts"]["detect"], 1)
+        self.assertGreaterEqual(orchestrator.stats["busy_skips"]["detect"], 1)
+        self.assertEqual(orchestrator.stats["published"], 8)
+        self.assertTrue(all(name.startswith("runtime-detect") for name in detect_threads))
+        self.assertEqual(published[-1]["perclos"], 0.2)
+
+    def test_crash_fast_path_routes_once_per_impact_within_budget(self):
+        """Routes a crash per impact from IMU samples and flags latency-budget violations."""
+        samples = iter([(0.0, 0.0, 1.0), (2.0, 2.0, 1.0), (3.0, 0.0, 0.0), (0.0, 0.0, 1.0)])
+        routed = []
+        fast_path = CrashFastPath(lambda: next(samples), routed.append, refractory_s=60.0)
+        events = [fast_path.poll_once() for _ in range(4)]
+
+        self.assertEqual(routed, [3.0])
+        self.assertIsNone(events[0])
+        self.assertIsNone(events[2])  # same impact, inside the refractory window
+        self.assertTrue(events[1].routed)
+        self.assertLess(events[1].route_latency_ms, EmergencyRoutingPolicy().max_route_latency_ms)
+        self.assertEqual(fast_path.drain_events(), [events[1]])
+        self.assertEqual(fast_path.drain_events(), [])
+        self.assertEqual(fast_path.latest_g_force, 1.0)
+
+        slow = CrashFastPath(
+            lambda: (4.0, 0.0, 0.0),
+            lambda _g_force: time.sleep(0.03),
+            policy=EmergencyRoutingPolicy(max_route_latency_ms=10),
+        )
+        slow.poll_once()
+        self.assertEqual(slow.snapshot()["budget_violations"], 1)
+
+        threaded = CrashFastPath(lambda: (0.0, 0.0, 1.0), routed.append, rate_hz=200.0)
+        threaded.start()
+        time.sleep(0.05)
+        threaded.stop()
+        self.assertGreater(threaded.stats["samples"], 2)
+        self.assertFalse(threaded.running)
+        sampled_at = threaded.latest_sample_ts
+        self.assertFalse(threaded.sample_is_stale(now=sampled_at + 0.05))
+        self.assertTrue(threaded.sample_is_stale(now=sampled_at + 0.2))
+
+        def failing_read():
+            raise OSError("imu bus error")
+
+        failing = CrashFastPath(failing_read, routed.append, rate_hz=200.0)
+        failing.start()
+        time.sleep(0.05)
+        failing.stop()
+        self.assertGreater(failing.read_failures, 2)
+        self.assertIsNone(failing.latest_sample_ts)
+        self.assertGreater(failing.sample_age_s(), 0.04)
+
+    def test_critical_alert_bypasses_inflight_window(self):
+        """Publishes crash alerts directly even when the QoS 1 in-flight window is full."""
+        client = TelemetryClient(
+            config=ConnectivityConfig(max_inflight_messages=1, offline_queue_enabled=True)
+        )
+        client.client = MagicMock()
+        client.client.publish.return_value = MagicMock(rc=0, mid=1)
+        client.send_alert("FATIGUE", 0.1)
+        client.send_alert("FATIGUE", 0.1)
+        self.assertEqual(client.fault_counters["inflight_window_full"], 1)
+
+        self.assertTrue(client.send_critical_alert("CRASH", 3.2))
+        payload = json.loads(client.client.publish.call_args.args[1])
+        self.assertEqual((payload["alert"], payload["value"]), ("CRASH", 3.2))
+
+        client.client.publish.side_effect = OSError("link down")
+        self.assertFalse(client.send_critical_alert("CRASH", 3.5))
+        self.assertEqual(len(client.critical_backlog), 1)
+        client.client.publish.side_effect = None
+        client.replay_offline_queue()  # window still full: the crash waits ahead of FATIGUE
+        self.assertEqual(len(client.critical_backlog), 0)
+        queued = [item["payload"]["alert"] for item in client.offline_queue]
+        self.assertEqual(queued, ["CRASH", "FATIGUE"])
+
+    def test_process_fatigue_detector_restarts_crashed_worker(self):
+        """Runs detection in a worker process over shared memory and restarts it after a crash."""
+        detector = ProcessFatigueDetector(restart_backoff_s=0.0)
+        self.addCleanup(detector.close)
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+
+        def analyze_when_ready(frame):
+            deadline = time.monotonic() + 30.0
+            while True:
+                try:
+                    return detector.analyze_frame_with_metrics(None, False, frame=frame)
+                except VisionWorkerStarting:
+                    if time.monotonic() > deadline:
+                        raise
+                    time.sleep(0.01)
+
+        started = time.perf_counter()
+        with self.assertRaises(VisionWorkerStarting):  # loading workers do not block the cycle
+            detector.analyze_frame_with_metrics(None, None, frame=frame)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        result = analyze_when_ready(frame)
+        self.assertEqual(
+            set(result), set(FatigueDetector().analyze_frame_with_metrics(None, None, frame=frame))
+        )
+        self.assertFalse(result["false_alert"])
+        no_frame = detector.analyze_frame_with_metrics(None, None, frame=None)
+        self.assertEqual((no_frame["is_drowsy"], no_frame["ear"]), (False, 0.0))
+        first_pid = detector.worker_pid
+
+        detector._process.kill()
+        detector._process.join()
+        with self.assertRaises(VisionWorkerUnavailable) as raised:
+            detector.analyze_frame_with_metrics(None, None, frame=frame)
+        self.assertNotIsInstance(raised.exception, VisionWorkerStarting)
+        analyze_when_ready(frame)
+
+        self.assertNotEqual(detector.worker_pid, first_pid)
+        snapshot = detector.snapshot()
+        self.assertEqual((snapshot["frames"], snapshot["restarts"]), (3, 1))
+        self.assertEqual(snapshot["worker_deaths"], 1)
+        with self.assertRaises(ValueError):
+            detector.analyze_frame_with_metrics(np.zeros((68, 2)), None, frame=frame)
+
+    def test_cycle_profiler_times_callbacks_and_keeps_slow_exemplars(self):
+        """Records per-callback and cycle timings and keeps slow cycles as exemplars."""
+        detect_delays = iter([0.0, 0.05, 0.0])
+        seen_snapshots = []
+
+        def detect(snapshot):
+            seen_snapshots.append(snapshot)
+            time.sleep(next(detect_delays))
+            return {"is_drowsy": False}
+
+        contract = RuntimeOrchestratorContract(
+            read_sensor_snapshot=lambda: {"frame": np.zeros((4, 6, 3)), "g_force": 3.0},
+            detect_fatigue=detect,
+            publish_runtime_event=lambda _event_type, _payload: None,
+        )
+        profiler = CycleProfiler(slow_cycle_ms=25.0)
+        instrumented = profiler.instrument(contract)
+        for _ in range(3):
+            execute_runtime_cycle(instrumented)
+
+        snapshot = profiler.snapshot()
+        self.assertEqual(snapshot["cycle"]["count"], 3)
+        self.assertEqual(snapshot["callbacks"]["detect_fatigue"]["count"], 3)
+        self.assertEqual(snapshot["callbacks"]["publish:CRASH"]["count"], 3)
+        self.assertEqual(snapshot["slow_cycles"], 1)
+        exemplar = snapshot["exemplars"][0]
+        self.assertGreaterEqual(exemplar["detect_ms"], 50.0)
+        self.assertEqual(exemplar["snapshot"], {"frame_shape": [4, 6, 3], "g_force": 3.0})
+        self.assertEqual([item[CYCLE_ID_KEY] for item in seen_snapshots], [1, 2, 3])
+        json.dumps(snapshot)
+
+        threaded = CycleProfiler()
+        statuses = []
+        fast_contract = RuntimeOrchestratorContract(
+            lambda: {"g_force": 3.0},
+            lambda _snapshot: {},
+            lambda event_type, _payload: statuses.append(event_type == "STATUS"),
+        )
+        PipelinedRuntime(
+            threaded.instrument(fast_contract),
+            pipelined_topology(),
+            period_s=0.0,
+            queue_size=8,
+        ).run(max_cycles=5)
+        self.assertEqual(threaded.cycle_ms.count, sum(statuses))
+
+    def test_cycle_profiler_matches_status_by_cycle_id_when_events_drop(self):
+        """Closes each cycle with its own STATUS when an earlier STATUS was dropped."""
+        readings = iter([1.0, 2.0, 3.0])
+        contract = RuntimeOrchestratorContract(
+            read_sensor_snapshot=lambda: {"g_force": next(readings)},
+            detect_fatigue=lambda _snapshot: {"is_drowsy": False},
+            publish_runtime_event=lambda _event_type, _payload: None,
+        )
+        profiler = CycleProfiler(slow_cycle_ms=-1.0)  # every cycle becomes an exemplar
+        instrumented = profiler.instrument(contract)
+        snapshots = [instrumented.read_sensor_snapshot() for _ in range(3)]
+        results = [instrumented.detect_fatigue(snapshot) for snapshot in snapshots]
+        statuses = [
+            build_status_payload(snapshot["g_force"], result)
+            for snapshot, result in zip(snapshots, results, strict=True)
+        ]
+        instrumented.publish_runtime_event("STATUS", statuses[0])
+        instrumented.publish_runtime_event("STATUS", statuses[2])  # cycle 2's STATUS dropped
+
+        self.assertEqual([status[CYCLE_ID_KEY] for status in statuses], [1, 2, 3])
+        exemplars = profiler.snapshot()["exemplars"]
+        self.assertEqual([e["snapshot"]["g_force"] for e in exemplars], [1.0, 3.0])
+        self.assertEqual(profiler.cycle_ms.count, 2)
+
+    def test_runtime_watchdog_degrades_probes_and_recovers(self):
+        """Applies policy actions over a sliding window, probes while degraded, then recovers."""
+        now = [0.0]
+        watchdog = RuntimeWatchdog(
+            window_s=10.0, recovery_s=5.0, probe_interval_s=1.0, clock=lambda: now[0]
+        )
+        counters = {"sensor_read_failures": 0, "detect_failures": 0, "reconnect_failures": 0}
+        self.assertEqual(watchdog.observe(counters), [])
+
+        counters["detect_failures"] = 4  # spread over the window: below degrade_at
+        now[0] = 1.0
+        watchdog.observe(counters)
+        now[0] = 12.0
+        counters["detect_failures"] = 5
+        watchdog.observe(counters)
+        self.assertFalse(watchdog.safe_detection)
+
+        now[0] = 13.0
+        counters["detect_failures"] = 10
+        transitions = watchdog.observe(counters)
+        self.assertEqual([t.level for t in transitions], [LEVEL_DEGRADE])
+        self.assertTrue(watchdog.safe_detection)
+        self.assertFalse(watchdog.degraded_mode)
+        self.assertTrue(watchdog.should_attempt("detect_failures"))
+        self.assertFalse(watchdog.should_attempt("detect_failures"))  # shed until the probe
+        self.assertTrue(watchdog.should_attempt("sensor_read_failures"))
+
+        counters["reconnect_failures"] = 8
+        transitions = watchdog.observe(counters)
+        self.assertEqual(
+            [(t.counter, t.level) for t in transitions], [("reconnect_failures", LEVEL_ESCALATE)]
+        )
+        self.assertTrue(watchdog.status_publish_suspended)
+
+        now[0] = 17.0  # faults still inside recovery_s: levels hold
+        self.assertEqual(watchdog.observe(counters), [])
+        now[0] = 24.0
+        transitions = watchdog.observe(counters)
+        self.assertEqual({t.level for t in transitions}, {LEVEL_OK})
+        self.assertFalse(watchdog.safe_detection or watchdog.status_publish_suspended)
+        self.assertEqual(watchdog.snapshot()["transitions"], 5)
+
+    def test_alert_state_machine_publishes_episodes_not_cycles(self):
+        """Collapses sustained alert conditions into start/update/end episode events."""
+        now = [0.0]
+        alerts = AlertStateMachine(
+            {
+                "FATIGUE": AlertPolicy(
+                    enter_cycles=2, exit_cycles=3, cooldown_s=5.0, update_interval_s=4.0
+                ),
+                "CRASH": AlertPolicy(exit_cycles=1, cooldown_s=2.0, update_interval_s=None),
+            },
+            clock=lambda: now[0],
+        )
+        events = {}
+        for tick, drowsy in enumerate([1, 1, 1, 1, 1, 1, 0, 0, 0, 1, 1, 1, 1, 1]):
+            now[0] = float(tick)
+            event = alerts.observe("FATIGUE", bool(drowsy), {"ear": 0.1})
+            if event is not None:
+                events[tick] = event
+        self.assertEqual(
+            {tick: event["phase"] for tick, event in events.items()},
+            {1: PHASE_START, 5: PHASE_UPDATE, 8: PHASE_END, 13: PHASE_START},
+        )
+        self.assertEqual(events[1]["episode_id"], events[8]["episode_id"])
+        self.assertNotEqual(events[1]["episode_id"], events[13]["episode_id"])
+        self.assertEqual((events[8]["duration_s"], events[8]["cycles"]), (7.0, 5))
+        self.assertEqual(events[5]["ear"], 0.1)
+        self.assertEqual(alerts.stats["suppressed"], 3)  # ticks 10-12 fall in the cooldown
+
+        published = []
+        contract = RuntimeOrchestratorContract(
+            read_sensor_snapshot=lambda: {"g_force": 3.0},
+            detect_fatigue=lambda _snapshot: {"is_drowsy": False},
+            publish_runtime_event=lambda event_type, payload: published.append(
+                (event_type, payload.get("phase"))
+            ),
+        )
+        runtime_alerts = AlertStateMachine()
+        for _ in range(3):
+            execute_runtime_cycle(contract, alerts=runtime_alerts)
+        self.assertEqual(
+            [event for event in published if event[0] != "STATUS"], [("CRASH", PHASE_START)]
+        )
+        self.assertIsNotNone(runtime_alerts.active_episode("CRASH"))
+
+    def test_latency_budget_controller_steps_quality_tiers(self):
+        """Steps detection quality down over budget and back up after sustained headroom."""
+        controller = LatencyBudgetController(
+            budget_ms=80.0, window_samples=5, evaluation_samples=5, min_dwell_samples=10
+        )
+        self.assertEqual(controller.tier.name, "full")
+        changes = [controller.observe(100.0) for _ in range(10)]
+        self.assertEqual([tier.name for tier in changes if tier], ["no-refine", "low-res"])
+        self.assertEqual(
+            (controller.tier.capture_width, controller.tier.capture_height), (320, 240)
+        )
+
+        self.assertIsNone(controller.observe(79.0))  # within budget, no headroom: hold
+        changes = [controller.observe(10.0) for _ in range(9)]
+        self.assertEqual([tier.name for tier in changes if tier], ["no-refine"])
+        self.assertEqual(controller.snapshot()["step_ups"], 1)
+
+        cadence = LatencyBudgetController(evaluation_samples=1)
+        cadence.tier_index = len(cadence.tiers) - 1
+        self.assertEqual(sum(cadence.should_infer() for _ in range(8)), 2)
+        self.assertEqual(cadence.stats["skipped_frames"], 6)
+        payload = build_status_payload(1.0, {"quality_tier": cadence.tier.name})
+        self.assertEqual(payload["ai_metrics"]["quality_tier"], "quarter-cadence")
+
+    def test_warm_restart_store_restores_recent_detector_state(self):
+        """Round-trips PERCLOS history through the mmap snapshot and rejects torn or stale slots."""
+        detector = FatigueDetector()
+        detector.perclos_buffer.extend([1, 0, 0, 1, 1] * 200)
+        detector.total_frames = 1000
+        now = [1000.0]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "warm.bin")
+            store = WarmRestartStore(path, max_age_s=60.0, clock=lambda: now[0])
+            self.assertIsNone(store.load())
+            store.save({"detector": detector.export_state(), "counters": {"detect_failures": 2}})
+            store.save({"detector": detector.export_state(), "counters": {"detect_failures": 3}})
+            store.close()
+
+            reopened = WarmRestartStore(path, max_age_s=60.0, clock=lambda: now[0])
+            self.addCleanup(reopened.close)
+            state = reopened.load()
+            self.assertEqual(state["counters"], {"detect_failures": 3})
+            restored = FatigueDetector()
+            restored.restore_state(state["detector"])
+            self.assertEqual(list(restored.perclos_buffer), list(detector.perclos_buffer))
+            self.assertEqual(restored._current_perclos(), detector._current_perclos())
+            self.assertEqual(restored.total_frames, 1000)
+
+            newest = reopened._slot_offset(reopened._sequence % 2)
+            reopened._map[newest + 30] ^= 0xFF  # torn write in the newest slot
+            self.assertEqual(reopened.load()["counters"], {"detect_failures": 2})
+            self.assertFalse(reopened.save({"blob": "x" * reopened.size}))
+
+            now[0] += 61.0
+            self.assertIsNone(reopened.load())
+
+        db_path = os.path.join(os.sep, "data", "gp2", "events.db")
+        self.assertEqual(
+            warm_restart_path(db_path), os.path.join(os.sep, "data", "gp2", "gp2_warm_restart.bin")
+        )
+        self.assertFalse(warm_restart_path().startswith(tempfile.gettempdir()))
+        self.assertEqual(clip_output_dir(db_path), os.path.join(os.sep, "data", "gp2", "clips"))
+        recorder = ClipRecorder()
+        self.assertFalse(recorder.output_dir.startswith(tempfile.gettempdir()))
+        recorder.close()
+
+    def test_warm_restart_store_throttles_snapshots(self):
+        """Reports a save as due only once per snapshot interval, so flash is not written every STATUS."""
+        now = [1000.0]
+        with tempfile.TemporaryDirectory() as tmp:
+            store = WarmRestartStore(
+                os.path.join(tmp, "warm.bin"), snapshot_interval_s=15.0, clock=lambda: now[0]
+            )
+            for _ in range(30):  # 30 one-second STATUS steps
+                if store.due():
+                    store.save({"tick": now[0]})
+                now[0] += 1.0
+            self.assertEqual(store.stats["saves"], 2)
+            self.assertEqual(store.load(), {"tick": 1015.0})
+            store.close()
+
+    def test_process_fatigue_detector_carries_warm_restart_state(self):
+        """Seeds the worker with a restored PERCLOS window and exports it with a later result."""
+        source = FatigueDetector()
+        source.perclos_buffer.extend([1, 1, 0, 1])
+        state = source.export_state()
+        detector = ProcessFatigueDetector(restart_backoff_s=0.0)
+        self.addCleanup(detector.close)
+        detector.restore_state(state)
+        self.assertIs(detector.export_state(), state)  # no worker yet: the restored state
+
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)  # no face: appends an open-eye sample
+        deadline = time.monotonic() + 30.0
+        while True:
+            try:
+                result = detector.analyze_frame_with_metrics(None, None, frame=frame)
+                break
+            except VisionWorkerStarting:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+        self.assertAlmostEqual(result["perclos"], 3 / 5)
+
+        exported = detector.export_state()
+        self.assertEqual(exported["perclos_len"], 5)
+        detector._process.kill()
+        detector._process.join()
+        with self.assertRaises(VisionWorkerUnavailable):
+            detector.analyze_frame_with_metrics(None, None, frame=frame)
+        while True:  # the replacement worker resumes from the last export
+            try:
+                result = detector.analyze_frame_with_metrics(None, None, frame=frame)
+                break
+            except VisionWorkerStarting:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+        self.assertAlmostEqual(result["perclos"], 3 / 6)
+
     def test_software_architecture_boundaries_and_versions(self):
         """Publishes stable module boundary map and dependency declarations."""
         boundaries = side_effect_boundaries()